@@ -0,0 +1,139 @@
+"""
+Fire thousands of concurrent bookings at one ride and check it is never
+oversold.
+
+    uv run python -m benchmarks.booking_concurrency --ride-id 42 --user-id 7 \\
+        --requests 5000 --concurrency 1,10,30 --stock 2000
+
+Runs book_seats() (the code behind POST /ride/{id}/book) straight on the
+async engine, so the numbers are the database side without HTTP and auth.
+The ride must be active, in the future and not owned by --user-id. For each
+concurrency level its seats_available is reset to --stock; the bookings made
+are deleted and the original seat count is restored at the end.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from collections import Counter
+
+from fastapi import HTTPException
+from sqlalchemy import delete, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.api.core.operation.booking import book_seats
+from src.api.models.bookingModel import Booking
+from src.api.models.rideModel import Ride
+from src.config import DB_MAX_OVERFLOW, DB_POOL_SIZE
+from src.lib.db_con import async_engine
+
+
+async def _seats(ride_id: int) -> int:
+    async with async_engine.connect() as conn:
+        return (
+            await conn.execute(select(Ride.seats_available).where(Ride.id == ride_id))
+        ).scalar_one()
+
+
+async def _set_seats(ride_id: int, seats: int) -> None:
+    async with async_engine.begin() as conn:
+        await conn.execute(
+            update(Ride).where(Ride.id == ride_id).values(seats_available=seats)
+        )
+
+
+async def _book(ride_id, user_id, seats, gate, outcomes, latencies, booking_ids):
+    async with gate:
+        started = time.perf_counter()
+        try:
+            async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                booking, _ = await book_seats(session, ride_id, user_id, seats)
+            booking_ids.append(booking.id)
+            outcomes["booked"] += 1
+        except HTTPException as e:
+            outcomes[{409: "sold_out", 503: "busy"}.get(e.status_code, e.detail)] += 1
+        except Exception as e:
+            outcomes[type(e).__name__] += 1
+        latencies.append(time.perf_counter() - started)
+
+
+def _percentile(values, pct):
+    return statistics.quantiles(values, n=100)[pct - 1] * 1000 if len(values) > 1 else 0
+
+
+async def run_round(args, concurrency: int) -> bool:
+    await _set_seats(args.ride_id, args.stock)
+    outcomes, latencies, booking_ids = Counter(), [], []
+    gate = asyncio.Semaphore(concurrency)
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _book(
+                args.ride_id,
+                args.user_id,
+                args.seats,
+                gate,
+                outcomes,
+                latencies,
+                booking_ids,
+            )
+            for _ in range(args.requests)
+        )
+    )
+    elapsed = time.perf_counter() - started
+
+    left = await _seats(args.ride_id)
+    booked_seats = outcomes["booked"] * args.seats
+    consistent = left >= 0 and booked_seats == args.stock - left
+    print(
+        f"concurrency={concurrency:<4} {args.requests / elapsed:8.0f} req/s  "
+        f"{outcomes['booked'] / elapsed:8.0f} bookings/s  "
+        f"p50={_percentile(latencies, 50):6.1f}ms "
+        f"p95={_percentile(latencies, 95):6.1f}ms "
+        f"p99={_percentile(latencies, 99):6.1f}ms  "
+        f"{dict(outcomes)}  seats left={left}  "
+        f"{'OK' if consistent else 'OVERSOLD/INCONSISTENT'}"
+    )
+
+    async with async_engine.begin() as conn:
+        await conn.execute(delete(Booking).where(Booking.id.in_(booking_ids)))
+    return consistent
+
+
+async def main(args) -> int:
+    levels = [int(level) for level in args.concurrency.split(",")]
+    if max(levels) > DB_POOL_SIZE + DB_MAX_OVERFLOW:
+        print(
+            f"note: only {DB_POOL_SIZE + DB_MAX_OVERFLOW} pooled connections, "
+            "higher concurrency queues on the pool (DB_POOL_SIZE/DB_MAX_OVERFLOW)"
+        )
+
+    original = await _seats(args.ride_id)
+    try:
+        results = [await run_round(args, level) for level in levels]
+    finally:
+        await _set_seats(args.ride_id, original)
+        await async_engine.dispose()
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--ride-id", type=int, required=True)
+    parser.add_argument("--user-id", type=int, required=True, help="Who books")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument(
+        "--concurrency", default="1,10,30", help="Comma separated levels"
+    )
+    parser.add_argument("--seats", type=int, default=1, help="Seats per booking")
+    parser.add_argument(
+        "--stock",
+        type=int,
+        default=1000,
+        help="seats_available at the start of each round (keep it below "
+        "--requests * --seats to also exercise sold out)",
+    )
+    sys.exit(asyncio.run(main(parser.parse_args())))
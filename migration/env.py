@@ -2,8 +2,9 @@ from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
+from sqlalchemy import text
 from sqlmodel import SQLModel
-from src.config import DATABASE_URL
+from src.config import DATABASE_URL, RIDE_ARCHIVE_SCHEMA
 from src.api import models
 from alembic import context
 
@@ -29,6 +30,42 @@ target_metadata = SQLModel.metadata
 # ... etc.
 
 
+def partition_tables(connection) -> set[str]:
+    """
+    Partitions (rides_y2025m01, rides_default, ...) are created by
+    src/lib/partitions.py, not by models: autogenerate must not drop them.
+    """
+    rows = connection.execute(
+        text(
+            "SELECT relname FROM pg_class WHERE relispartition AND relkind IN ('r', 'p')"
+        )
+    )
+    return {name for (name,) in rows}
+
+
+# Created with raw SQL, no model (rate_limits: src/lib/rate_limit.py)
+UNMANAGED_TABLES = {"rate_limits"}
+
+
+def include_name_filter(connection):
+    # Only autogenerate calls the filter. Querying before the migration
+    # transaction would leave alembic inside a transaction it never commits.
+    partitions = None
+
+    def include_name(name, type_, parent_names):
+        nonlocal partitions
+        if type_ == "schema":
+            # detached months live in the archive schema
+            return name != RIDE_ARCHIVE_SCHEMA
+        if type_ == "table":
+            if partitions is None:
+                partitions = partition_tables(connection)
+            return name not in partitions and name not in UNMANAGED_TABLES
+        return True
+
+    return include_name
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -67,7 +104,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name_filter(connection),
+        )
 
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,71 @@
+"""ride geo columns
+
+Revision ID: 1f6bee69e9e5
+Revises: 121562881b10
+Create Date: 2026-10-18 09:20:11.402331
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "1f6bee69e9e5"
+down_revision: Union[str, Sequence[str], None] = "121562881b10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _coordinate_sql(column: str, index: int) -> str:
+    # GeoJSON coordinates are [longitude, latitude]
+    return f"((({column} -> 'coordinates') ->> {index}))::double precision"
+
+
+GEO_COLUMNS = {
+    "from_lat": _coordinate_sql("from_location", 1),
+    "from_lng": _coordinate_sql("from_location", 0),
+    "to_lat": _coordinate_sql("to_location", 1),
+    "to_lng": _coordinate_sql("to_location", 0),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # STORED generated columns are computed for every existing row while the
+    # table is rewritten, so this is also the backfill
+    for name, expression in GEO_COLUMNS.items():
+        op.add_column(
+            "rides",
+            sa.Column(
+                name,
+                sa.Float(),
+                sa.Computed(expression, persisted=True),
+                nullable=True,
+            ),
+        )
+
+    # Build the indexes without blocking writes on a large table
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_rides_from_lat_lng",
+            "rides",
+            ["from_lat", "from_lng"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_rides_to_lat_lng",
+            "rides",
+            ["to_lat", "to_lng"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_rides_to_lat_lng", table_name="rides")
+    op.drop_index("ix_rides_from_lat_lng", table_name="rides")
+    for name in reversed(list(GEO_COLUMNS)):
+        op.drop_column("rides", name)
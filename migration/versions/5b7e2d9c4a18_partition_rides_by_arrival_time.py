@@ -0,0 +1,128 @@
+"""partition rides by arrival_time
+
+Revision ID: 5b7e2d9c4a18
+Revises: c092b362cee3
+Create Date: 2026-10-18 13:20:41.503127
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "5b7e2d9c4a18"
+down_revision: Union[str, Sequence[str], None] = "c092b362cee3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Months created ahead of now(), src/lib/partitions.py keeps extending them
+MONTHS_AHEAD = 3
+
+
+def _copy_columns(table: str) -> str:
+    # Generated columns (geo, search) are recomputed on insert, never copied
+    columns = sa.inspect(op.get_bind()).get_columns(table)
+    return ", ".join(f'"{c["name"]}"' for c in columns if "computed" not in c)
+
+
+def _create_indexes() -> None:
+    # Indexes on a partitioned table cascade to every partition (present and
+    # future). CONCURRENTLY isn't supported there, the new table is not live yet.
+    op.create_index(op.f("ix_rides_from_address"), "rides", ["from_address"])
+    op.create_index(op.f("ix_rides_to_address"), "rides", ["to_address"])
+    op.create_index(op.f("ix_rides_car_type"), "rides", ["car_type"])
+    op.create_index("ix_rides_from_lat_lng", "rides", ["from_lat", "from_lng"])
+    op.create_index("ix_rides_to_lat_lng", "rides", ["to_lat", "to_lng"])
+    op.create_index(
+        "ix_rides_search_text_trgm",
+        "rides",
+        ["search_text"],
+        postgresql_using="gin",
+        postgresql_ops={"search_text": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_rides_search_vector",
+        "rides",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = _copy_columns("rides")
+
+    # Same columns, defaults (nextval('rides_id_seq')) and generated expressions
+    op.execute("""
+        CREATE TABLE rides_partitioned (
+            LIKE rides INCLUDING DEFAULTS INCLUDING GENERATED
+        ) PARTITION BY RANGE (arrival_time)
+        """)
+
+    # One partition per month from the oldest ride to MONTHS_AHEAD from now,
+    # anything later lands in rides_default until maintenance creates its month
+    op.execute(f"""
+        DO $$
+        DECLARE
+            m date;
+        BEGIN
+            FOR m IN
+                SELECT generate_series(
+                    date_trunc('month', LEAST(
+                        (SELECT min(arrival_time) FROM rides), now()::timestamp
+                    )),
+                    date_trunc('month', now()::timestamp)
+                        + interval '{MONTHS_AHEAD} months',
+                    interval '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF rides_partitioned '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    'rides_' || to_char(m, '"y"YYYY"m"MM'),
+                    m,
+                    (m + interval '1 month')::date
+                );
+            END LOOP;
+        END $$
+        """)
+    op.execute("CREATE TABLE rides_default PARTITION OF rides_partitioned DEFAULT")
+
+    op.execute(f"INSERT INTO rides_partitioned ({columns}) SELECT {columns} FROM rides")
+
+    # Keep the id sequence: it is owned by rides.id and would go with the table
+    op.execute("ALTER SEQUENCE rides_id_seq OWNED BY NONE")
+    op.drop_table("rides")
+    op.rename_table("rides_partitioned", "rides")
+    op.execute("ALTER SEQUENCE rides_id_seq OWNED BY rides.id")
+
+    # A unique constraint on a partitioned table must contain the partition key
+    op.create_primary_key("rides_pkey", "rides", ["id", "arrival_time"])
+    op.create_foreign_key("rides_user_id_fkey", "rides", "users", ["user_id"], ["id"])
+    _create_indexes()
+    # Sorting/ranging on the partition key within a month
+    op.create_index(op.f("ix_rides_arrival_time"), "rides", ["arrival_time"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Partitions already moved to the archive schema are not brought back
+    columns = _copy_columns("rides")
+
+    op.execute("""
+        CREATE TABLE rides_plain (
+            LIKE rides INCLUDING DEFAULTS INCLUDING GENERATED
+        )
+        """)
+    op.execute(f"INSERT INTO rides_plain ({columns}) SELECT {columns} FROM rides")
+
+    op.execute("ALTER SEQUENCE rides_id_seq OWNED BY NONE")
+    op.drop_table("rides")  # drops every attached partition with it
+    op.rename_table("rides_plain", "rides")
+    op.execute("ALTER SEQUENCE rides_id_seq OWNED BY rides.id")
+
+    op.create_primary_key("rides_pkey", "rides", ["id"])
+    op.create_foreign_key("rides_user_id_fkey", "rides", "users", ["user_id"], ["id"])
+    _create_indexes()
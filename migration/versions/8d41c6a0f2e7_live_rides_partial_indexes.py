@@ -0,0 +1,64 @@
+"""live rides partial indexes
+
+Revision ID: 8d41c6a0f2e7
+Revises: 5b7e2d9c4a18
+Create Date: 2026-10-18 14:05:12.774310
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "8d41c6a0f2e7"
+down_revision: Union[str, Sequence[str], None] = "5b7e2d9c4a18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# index name -> column, both WHERE active
+INDEXES = {
+    "ix_rides_active_arrival_time": "arrival_time",
+    "ix_rides_active_created_at": "created_at",
+}
+
+
+def _partitions() -> list[str]:
+    rows = op.get_bind().execute(sa.text("""
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'rides'::regclass
+            ORDER BY c.relname
+            """))
+    return [row[0] for row in rows]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX on a partitioned table can't be CONCURRENTLY and would lock
+    # every partition: create the parent index ON ONLY rides (invalid until
+    # complete), build each partition's index concurrently and attach it.
+    # Partitions created later get the index automatically.
+    for name, column in INDEXES.items():
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON ONLY rides ({column}) WHERE active"
+        )
+
+    partitions = _partitions()
+    with op.get_context().autocommit_block():
+        for name, column in INDEXES.items():
+            for partition in partitions:
+                child = f"{partition}_{name.removeprefix('ix_rides_')}_idx"
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} "
+                    f"ON {partition} ({column}) WHERE active"
+                )
+                op.execute(f"ALTER INDEX {name} ATTACH PARTITION {child}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # dropping the parent index drops the attached partition indexes
+    for name in INDEXES:
+        op.drop_index(name, table_name="rides")
@@ -0,0 +1,39 @@
+"""rate limits
+
+Revision ID: a7e5c3f19d04
+Revises: f4b8d2c61a93
+Create Date: 2026-10-18 16:48:30.652117
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "a7e5c3f19d04"
+down_revision: Union[str, Sequence[str], None] = "f4b8d2c61a93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Counters for RATE_LIMIT_BACKEND=postgres (src/lib/rate_limit.py).
+    # UNLOGGED: no WAL per hit, losing the counters in a crash is harmless.
+    # Times are epoch seconds, tokens is the bucket level or the window count.
+    op.execute("""
+        CREATE UNLOGGED TABLE rate_limits (
+            key text PRIMARY KEY,
+            tokens double precision NOT NULL,
+            stamp double precision NOT NULL,
+            allowed boolean NOT NULL DEFAULT true,
+            expires_at double precision NOT NULL
+        )
+        """)
+    op.create_index("ix_rate_limits_expires_at", "rate_limits", ["expires_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("rate_limits")
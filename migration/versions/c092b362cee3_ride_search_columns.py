@@ -0,0 +1,85 @@
+"""ride search columns
+
+Revision ID: c092b362cee3
+Revises: 1f6bee69e9e5
+Create Date: 2026-10-18 11:02:47.118904
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "c092b362cee3"
+down_revision: Union[str, Sequence[str], None] = "1f6bee69e9e5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_FIELDS = ["from_address", "to_address", "car_number", "car_name", "car_model"]
+SEARCH_TEXT_SQL = " || ' ' || ".join(f"coalesce({f}, '')" for f in SEARCH_FIELDS)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Generated (STORED) -> filled for existing rows and kept in sync by Postgres
+    op.add_column(
+        "rides",
+        sa.Column(
+            "search_text",
+            sa.Text(),
+            sa.Computed(SEARCH_TEXT_SQL, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.add_column(
+        "rides",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                f"to_tsvector('simple'::regconfig, {SEARCH_TEXT_SQL})",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_rides_search_text_trgm",
+            "rides",
+            ["search_text"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_rides_search_vector",
+            "rides",
+            ["search_vector"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            op.f("ix_rides_car_type"),
+            "rides",
+            ["car_type"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_rides_car_type"), table_name="rides")
+    op.drop_index("ix_rides_search_vector", table_name="rides")
+    op.drop_index("ix_rides_search_text_trgm", table_name="rides")
+    op.drop_column("rides", "search_vector")
+    op.drop_column("rides", "search_text")
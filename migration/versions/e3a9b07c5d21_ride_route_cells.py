@@ -0,0 +1,99 @@
+"""ride route cells
+
+Revision ID: e3a9b07c5d21
+Revises: 8d41c6a0f2e7
+Create Date: 2026-10-18 15:12:09.318842
+
+"""
+
+import math
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "e3a9b07c5d21"
+down_revision: Union[str, Sequence[str], None] = "8d41c6a0f2e7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same grid as the app (RIDE_ROUTE_CELL_DEG), the rasterizer is copied here
+# so this revision doesn't change with src/api/core/operation/corridor.py
+CELL_DEG = float(os.getenv("RIDE_ROUTE_CELL_DEG", 0.05))
+
+
+def route_cells(points):
+    """[(cell_lat, cell_lng, seq)] the route passes through, in route order."""
+    seen = {}
+
+    def visit(point):
+        cell = (math.floor(point[0] / CELL_DEG), math.floor(point[1] / CELL_DEG))
+        seen.setdefault(cell, len(seen))
+
+    for start, end in zip(points, points[1:]):
+        # steps of half a cell so no crossed cell is skipped
+        span = max(abs(end[0] - start[0]), abs(end[1] - start[1]))
+        steps = max(1, math.ceil(span / (CELL_DEG / 2)))
+        for step in range(steps):
+            t = step / steps
+            visit(
+                (start[0] + (end[0] - start[0]) * t, start[1] + (end[1] - start[1]) * t)
+            )
+    if points:
+        visit(points[-1])
+    return [(lat, lng, seq) for (lat, lng), seq in seen.items()]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("rides", sa.Column("route_polyline", sa.Text(), nullable=True))
+    op.create_table(
+        "ride_route_cells",
+        sa.Column("ride_id", sa.Integer(), nullable=False),
+        sa.Column("cell_lat", sa.Integer(), nullable=False),
+        sa.Column("cell_lng", sa.Integer(), nullable=False),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("ride_id", "cell_lat", "cell_lng"),
+    )
+    op.create_index(
+        "ix_ride_route_cells_cell",
+        "ride_route_cells",
+        ["cell_lat", "cell_lng", "seq"],
+        unique=False,
+    )
+
+    # Existing live rides have no polyline: index their straight line
+    bind = op.get_bind()
+    rides = bind.execute(
+        sa.text(
+            "SELECT id, from_lat, from_lng, to_lat, to_lng FROM rides "
+            "WHERE active AND from_lat IS NOT NULL AND to_lat IS NOT NULL"
+        )
+    )
+    cells_table = sa.table(
+        "ride_route_cells",
+        sa.column("ride_id"),
+        sa.column("cell_lat"),
+        sa.column("cell_lng"),
+        sa.column("seq"),
+    )
+    batch = []
+    for ride in rides:
+        points = [(ride.from_lat, ride.from_lng), (ride.to_lat, ride.to_lng)]
+        batch.extend(
+            {"ride_id": ride.id, "cell_lat": lat, "cell_lng": lng, "seq": seq}
+            for lat, lng, seq in route_cells(points)
+        )
+        if len(batch) >= 5000:
+            op.bulk_insert(cells_table, batch)
+            batch = []
+    if batch:
+        op.bulk_insert(cells_table, batch)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_ride_route_cells_cell", table_name="ride_route_cells")
+    op.drop_table("ride_route_cells")
+    op.drop_column("rides", "route_polyline")
@@ -0,0 +1,62 @@
+"""bookings
+
+Revision ID: f4b8d2c61a93
+Revises: e3a9b07c5d21
+Create Date: 2026-10-18 16:02:47.190528
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+revision: str = "f4b8d2c61a93"
+down_revision: Union[str, Sequence[str], None] = "e3a9b07c5d21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "bookings",
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("ride_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("seats", sa.Integer(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("confirmed", "cancelled", name="bookingstatus"),
+            nullable=False,
+        ),
+        sa.Column(
+            "idempotency_key",
+            sqlmodel.sql.sqltypes.AutoString(length=64),
+            nullable=True,
+        ),
+        sa.Column("cancelled_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "user_id", "idempotency_key", name="uq_bookings_user_idempotency_key"
+        ),
+    )
+    op.create_index("ix_bookings_ride_id", "bookings", ["ride_id"], unique=False)
+    op.create_index(
+        "ix_bookings_user_id_created_at",
+        "bookings",
+        ["user_id", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_bookings_user_id_created_at", table_name="bookings")
+    op.drop_index("ix_bookings_ride_id", table_name="bookings")
+    op.drop_table("bookings")
+    sa.Enum(name="bookingstatus").drop(op.get_bind(), checkfirst=True)
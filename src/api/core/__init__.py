@@ -1,7 +1,10 @@
-from .operation import updateOp, listop, listRecords
+from .operation import updateOp, listop, listRecords, alistop, alistRecords
 from .response import api_response, raiseExceptions
 from .dependencies import (
     GetSession,
+    GetAsyncSession,
+    GetReadSession,
+    GetAsyncReadSession,
     requireSignin,
     verifiedUser,
     requirePermission,
@@ -12,6 +15,9 @@ from .dependencies import (
 
 __all__ = [
     "GetSession",
+    "GetAsyncSession",
+    "GetReadSession",
+    "GetAsyncReadSession",
     "requireSignin",
     "verifiedUser",
     "requirePermission",
@@ -22,4 +28,6 @@ __all__ = [
     "updateOp",
     "listop",
     "listRecords",
+    "alistop",
+    "alistRecords",
 ]
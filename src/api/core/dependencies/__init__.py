@@ -2,9 +2,15 @@ from typing import Annotated, Any, Dict, Optional
 
 from fastapi import Depends, Query
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.api.core.dependencies.query_params import list_query_params
-from src.lib.db_con import get_session
+from src.lib.db_con import (
+    get_async_read_session,
+    get_async_session,
+    get_read_session,
+    get_session,
+)
 from src.api.core.security import (
     is_authenticated,
     require_permission,
@@ -15,6 +21,10 @@ from src.api.core.security import (
 
 
 GetSession = Annotated[Session, Depends(get_session)]
+GetAsyncSession = Annotated[AsyncSession, Depends(get_async_session)]
+# Read-only routes: replica when healthy and not lagging, otherwise primary
+GetReadSession = Annotated[Session, Depends(get_read_session)]
+GetAsyncReadSession = Annotated[AsyncSession, Depends(get_async_read_session)]
 
 requireSignin = Annotated[dict, Depends(require_signin)]
 requireAdmin = Annotated[dict, Depends(require_admin)]
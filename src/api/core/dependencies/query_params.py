@@ -13,6 +13,9 @@ class list_query_params:
             None, description="Example : ['amount', 0, 100000]"
         ),
         searchTerm: str | None = Query(None, description="Search term"),
+        searchRank: bool = Query(
+            False, description="Order searchTerm results by relevance"
+        ),
         columnFilters: Optional[str] = Query(
             None, description='Example : [["name","car"],["description","product"]]'
         ),
@@ -29,14 +32,32 @@ class list_query_params:
         sort: Optional[str] = Query(
             None, description="Example : ['created_at|price','asc|desc']"
         ),
+        withTotal: bool = Query(
+            True, description="Set false to skip counting the total rows"
+        ),
+        fields: Optional[str] = Query(
+            None, description="Only return these fields. Example : id,from_location"
+        ),
+        cursor: Optional[str] = Query(
+            None,
+            description="Keyset pagination: send an empty cursor for the first page, then next_cursor",
+        ),
+        include: Optional[str] = Query(
+            None, description="Embed related records. Example : user"
+        ),
     ):
         self.dateRange = dateRange
         self.skip = skip
         self.limit = limit
         self.searchTerm = searchTerm
+        self.searchRank = searchRank
         self.columnFilters = columnFilters
         self.stringArrayFilters = stringArrayFilters
         self.objectArrayFilters = objectArrayFilters
         self.page = page
         self.numberRange = numberRange
         self.sort = sort
+        self.withTotal = withTotal
+        self.fields = fields
+        self.cursor = cursor
+        self.include = include
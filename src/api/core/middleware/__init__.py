@@ -1,4 +1,11 @@
 from .decorator import handle_async_wrapper
 from .error_handling import register_exception_handlers
+from .rate_limit import RateLimitMiddleware
+from .sql_stats import SQLStatsMiddleware
 
-__all__ = ["handle_async_wrapper", "register_exception_handlers"]
+__all__ = [
+    "handle_async_wrapper",
+    "register_exception_handlers",
+    "RateLimitMiddleware",
+    "SQLStatsMiddleware",
+]
@@ -0,0 +1,246 @@
+import hashlib
+import ipaddress
+import json
+import logging
+import math
+import time
+from collections import Counter, defaultdict
+from typing import Literal, NamedTuple, Optional
+
+from fastapi.responses import JSONResponse
+
+from src.api.core.security import is_authenticated
+from src.config import RATE_LIMIT_MAX_BODY, RATE_LIMIT_TRUSTED_PROXIES
+from src.lib.rate_limit import MemoryBackend, RateLimitBackend, RateLimitResult
+
+logger = logging.getLogger(__name__)
+
+
+class RatePolicy(NamedTuple):
+    name: str
+    method: str
+    path: str  # exact route path, without the /api root path
+    limit: int  # hits ...
+    window: float  # ... per this many seconds
+    algorithm: Literal["token_bucket", "sliding_window"] = "token_bucket"
+    # ip | user (JWT user id, ip for guests) | identifier (JSON body field)
+    # | identifier_ip (body field + client IP)
+    key: Literal["ip", "user", "identifier", "identifier_ip"] = "ip"
+    field: Optional[str] = None  # body field for the identifier keys
+
+
+# The expensive endpoints: bcrypt (login/register), SMTP (emails, OTPs),
+# PIL (uploads), plus the OTP checks that could be brute forced.
+# Per-IP limits stop one client, per-identifier ones stop many IPs going
+# after one account. Login is per (identifier, IP): rejected hits count too,
+# so a per-account window would let anyone lock a victim out of /login.
+RATE_LIMIT_POLICIES = [
+    RatePolicy("login_ip", "POST", "/login", 10, 60),
+    RatePolicy(
+        "login_account", "POST", "/login", 5, 300, "sliding_window",
+        "identifier_ip", "identifier",
+    ),
+    RatePolicy("register_ip", "POST", "/register", 10, 3600, "sliding_window"),
+    RatePolicy(
+        "register_email", "POST", "/register", 3, 3600, "sliding_window",
+        "identifier", "email",
+    ),
+    RatePolicy("send_email_ip", "POST", "/send-email", 5, 600),
+    RatePolicy(
+        "send_email_email", "POST", "/send-email", 3, 600, "sliding_window",
+        "identifier", "email",
+    ),
+    RatePolicy("reset_password_ip", "POST", "/reset-password", 10, 600),
+    RatePolicy(
+        "reset_password_email", "POST", "/reset-password", 5, 600,
+        "sliding_window", "identifier", "email",
+    ),
+    RatePolicy("email_otp_ip", "POST", "/verify/send-email-otp", 5, 600),
+    RatePolicy(
+        "email_otp_email", "POST", "/verify/send-email-otp", 3, 600,
+        "sliding_window", "identifier", "email",
+    ),
+    RatePolicy(
+        "verify_email_otp", "POST", "/verify/verify-email", 5, 600,
+        "sliding_window", "identifier", "email",
+    ),
+    RatePolicy("media_upload", "POST", "/media/create", 30, 60, key="user"),
+]  # fmt: skip
+
+_stats: dict[str, Counter] = defaultdict(Counter)
+
+
+def rate_limit_stats() -> dict:
+    return {name: dict(counts) for name, counts in _stats.items()}
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def _read_body(receive) -> tuple[bytes, list]:
+    # Buffer the request body once, the app then gets the same messages back
+    messages, body = [], b""
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            break
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    return body, messages
+
+
+_trusted_proxies = [
+    ipaddress.ip_network(proxy, strict=False) for proxy in RATE_LIMIT_TRUSTED_PROXIES
+]
+
+
+def _trusted(ip: str) -> bool:
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return any(address in network for network in _trusted_proxies)
+
+
+def _client_ip(scope) -> str:
+    client = scope.get("client")
+    ip = client[0] if client else "unknown"
+    if not _trusted(ip):
+        return ip
+    # Behind trusted proxies: the client is the last X-Forwarded-For hop
+    # they didn't add themselves (earlier hops can be forged by the client)
+    forwarded = _header(scope, b"x-forwarded-for")
+    for hop in reversed((forwarded or "").split(",")):
+        hop = hop.strip()
+        if hop and not _trusted(hop):
+            return hop
+    return ip
+
+
+def _identifier(body: bytes, field: str) -> Optional[str]:
+    if not body or len(body) > RATE_LIMIT_MAX_BODY:
+        return None
+    try:
+        value = json.loads(body).get(field)
+    except (ValueError, AttributeError):
+        return None
+    if not isinstance(value, str) or not value.strip():
+        return None
+    # emails/phones are not stored as is in a shared backend
+    return hashlib.sha256(value.strip().lower().encode()).hexdigest()[:32]
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware applying RATE_LIMIT_POLICIES before the route runs.
+    Over the limit -> 429 with Retry-After; allowed responses carry
+    X-RateLimit-Limit / X-RateLimit-Remaining for the tightest policy.
+    A failing backend lets requests through (counted as errors).
+    """
+
+    def __init__(
+        self,
+        app,
+        policies: list[RatePolicy] = RATE_LIMIT_POLICIES,
+        backend: Optional[RateLimitBackend] = None,
+    ):
+        self.app = app
+        self.backend = backend or MemoryBackend()
+        self.routes: dict[tuple[str, str], list[RatePolicy]] = defaultdict(list)
+        for policy in policies:
+            self.routes[(policy.method, policy.path)].append(policy)
+
+    def _path(self, scope) -> str:
+        path, root = scope.get("path", ""), scope.get("root_path", "")
+        if root and path.startswith(root):
+            path = path[len(root) :]
+        return path.rstrip("/") or "/"
+
+    def _key(self, policy: RatePolicy, scope, body: bytes) -> str:
+        value = None
+        if policy.key in ("identifier", "identifier_ip"):
+            value = _identifier(body, policy.field)
+            if value is not None and policy.key == "identifier_ip":
+                value = f"{value}:ip:{_client_ip(scope)}"
+        elif policy.key == "user":
+            user = is_authenticated(_header(scope, b"authorization"))
+            value = user and user.get("id") and f"user:{user['id']}"
+        if value is None:
+            # guests / no identifier in the body: fall back to the client IP
+            value = f"ip:{_client_ip(scope)}"
+        return f"rl:{policy.name}:{value}"
+
+    async def _hit(self, policy: RatePolicy, key: str) -> Optional[RateLimitResult]:
+        check = (
+            self.backend.sliding_window
+            if policy.algorithm == "sliding_window"
+            else self.backend.token_bucket
+        )
+        try:
+            result = await check(key, policy.limit, policy.window, time.time())
+        except Exception:
+            _stats[policy.name]["errors"] += 1
+            logger.exception("Rate limit backend failed, letting request through")
+            return None
+        _stats[policy.name]["allowed" if result.allowed else "limited"] += 1
+        return result
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        policies = self.routes.get((scope["method"], self._path(scope)))
+        if not policies:
+            return await self.app(scope, receive, send)
+
+        body = b""
+        if any(policy.field for policy in policies):
+            body, messages = await _read_body(receive)
+            original_receive = receive
+
+            async def receive():
+                return messages.pop(0) if messages else await original_receive()
+
+        tightest = None  # (policy, result) with the fewest hits left
+        for policy in policies:
+            result = await self._hit(policy, self._key(policy, scope, body))
+            if result is None:
+                continue
+            if not result.allowed:
+                retry_after = max(1, math.ceil(result.retry_after))
+                response = JSONResponse(
+                    status_code=429,
+                    content={
+                        "detail": f"Too many requests, retry in {retry_after} seconds"
+                    },
+                    headers={
+                        "Retry-After": str(retry_after),
+                        "X-RateLimit-Limit": str(policy.limit),
+                        "X-RateLimit-Remaining": "0",
+                    },
+                )
+                return await response(scope, receive, send)
+            if tightest is None or result.remaining < tightest[1].remaining:
+                tightest = (policy, result)
+
+        if tightest is None:
+            return await self.app(scope, receive, send)
+
+        policy, result = tightest
+
+        async def send_with_limits(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-ratelimit-limit", str(policy.limit).encode()))
+                headers.append(
+                    (b"x-ratelimit-remaining", str(result.remaining).encode())
+                )
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_limits)
@@ -0,0 +1,39 @@
+from src.lib.sql_monitor import end_request, report_request, start_request
+
+
+class SQLStatsMiddleware:
+    """
+    Pure ASGI middleware: collects the SQL run for each request.
+    - request.state.sql -> RequestSQLStats (count, total time, slowest)
+    - Server-Timing / X-DB-Queries response headers
+    - repeated identical statements are logged as likely N+1
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats, token = start_request()
+        scope.setdefault("state", {})["sql"] = stats
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode()))
+                headers.append(
+                    (
+                        b"server-timing",
+                        f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries"'.encode(),
+                    )
+                )
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            end_request(token)
+            report_request(stats, scope.get("method", ""), scope.get("path", ""))
@@ -1,14 +1,30 @@
 from sqlalchemy.exc import DataError
 from datetime import datetime, timezone
+import json
 from fastapi import Query
 from sqlalchemy import ScalarResult
-from sqlmodel import Session, SQLModel, select
-from typing import List, Optional
-from src.lib.db_con import get_session
+from sqlmodel import Session, SQLModel, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Literal, Optional
+from src.config import LIST_COUNT_ESTIMATE_THRESHOLD
 
 from src.api.core.response import api_response
+from src.api.core.serialization import validate_list
+from src.api.core.utility import parse_list
+from src.api.core.operation.eager import include_schema, load_options, related_tables
+from src.api.core.operation.fields import select_fields
+from src.api.core.operation.list_cache import (
+    acached_response,
+    cached_response,
+    fill_session,
+    list_cache_key,
+)
 from src.api.core.operation.list_operation_helper import (
     applyFilters,
+    apply_keyset,
+    keyset_column,
+    next_cursor,
+    parse_sort,
 )
 
 
@@ -66,24 +82,95 @@ def _exec(session, statement, Model):
             return result.all()
 
 
-def listop(
-    session: Session,
+async def _aexec(session: AsyncSession, statement, Model):
+    result = await session.exec(statement)
+    if isinstance(result, ScalarResult):
+        return result.all()
+    try:
+        return result.scalars().all()
+    except Exception:
+        return result.all()
+
+
+# "exact"     -> SELECT count(*) over the filtered rows
+# "estimated" -> planner estimate, falls back to exact for small result sets
+# "off"       -> no total at all (infinite scroll clients)
+TotalMode = Literal["exact", "estimated", "off"]
+
+DEFAULT_SORT = '["created_at", "desc"]'
+
+
+def _count_statement(statement):
+    # ORDER BY only costs time here, the count does not depend on it
+    return select(func.count()).select_from(statement.order_by(None).subquery())
+
+
+def _explain_statement(statement, dialect):
+    """EXPLAIN (FORMAT JSON) sql + driver params for psycopg2 and asyncpg."""
+    compiled = statement.order_by(None).compile(
+        dialect=dialect,
+        compile_kwargs={"render_postcompile": True},
+    )
+    params = compiled.params
+    if compiled.positional:  # asyncpg: $1, $2 ... take a tuple
+        params = tuple(params[name] for name in compiled.positiontup)
+    return f"EXPLAIN (FORMAT JSON) {compiled}", params
+
+
+def _plan_rows(plan) -> int:
+    if isinstance(plan, str):  # driver without a json codec
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _estimate_count(session, statement) -> int:
+    """Row estimate from the Postgres planner (EXPLAIN) — no rows are read."""
+    sql, params = _explain_statement(statement, session.get_bind().dialect)
+    return _plan_rows(session.connection().exec_driver_sql(sql, params).scalar())
+
+
+async def _aestimate_count(session: AsyncSession, statement) -> int:
+    sql, params = _explain_statement(statement, session.get_bind().dialect)
+    connection = await session.connection()
+    return _plan_rows((await connection.exec_driver_sql(sql, params)).scalar())
+
+
+def _count_total(session, statement, totalMode: TotalMode = "exact"):
+    if totalMode == "off":
+        return None
+
+    if totalMode == "estimated":
+        estimate = _estimate_count(session, statement)
+        # Estimates are only "good enough" once the result set is large
+        if estimate >= LIST_COUNT_ESTIMATE_THRESHOLD:
+            return estimate
+
+    return session.scalar(_count_statement(statement))
+
+
+async def _acount_total(session: AsyncSession, statement, totalMode: TotalMode):
+    if totalMode == "off":
+        return None
+
+    if totalMode == "estimated":
+        estimate = await _aestimate_count(session, statement)
+        if estimate >= LIST_COUNT_ESTIMATE_THRESHOLD:
+            return estimate
+
+    return await session.scalar(_count_statement(statement))
+
+
+def _list_statement(
     Model: type[SQLModel],
     filters: dict[str, any],
     searchFields: List[str],
     join_options: list = [],
-    page: int = None,
-    skip: int = 0,
-    limit: int = Query(10, ge=1, le=200),
     Statement=None,
     otherFilters=None,
     sort=None,
+    cursor: Optional[str] = None,
 ):
-
-    # Compute skip based on page
-    if page is not None and page > 0:
-        skip = (page - 1) * limit
-
+    """Filtered + sorted statement shared by listop and alistop (no paging)."""
     # ✅ Fix: avoid boolean check on SQLAlchemy statements
     statement = Statement if Statement is not None else select(Model)
 
@@ -93,13 +180,7 @@ def listop(
             statement = statement.options(option)
 
     searchTerm = filters.get("searchTerm")
-    columnFilters = filters.get("columnFilters")
-    dateRange = filters.get("dateRange")
-    numberRange = filters.get("numberRange")
-    customFilters = filters.get("customFilters")
-    stringArrayFilters = filters.get("stringArrayFilters")
-    objectArrayFilters = filters.get("objectArrayFilters")
-    geoFilters = filters.get("geoFilters")
+    searchRank = filters.get("searchRank", False)
 
     # Apply Filters
     statement = applyFilters(
@@ -107,30 +188,159 @@ def listop(
         Model=Model,
         searchTerm=searchTerm,
         searchFields=searchFields,
-        columnFilters=columnFilters,
-        dateRange=dateRange,
-        numberRange=numberRange,
-        customFilters=customFilters,
+        columnFilters=filters.get("columnFilters"),
+        dateRange=filters.get("dateRange"),
+        numberRange=filters.get("numberRange"),
+        customFilters=filters.get("customFilters"),
         otherFilters=otherFilters,
-        sort=sort if sort else '["created_at", "desc"]',
-        stringArrayFilters=stringArrayFilters,
-        objectArrayFilters=objectArrayFilters,
-        geoFilters=geoFilters,
+        sort=sort,
+        stringArrayFilters=filters.get("stringArrayFilters"),
+        objectArrayFilters=filters.get("objectArrayFilters"),
+        geoFilters=filters.get("geoFilters"),
+        searchRank=searchRank,
+    )
+
+    # Cursor mode: cursor="" is the first page, afterwards the returned next_cursor
+    if cursor is not None:
+        keyset_column(Model, sort)  # validate before touching the DB
+        if searchRank and searchTerm:
+            return api_response(400, "searchRank can't be combined with a cursor")
+        if cursor:
+            statement = apply_keyset(statement, Model, sort, cursor)
+
+    return statement
+
+
+def _cursor_page(results, Model, sort, limit: int) -> dict:
+    # One extra row was fetched to tell whether another page exists
+    has_more = len(results) > limit
+    results = results[:limit]
+    return {
+        "data": results,
+        "total": None,
+        "next_cursor": next_cursor(results, Model, sort) if has_more else None,
+    }
+
+
+def listop(
+    session: Session,
+    Model: type[SQLModel],
+    filters: dict[str, any],
+    searchFields: List[str],
+    join_options: list = [],
+    page: int = None,
+    skip: int = 0,
+    limit: int = Query(10, ge=1, le=200),
+    Statement=None,
+    otherFilters=None,
+    sort=None,
+    totalMode: TotalMode = "exact",
+    cursor: Optional[str] = None,
+):
+    sort = sort if sort else DEFAULT_SORT
+
+    # Compute skip based on page
+    if page is not None and page > 0:
+        skip = (page - 1) * limit
+
+    statement = _list_statement(
+        Model,
+        filters,
+        searchFields,
+        join_options,
+        Statement,
+        otherFilters,
+        sort,
+        cursor,
     )
 
-    # Total count (before pagination)
-    total = _exec(session, statement, Model)
-    total_count = len(total)
+    if cursor is not None:
+        results = _exec(session, statement.limit(limit + 1), Model)
+        return _cursor_page(results, Model, sort, limit)
+
+    # Total count (before pagination) — counted in SQL, rows are never loaded
+    total_count = _count_total(session, statement, totalMode)
 
     # Now apply pagination (skip/limit)
     paginated_stmt = statement.offset(skip).limit(limit)
     results = _exec(session, paginated_stmt, Model)
 
-    print(results)
     return {"data": results, "total": total_count}
 
 
+async def alistop(
+    session: AsyncSession,
+    Model: type[SQLModel],
+    filters: dict[str, any],
+    searchFields: List[str],
+    join_options: list = [],
+    page: int = None,
+    skip: int = 0,
+    limit: int = 10,
+    Statement=None,
+    otherFilters=None,
+    sort=None,
+    totalMode: TotalMode = "exact",
+    cursor: Optional[str] = None,
+):
+    """
+    listop on an AsyncSession. Relationships are never lazy loaded here,
+    so nested Schema fields need a selectinload in join_options.
+    """
+    sort = sort if sort else DEFAULT_SORT
+
+    if page is not None and page > 0:
+        skip = (page - 1) * limit
+
+    statement = _list_statement(
+        Model,
+        filters,
+        searchFields,
+        join_options,
+        Statement,
+        otherFilters,
+        sort,
+        cursor,
+    )
+
+    if cursor is not None:
+        results = await _aexec(session, statement.limit(limit + 1), Model)
+        return _cursor_page(results, Model, sort, limit)
+
+    total_count = await _acount_total(session, statement, totalMode)
+    results = await _aexec(session, statement.offset(skip).limit(limit), Model)
+    return {"data": results, "total": total_count}
+
+
+def _cache_tables(Model, Schema, cacheTables) -> list[str]:
+    # Nested relationships are tracked automatically, cacheTables adds
+    # anything else the response depends on
+    return [Model.__tablename__, *related_tables(Model, Schema), *cacheTables]
+
+
+def _list_cache_key(
+    query_params,
+    searchFields,
+    Model,
+    Schema,
+    customFilters,
+    geo_filters,
+    totalMode,
+    tables,
+):
+    return list_cache_key(
+        f"list:{Model.__tablename__}:{Schema.__name__}",
+        tables,
+        query_params,
+        searchFields,
+        customFilters,
+        geo_filters,
+        totalMode,
+    )
+
+
 def listRecords(
+    session: Session,
     query_params: dict,
     searchFields: list[str],
     Model,
@@ -141,67 +351,263 @@ def listRecords(
     geo_filters: Optional[List[List[str]]] = None,
     Statement=None,
     badStatusMsg: str = "No Result found",
+    totalMode: TotalMode = "exact",
+    cache: bool = False,
+    cacheTables: List[str] = [],
+    includes: dict = {},
 ):
-    session = next(get_session())  # get actual Session object
-    try:
-        # Extract params from query dict
-        dateRange = query_params.get("dateRange")
-        numberRange = query_params.get("numberRange")
-        searchTerm = query_params.get("searchTerm")
-        columnFilters = query_params.get("columnFilters")
-        stringArrayFilters = query_params.get("stringArrayFilters")
-        objectArrayFilters = query_params.get("objectArrayFilters")
-        page = int(query_params.get("page", 1))
-        skip = int(query_params.get("skip", 0))
-        limit = int(query_params.get("limit", 10))
-        sort = query_params.get("sort")
-
-        filters = {
-            "searchTerm": searchTerm,
-            "columnFilters": columnFilters,
-            "dateRange": dateRange,
-            "numberRange": numberRange,
-            "customFilters": customFilters,
-            "stringArrayFilters": stringArrayFilters,
-            "objectArrayFilters": objectArrayFilters,
-            "geoFilters": geo_filters,
-        }
+    # ?include=user -> the richer Schema the route registered for it
+    if Schema is not None:
+        Schema = include_schema(query_params, Schema, includes)
+
+    args = dict(
+        query_params=query_params,
+        searchFields=searchFields,
+        Model=Model,
+        customFilters=customFilters,
+        join_options=join_options,
+        Schema=Schema,
+        otherFilters=otherFilters,
+        geo_filters=geo_filters,
+        Statement=Statement,
+        badStatusMsg=badStatusMsg,
+        totalMode=totalMode,
+    )
+
+    # Only Schema responses are cacheable, and custom statements/filters
+    # can't be part of a key
+    if not cache or Schema is None or Statement is not None or otherFilters:
+        return _listRecords(session, **args)
+
+    tables = _cache_tables(Model, Schema, cacheTables)
+    key = _list_cache_key(
+        query_params,
+        searchFields,
+        Model,
+        Schema,
+        customFilters,
+        geo_filters,
+        totalMode,
+        tables,
+    )
+    return cached_response(
+        key, lambda: _listRecords(fill_session(session, tables), **args)
+    )
+
+
+async def alistRecords(
+    session: AsyncSession,
+    query_params: dict,
+    searchFields: list[str],
+    Model,
+    customFilters: Optional[List[List[str]]] = None,
+    join_options: list = [],
+    Schema: type[SQLModel] = None,
+    otherFilters=None,
+    geo_filters: Optional[List[List[str]]] = None,
+    Statement=None,
+    badStatusMsg: str = "No Result found",
+    totalMode: TotalMode = "exact",
+    cache: bool = False,
+    cacheTables: List[str] = [],
+    includes: dict = {},
+):
+    """listRecords on the request's AsyncSession (see GetAsyncSession)."""
+    # ?include=user -> the richer Schema the route registered for it
+    if Schema is not None:
+        Schema = include_schema(query_params, Schema, includes)
+
+    args = dict(
+        query_params=query_params,
+        searchFields=searchFields,
+        Model=Model,
+        customFilters=customFilters,
+        join_options=join_options,
+        Schema=Schema,
+        otherFilters=otherFilters,
+        geo_filters=geo_filters,
+        Statement=Statement,
+        badStatusMsg=badStatusMsg,
+        totalMode=totalMode,
+    )
+
+    if not cache or Schema is None or Statement is not None or otherFilters:
+        return await _alistRecords(session, **args)
+
+    tables = _cache_tables(Model, Schema, cacheTables)
+    key = _list_cache_key(
+        query_params,
+        searchFields,
+        Model,
+        Schema,
+        customFilters,
+        geo_filters,
+        totalMode,
+        tables,
+    )
+    return await acached_response(
+        key, lambda: _alistRecords(fill_session(session, tables), **args)
+    )
+
+
+def _list_request(
+    query_params: dict,
+    Model,
+    Schema,
+    customFilters,
+    join_options,
+    geo_filters,
+    totalMode: TotalMode,
+):
+    """query_params -> (listop kwargs, Schema) — shared by sync and async."""
+    page = int(query_params.get("page", 1))
+    skip = int(query_params.get("skip", 0))
+    limit = int(query_params.get("limit", 10))
+    sort = query_params.get("sort")
+    cursor = query_params.get("cursor")
+
+    # ?fields=id,from_location -> load and return only those columns
+    fields = parse_list(query_params.get("fields"))
+    if fields and Schema:
+        sort_column = (
+            [parse_sort(sort or DEFAULT_SORT)[0]] if cursor is not None else []
+        )
+        fields_option, Schema = select_fields(Model, Schema, fields, sort_column)
+        join_options = [*join_options, fields_option]
+
+    # Relationships the Schema renders are loaded with the page, not per row
+    if Schema:
+        join_options = [*join_options, *load_options(Model, Schema)]
+
+    # ?withTotal=false skips counting whatever the route asked for
+    if query_params.get("withTotal") is False:
+        totalMode = "off"
+
+    filters = {
+        "searchTerm": query_params.get("searchTerm"),
+        "columnFilters": query_params.get("columnFilters"),
+        "dateRange": query_params.get("dateRange"),
+        "numberRange": query_params.get("numberRange"),
+        "customFilters": customFilters,
+        "stringArrayFilters": query_params.get("stringArrayFilters"),
+        "objectArrayFilters": query_params.get("objectArrayFilters"),
+        "geoFilters": geo_filters,
+        "searchRank": query_params.get("searchRank", False),
+    }
 
+    list_args = dict(
+        filters=filters,
+        skip=skip,
+        page=page,
+        limit=limit,
+        join_options=join_options,
+        sort=sort,
+        totalMode=totalMode,
+        cursor=cursor,
+    )
+    return list_args, Schema
+
+
+def _list_response(result: dict, Schema, badStatusMsg: str):
+    if not result["data"]:
+        return api_response(400, badStatusMsg)
+    # Convert each SQLModel Model instance into a ModelRead Pydantic model
+    if not Schema:
+        return result
+
+    # whole page validated in one pydantic-core call
+    list_data = validate_list(Schema, result["data"])
+    return api_response(
+        200,
+        f"data found",
+        list_data,
+        result["total"],
+        extra=(
+            {"next_cursor": result["next_cursor"]} if "next_cursor" in result else None
+        ),
+    )
+
+
+def _pagination_error(e: DataError):
+    # This will catch OFFSET/limit errors and send proper API response
+    return api_response(
+        400,
+        f"Invalid pagination values: {str(e).splitlines()[0]}",
+    )
+
+
+def _listRecords(
+    session: Session,
+    query_params: dict,
+    searchFields: list[str],
+    Model,
+    customFilters: Optional[List[List[str]]] = None,
+    join_options: list = [],
+    Schema: type[SQLModel] = None,
+    otherFilters=None,
+    geo_filters: Optional[List[List[str]]] = None,
+    Statement=None,
+    badStatusMsg: str = "No Result found",
+    totalMode: TotalMode = "exact",
+):
+    try:
+        list_args, Schema = _list_request(
+            query_params,
+            Model,
+            Schema,
+            customFilters,
+            join_options,
+            geo_filters,
+            totalMode,
+        )
         result = listop(
             session=session,
             Model=Model,
             searchFields=searchFields,
-            filters=filters,
-            skip=skip,
-            page=page,
-            limit=limit,
-            join_options=join_options,
             otherFilters=otherFilters,
             Statement=Statement,
-            sort=sort,
+            **list_args,
         )
+        return _list_response(result, Schema, badStatusMsg)
+    except DataError as e:
+        return _pagination_error(e)
+
 
-        if not result["data"]:
-            return api_response(400, badStatusMsg)
-        # Convert each SQLModel Model instance into a ModelRead Pydantic model
-        if not Schema:
-            return result
-
-        list_data = [Schema.model_validate(prod) for prod in result["data"]]
-        return api_response(
-            200,
-            f"data found",
-            list_data,
-            result["total"],
+async def _alistRecords(
+    session: AsyncSession,
+    query_params: dict,
+    searchFields: list[str],
+    Model,
+    customFilters: Optional[List[List[str]]] = None,
+    join_options: list = [],
+    Schema: type[SQLModel] = None,
+    otherFilters=None,
+    geo_filters: Optional[List[List[str]]] = None,
+    Statement=None,
+    badStatusMsg: str = "No Result found",
+    totalMode: TotalMode = "exact",
+):
+    try:
+        list_args, Schema = _list_request(
+            query_params,
+            Model,
+            Schema,
+            customFilters,
+            join_options,
+            geo_filters,
+            totalMode,
         )
-    except DataError as e:
-        # This will catch OFFSET/limit errors and send proper API response
-        return api_response(
-            400,
-            f"Invalid pagination values: {str(e).splitlines()[0]}",
+        result = await alistop(
+            session=session,
+            Model=Model,
+            searchFields=searchFields,
+            otherFilters=otherFilters,
+            Statement=Statement,
+            **list_args,
         )
-    # finally:
-    #     session.close()
+        return _list_response(result, Schema, badStatusMsg)
+    except DataError as e:
+        return _pagination_error(e)
 
 
 def serialize_obj(obj):
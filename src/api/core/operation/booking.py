@@ -0,0 +1,173 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.api.core.operation.list_cache import bump_generation
+from src.api.core.operation.list_operation_helper import column_datetime
+from src.api.core.response import api_response
+from src.api.models.bookingModel import Booking, BookingStatus
+from src.api.models.rideModel import Ride
+from src.config import BOOKING_LOCK_TIMEOUT_MS
+from src.lib.invalidation import notify_statement
+
+# ===================
+# SEAT BOOKING ====================================
+# ===================
+# Seats are never read, checked and written back from Python (two requests
+# would both see the last seat). The whole check is one conditional
+#     UPDATE rides SET seats_available = seats_available - n
+#     WHERE id = :ride AND seats_available >= n ... RETURNING
+# which Postgres runs under the ride's row lock: concurrent bookings queue on
+# that lock and re-check the condition against the committed value.
+# The booking row is inserted BEFORE that UPDATE, so the lock is only held
+# for UPDATE -> COMMIT, and lock_timeout bounds the queue on a hot ride.
+
+LOCK_NOT_AVAILABLE = "55P03"
+
+
+async def _booking_by_key(
+    session: AsyncSession, user_id: int, idempotency_key: str
+) -> Optional[Booking]:
+    statement = select(Booking).where(
+        Booking.user_id == user_id, Booking.idempotency_key == idempotency_key
+    )
+    return (await session.exec(statement)).first()
+
+
+def _replayed(booking: Booking, ride_id: int, seats: int) -> Booking:
+    # same key must mean the same request
+    if booking.ride_id != ride_id or booking.seats != seats:
+        return api_response(409, "Idempotency-Key was already used for another booking")
+    return booking
+
+
+def _lock_timeout(e: DBAPIError) -> bool:
+    return getattr(e.orig, "pgcode", None) == LOCK_NOT_AVAILABLE
+
+
+async def _unavailable(session: AsyncSession, ride_id: int, user_id: int):
+    # The UPDATE matched nothing: tell the client why (rare path, one read)
+    ride = await session.get(Ride, ride_id)
+    if not ride:
+        return api_response(404, "Ride not found")
+    if ride.user_id == user_id:
+        return api_response(400, "You can't book your own ride")
+    arrival = ride.arrival_time
+    if arrival.tzinfo is None:
+        arrival = arrival.replace(tzinfo=timezone.utc)  # naive UTC
+    if not ride.active or arrival < datetime.now(timezone.utc):
+        return api_response(400, "Ride is no longer available")
+    return api_response(409, f"Only {ride.seats_available} seat(s) left")
+
+
+async def book_seats(
+    session: AsyncSession,
+    ride_id: int,
+    user_id: int,
+    seats: int = 1,
+    idempotency_key: Optional[str] = None,
+) -> tuple[Booking, bool]:
+    """
+    Book seats on a live ride. Returns (booking, created): created is False
+    when idempotency_key matched an earlier booking, which is returned as is.
+    """
+    if idempotency_key:
+        existing = await _booking_by_key(session, user_id, idempotency_key)
+        if existing:
+            return _replayed(existing, ride_id, seats), False
+
+    now = datetime.now(timezone.utc)
+    booking = Booking(
+        ride_id=ride_id,
+        user_id=user_id,
+        seats=seats,
+        idempotency_key=idempotency_key,
+    )
+    session.add(booking)
+    try:
+        # the same key racing in another request fails here, before any lock
+        await session.flush()
+    except IntegrityError:
+        await session.rollback()
+        existing = idempotency_key and await _booking_by_key(
+            session, user_id, idempotency_key
+        )
+        if not existing:
+            raise
+        return _replayed(existing, ride_id, seats), False
+
+    await session.exec(notify_statement("rides", ride_id, "seats", ("bookings",)))
+    await session.exec(
+        select(func.set_config("lock_timeout", f"{BOOKING_LOCK_TIMEOUT_MS}ms", True))
+    )
+    try:
+        taken = (
+            await session.exec(
+                update(Ride)
+                .where(
+                    Ride.id == ride_id,
+                    Ride.active,
+                    # prunes past partitions, past rides can't be booked
+                    Ride.arrival_time >= column_datetime(Ride.arrival_time, now),
+                    Ride.user_id != user_id,
+                    Ride.seats_available >= seats,
+                )
+                .values(seats_available=Ride.seats_available - seats)
+                .returning(Ride.seats_available)
+            )
+        ).first()
+    except DBAPIError as e:
+        await session.rollback()
+        if _lock_timeout(e):
+            return api_response(503, "Ride is busy, please retry")
+        raise
+
+    if taken is None:
+        await session.rollback()  # drops the booking row too
+        return await _unavailable(session, ride_id, user_id)
+
+    await session.commit()
+    bump_generation("rides", "bookings")
+    return booking, True
+
+
+async def cancel_booking(
+    session: AsyncSession, booking_id: int, user_id: int
+) -> Booking:
+    """Cancel a confirmed booking and give its seats back to the ride."""
+    now = column_datetime(Booking.cancelled_at, datetime.now(timezone.utc))
+    # status in the WHERE: a double cancel can't return the seats twice
+    cancelled = (
+        await session.exec(
+            update(Booking)
+            .where(
+                Booking.id == booking_id,
+                Booking.user_id == user_id,
+                Booking.status == BookingStatus.confirmed,
+            )
+            .values(status=BookingStatus.cancelled, cancelled_at=now, updated_at=now)
+            .returning(Booking.ride_id, Booking.seats)
+        )
+    ).first()
+    if cancelled is None:
+        await session.rollback()
+        booking = await session.get(Booking, booking_id)
+        if not booking or booking.user_id != user_id:
+            return api_response(404, "Booking not found")
+        return api_response(400, "Booking is already cancelled")
+
+    await session.exec(
+        notify_statement("rides", cancelled.ride_id, "seats", ("bookings",))
+    )
+    await session.exec(
+        update(Ride)
+        .where(Ride.id == cancelled.ride_id)
+        .values(seats_available=Ride.seats_available + cancelled.seats)
+    )
+    await session.commit()
+    bump_generation("rides", "bookings")
+    return await session.get(Booking, booking_id, populate_existing=True)
@@ -0,0 +1,289 @@
+import math
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, func, insert
+from sqlalchemy.orm import aliased
+from sqlmodel import select
+
+from src.api.core.operation.geo import EARTH_RADIUS_KM, bounding_box
+from src.api.core.operation.list_operation_helper import column_datetime
+from src.api.models.rideModel import Ride, RideRouteCell
+from src.config import (
+    RIDE_CORRIDOR_CANDIDATES,
+    RIDE_ROUTE_CELL_DEG,
+    RIDE_ROUTE_SIMPLIFY_DEG,
+)
+
+# ===================
+# CORRIDOR SEARCH ====================================
+# ===================
+# Every ride's route (client polyline, else the straight line between its
+# endpoints) is rasterized into RIDE_ROUTE_CELL_DEG grid cells stored in
+# ride_route_cells with their order along the route. A corridor search looks
+# up the cells around the rider's pickup and drop-off on the (cell_lat,
+# cell_lng) index, keeps rides that reach a pickup cell before a drop-off
+# cell, and only those candidates get the exact point-to-route distance.
+# Only live rides have cells: expiry deletes them, an update that
+# re-activates or re-times a ride stores them again.
+
+Point = tuple[float, float]  # (lat, lng)
+
+
+# ======================================================
+# 🧭 POLYLINES
+# ======================================================
+def decode_polyline(encoded: str, precision: int = 5) -> list[Point]:
+    """Google encoded polyline -> [(lat, lng)]. Raises ValueError if malformed."""
+    points, index, lat, lng = [], 0, 0, 0
+    factor = 10**precision
+    length = len(encoded)
+    while index < length:
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                if index >= length:
+                    raise ValueError("Truncated polyline")
+                byte = ord(encoded[index]) - 63
+                index += 1
+                if byte < 0 or byte > 63:
+                    raise ValueError("Invalid polyline character")
+                result |= (byte & 0x1F) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lng += deltas[1]
+        points.append((lat / factor, lng / factor))
+    return points
+
+
+def encode_polyline(points: Iterable[Point], precision: int = 5) -> str:
+    factor = 10**precision
+    chunks, prev_lat, prev_lng = [], 0, 0
+    for lat, lng in points:
+        lat, lng = round(lat * factor), round(lng * factor)
+        for delta in (lat - prev_lat, lng - prev_lng):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                chunks.append(chr((0x20 | (value & 0x1F)) + 63))
+                value >>= 5
+            chunks.append(chr(value + 63))
+        prev_lat, prev_lng = lat, lng
+    return "".join(chunks)
+
+
+def simplify(points: list[Point], tolerance: float = RIDE_ROUTE_SIMPLIFY_DEG):
+    """Douglas-Peucker (iterative), tolerance in degrees."""
+    if len(points) < 3:
+        return points
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        (y1, x1), (y2, x2) = points[start], points[end]
+        dx, dy = x2 - x1, y2 - y1
+        norm = math.hypot(dx, dy)
+        worst, worst_index = 0.0, None
+        for i in range(start + 1, end):
+            y, x = points[i]
+            if norm == 0:
+                distance = math.hypot(x - x1, y - y1)
+            else:
+                distance = abs(dy * x - dx * y + x2 * y1 - y2 * x1) / norm
+            if distance > worst:
+                worst, worst_index = distance, i
+        if worst_index is not None and worst > tolerance:
+            keep[worst_index] = True
+            stack.append((start, worst_index))
+            stack.append((worst_index, end))
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def _location_point(location) -> Optional[Point]:
+    # GeoJSON dict / Location model, coordinates are [lng, lat]
+    if location is None:
+        return None
+    coordinates = (
+        location.get("coordinates")
+        if isinstance(location, dict)
+        else getattr(location, "coordinates", None)
+    )
+    if not coordinates or len(coordinates) < 2:
+        return None
+    return float(coordinates[1]), float(coordinates[0])
+
+
+def ride_route(ride: Ride) -> list[Point]:
+    """The ride's stored route, else the straight line between its endpoints."""
+    if ride.route_polyline:
+        return decode_polyline(ride.route_polyline)
+    ends = [_location_point(ride.from_location), _location_point(ride.to_location)]
+    return [point for point in ends if point is not None]
+
+
+def normalize_route(encoded: str) -> str:
+    """Validate + simplify a client polyline before it is stored."""
+    points = decode_polyline(encoded)
+    if len(points) < 2:
+        raise ValueError("A route needs at least two points")
+    return encode_polyline(simplify(points))
+
+
+# ======================================================
+# 🔲 GRID CELLS
+# ======================================================
+def _cell(point: Point) -> tuple[int, int]:
+    return (
+        math.floor(point[0] / RIDE_ROUTE_CELL_DEG),
+        math.floor(point[1] / RIDE_ROUTE_CELL_DEG),
+    )
+
+
+def route_cells(points: list[Point]) -> list[tuple[int, int, int]]:
+    """[(cell_lat, cell_lng, seq)] the route passes through, in route order."""
+    seen: dict[tuple[int, int], int] = {}
+
+    def visit(point):
+        seen.setdefault(_cell(point), len(seen))
+
+    for start, end in zip(points, points[1:]):
+        # steps of half a cell so no crossed cell is skipped
+        span = max(abs(end[0] - start[0]), abs(end[1] - start[1]))
+        steps = max(1, math.ceil(span / (RIDE_ROUTE_CELL_DEG / 2)))
+        for step in range(steps):
+            t = step / steps
+            visit(
+                (start[0] + (end[0] - start[0]) * t, start[1] + (end[1] - start[1]) * t)
+            )
+    if points:
+        visit(points[-1])
+    return [(lat, lng, seq) for (lat, lng), seq in seen.items()]
+
+
+async def store_route_cells(session, ride: Ride) -> None:
+    """Replace ride's cells (AsyncSession, inside the caller's transaction)."""
+    await session.exec(delete(RideRouteCell).where(RideRouteCell.ride_id == ride.id))
+    cells = route_cells(ride_route(ride)) if ride.active else []
+    if cells:
+        await session.exec(
+            insert(RideRouteCell),
+            params=[
+                {"ride_id": ride.id, "cell_lat": lat, "cell_lng": lng, "seq": seq}
+                for lat, lng, seq in cells
+            ],
+        )
+
+
+def _cell_range(point: Point, radius_km: float):
+    min_lat, max_lat, min_lng, max_lng = bounding_box(*point, radius_km)
+    return (
+        math.floor(min_lat / RIDE_ROUTE_CELL_DEG),
+        math.floor(max_lat / RIDE_ROUTE_CELL_DEG),
+        math.floor(max(min_lng, -180.0) / RIDE_ROUTE_CELL_DEG),
+        math.floor(min(max_lng, 180.0) / RIDE_ROUTE_CELL_DEG),
+    )
+
+
+def corridor_candidates(
+    pickup: Point,
+    dropoff: Point,
+    radius_km: float,
+    now: datetime,
+    wanted: datetime,
+    limit: int = RIDE_CORRIDOR_CANDIDATES,
+):
+    """
+    Ids of live rides with a cell near the pickup that comes before a cell
+    near the drop-off. Past limit, the rides arriving closest to wanted are
+    kept. Cells are coarse: candidates still need corridor_match().
+    """
+    near_pickup = aliased(RideRouteCell)
+    near_dropoff = aliased(RideRouteCell)
+    p_lat0, p_lat1, p_lng0, p_lng1 = _cell_range(pickup, radius_km)
+    d_lat0, d_lat1, d_lng0, d_lng1 = _cell_range(dropoff, radius_km)
+    offset = func.abs(
+        func.extract(
+            "epoch", Ride.arrival_time - column_datetime(Ride.arrival_time, wanted)
+        )
+    )
+    return (
+        select(near_pickup.ride_id)
+        .join(near_dropoff, near_dropoff.ride_id == near_pickup.ride_id)
+        .join(Ride, Ride.id == near_pickup.ride_id)
+        .where(
+            near_pickup.cell_lat.between(p_lat0, p_lat1),
+            near_pickup.cell_lng.between(p_lng0, p_lng1),
+            near_dropoff.cell_lat.between(d_lat0, d_lat1),
+            near_dropoff.cell_lng.between(d_lng0, d_lng1),
+            # live rides only, before the limit (prunes past partitions)
+            Ride.active,
+            Ride.arrival_time >= column_datetime(Ride.arrival_time, now),
+        )
+        .group_by(near_pickup.ride_id, Ride.arrival_time)
+        .having(func.min(near_pickup.seq) <= func.max(near_dropoff.seq))
+        .order_by(offset, near_pickup.ride_id)
+        .limit(limit)
+    )
+
+
+# ======================================================
+# 📏 EXACT CHECK
+# ======================================================
+def _closest_on_route(points: list[Point], target: Point) -> tuple[float, float]:
+    """
+    (distance km, position along the route) of the route point closest to
+    target. Position is segment index + fraction, comparable between points.
+    Equirectangular projection around target, plenty for a few km.
+    """
+    lat0 = math.radians(target[0])
+    km_per_deg = math.pi * EARTH_RADIUS_KM / 180
+
+    def xy(point):
+        return (
+            (point[1] - target[1]) * km_per_deg * math.cos(lat0),
+            (point[0] - target[0]) * km_per_deg,
+        )
+
+    if len(points) == 1:
+        return math.hypot(*xy(points[0])), 0.0
+
+    best = (math.inf, 0.0)
+    for i, (start, end) in enumerate(zip(points, points[1:])):
+        (x1, y1), (x2, y2) = xy(start), xy(end)
+        dx, dy = x2 - x1, y2 - y1
+        length = dx * dx + dy * dy
+        t = 0.0 if length == 0 else max(0.0, min(1.0, -(x1 * dx + y1 * dy) / length))
+        distance = math.hypot(x1 + t * dx, y1 + t * dy)
+        if distance < best[0]:
+            best = (distance, i + t)
+    return best
+
+
+def corridor_match(
+    ride: Ride, pickup: Point, dropoff: Point, radius_km: float
+) -> Optional[tuple[float, float]]:
+    """(pickup km, drop-off km) when both are within radius_km, in order."""
+    points = ride_route(ride)
+    if not points:
+        return None
+    pickup_km, pickup_at = _closest_on_route(points, pickup)
+    dropoff_km, dropoff_at = _closest_on_route(points, dropoff)
+    if pickup_km > radius_km or dropoff_km > radius_km or pickup_at > dropoff_at:
+        return None
+    return pickup_km, dropoff_km
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # naive values are already UTC (like the columns), aware ones convert
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def arrival_offset_hours(ride: Ride, wanted: datetime) -> float:
+    offset = _naive_utc(ride.arrival_time) - _naive_utc(wanted)
+    return abs(offset.total_seconds()) / 3600
@@ -0,0 +1,89 @@
+from functools import lru_cache
+from typing import Optional, Union, get_args
+
+from pydantic import BaseModel
+from sqlalchemy.orm import joinedload, selectinload
+
+from src.api.core.response import api_response
+from src.api.core.utility import parse_list
+
+# ===================
+# EAGER LOADING ====================================
+# ===================
+# Nested fields of a read Schema that are relationships on the Model
+# (ReviewRead.reviewer, UserRead.role, RideReadWithUser.user, ...) are loaded
+# up front instead of lazily per row:
+#   many-to-one -> joinedload  (same query, no row multiplication)
+#   collections -> selectinload (one extra IN query per relationship)
+# so a page costs a constant number of queries instead of 1 + N per relation.
+
+
+def _nested_schema(annotation) -> Optional[type[BaseModel]]:
+    # Optional[UserRead] / List[MediaRead] / UserReadRide -> the model class
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        nested = _nested_schema(arg)
+        if nested is not None:
+            return nested
+    return None
+
+
+@lru_cache(maxsize=256)
+def load_options(Model, Schema) -> tuple:
+    """Loader options for every relationship Schema renders (recursively)."""
+    relationships = Model.__mapper__.relationships
+    options = []
+    for name, field in Schema.model_fields.items():
+        relationship = relationships.get(name)
+        if relationship is None:
+            continue  # plain column / JSON field
+
+        attr = getattr(Model, name)
+        loader = selectinload(attr) if relationship.uselist else joinedload(attr)
+
+        nested = _nested_schema(field.annotation)
+        if nested is not None:
+            children = load_options(relationship.mapper.class_, nested)
+            if children:
+                loader = loader.options(*children)
+        options.append(loader)
+    return tuple(options)
+
+
+@lru_cache(maxsize=256)
+def related_tables(Model, Schema) -> tuple:
+    """Tables behind the relationships Schema renders (for cache invalidation)."""
+    relationships = Model.__mapper__.relationships
+    tables = []
+    for name, field in Schema.model_fields.items():
+        relationship = relationships.get(name)
+        if relationship is None:
+            continue
+        target = relationship.mapper.class_
+        tables.append(target.__tablename__)
+        nested = _nested_schema(field.annotation)
+        if nested is not None:
+            tables.extend(related_tables(target, nested))
+    return tuple(dict.fromkeys(tables))
+
+
+def include_schema(
+    query_params: dict,
+    Schema,
+    includes: dict[str, type[BaseModel]],
+):
+    """
+    ?include=user -> the Schema registered for that include.
+    includes maps the (sorted, comma joined) include names to a Schema:
+        {"user": RideReadWithUser}
+    """
+    requested = sorted(set(parse_list(query_params.get("include"))))
+    if not requested:
+        return Schema
+
+    key = ",".join(requested)
+    if key not in includes:
+        allowed = ", ".join(includes) or "none"
+        return api_response(400, f"Unknown include '{key}', allowed: {allowed}")
+    return includes[key]
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.api.core.operation.geo_index import ride_geo_index
+from src.api.core.operation.list_cache import bump_generation
+from src.api.core.operation.list_operation_helper import column_datetime
+from src.api.models.rideModel import Ride, RideRouteCell
+from src.config import RIDE_EXPIRY_BATCH_SIZE, RIDE_EXPIRY_MAX_BATCHES
+from src.lib.invalidation import notify_statement
+
+logger = logging.getLogger(__name__)
+
+# ===================
+# RIDE EXPIRY ====================================
+# ===================
+# Rides whose arrival_time has passed are switched to active = false so the
+# public listing (WHERE active, partial indexes) only keeps live rides.
+# Each batch is its own short transaction: FOR UPDATE SKIP LOCKED leaves rows
+# a user is editing for the next run, and several workers can run the job
+# at the same time without waiting on each other.
+
+
+def _expire_statement(now: datetime, batch_size: int):
+    # naive UTC for the timestamp columns, asyncpg rejects aware values
+    now = column_datetime(Ride.arrival_time, now)
+    expired = (
+        select(Ride.id, Ride.arrival_time)
+        .where(Ride.active, Ride.arrival_time < now)
+        .order_by(Ride.arrival_time)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .cte("expired")
+    )
+    # arrival_time in the join keeps the UPDATE on the matching partitions
+    return (
+        update(Ride)
+        .where(Ride.id == expired.c.id, Ride.arrival_time == expired.c.arrival_time)
+        .values(active=False, updated_at=now)
+        .returning(Ride.id)
+    )
+
+
+async def expire_rides(
+    engine: AsyncEngine,
+    batch_size: int = RIDE_EXPIRY_BATCH_SIZE,
+    max_batches: int = RIDE_EXPIRY_MAX_BATCHES,
+) -> int:
+    """Deactivate past rides, at most batch_size * max_batches per call."""
+    now = datetime.now(timezone.utc)
+    expired = 0
+    for _ in range(max_batches):
+        async with engine.begin() as conn:
+            rows = (await conn.execute(_expire_statement(now, batch_size))).all()
+            if rows:
+                # expired rides leave the corridor search index too
+                await conn.execute(
+                    delete(RideRouteCell).where(
+                        RideRouteCell.ride_id.in_([row.id for row in rows])
+                    )
+                )
+                # one event per batch, ids would not fit in a payload
+                await conn.execute(notify_statement("rides", op="expire"))
+        for row in rows:
+            ride_geo_index.remove(row.id)
+        expired += len(rows)
+        if len(rows) < batch_size:
+            break
+
+    if expired:
+        bump_generation("rides")
+        logger.info("Deactivated %s expired rides", expired)
+    return expired
+
+
+async def expiry_loop(engine: AsyncEngine, interval: float) -> None:
+    """Run expire_rides every interval seconds (started from the lifespan)."""
+    while True:
+        try:
+            await expire_rides(engine)
+        except Exception:
+            logger.exception("Ride expiry failed")
+        await asyncio.sleep(interval)
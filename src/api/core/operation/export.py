@@ -0,0 +1,119 @@
+import csv
+import io
+from typing import Iterator, List, Literal, Optional
+
+import orjson
+from fastapi.responses import StreamingResponse
+from sqlmodel import SQLModel
+
+from src.api.core.operation import DEFAULT_SORT, _list_request, _list_statement
+from src.api.core.operation.eager import include_schema
+from src.api.core.serialization import list_adapter
+from src.config import EXPORT_BATCH_SIZE
+from src.lib.db_con import read_router
+from src.lib.replicas import RoutingSession
+
+# ===================
+# STREAMING EXPORT ====================================
+# ===================
+# Same filters as the list endpoints (applyFilters + list_query_params), but
+# rows come from a server-side cursor in batches of EXPORT_BATCH_SIZE and are
+# written out as they arrive, so memory stays flat whatever the row count.
+# page/skip/limit/cursor are ignored — an export is always the full result.
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def export_statement(
+    Model: type[SQLModel],
+    Schema: type[SQLModel],
+    query_params: dict,
+    searchFields: List[str],
+    customFilters: Optional[List[List[str]]] = None,
+    join_options: list = [],
+    geo_filters: Optional[str] = None,
+    includes: dict = {},
+):
+    """Filtered/sorted statement (no paging) + the Schema rows are dumped with."""
+    Schema = include_schema(query_params, Schema, includes)
+    list_args, Schema = _list_request(
+        {**query_params, "cursor": None},
+        Model,
+        Schema,
+        customFilters,
+        join_options,
+        geo_filters,
+        "off",
+    )
+    statement = _list_statement(
+        Model,
+        list_args["filters"],
+        searchFields,
+        list_args["join_options"],
+        sort=list_args["sort"] or DEFAULT_SORT,
+    )
+    return statement, Schema
+
+
+def _batches(statement, Schema) -> Iterator[list[dict]]:
+    # Own session: the request's session is closed once the route returns,
+    # while this generator keeps running until the last row is sent
+    adapter = list_adapter(Schema)
+    with RoutingSession(router=read_router) as session:
+        # yield_per -> stream_results (psycopg2 named cursor) + batched fetch
+        result = session.exec(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for rows in result.partitions():
+            yield adapter.dump_python(
+                adapter.validate_python(rows, from_attributes=True), mode="json"
+            )
+            session.expunge_all()  # drop the batch from the identity map
+
+
+def _ndjson(batches: Iterator[list[dict]]) -> Iterator[bytes]:
+    for batch in batches:
+        yield b"".join(orjson.dumps(row) + b"\n" for row in batch)
+
+
+def _csv_value(value):
+    # nested objects (locations, images, role) stay readable as JSON
+    if isinstance(value, (dict, list)):
+        return orjson.dumps(value).decode()
+    return value
+
+
+def _csv(batches: Iterator[list[dict]], columns: list[str]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        for row in batch:
+            writer.writerow([_csv_value(row.get(c)) for c in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_export(
+    statement,
+    Schema: type[SQLModel],
+    format: ExportFormat = "ndjson",
+    filename: str = "export",
+) -> StreamingResponse:
+    batches = _batches(statement, Schema)
+    if format == "csv":
+        body = _csv(batches, list(Schema.model_fields))
+    else:
+        body = _ndjson(batches)
+
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'},
+    )
@@ -0,0 +1,54 @@
+from functools import lru_cache
+
+from pydantic import ConfigDict, create_model, field_serializer
+from sqlalchemy.orm import load_only
+
+from src.api.core.response import api_response
+
+# ===================
+# SPARSE FIELDSETS ====================================
+# ===================
+# ?fields=id,from_location,price_per_seat
+# -> the query only loads those columns (load_only) and the rows are validated
+#    with a partial copy of the Schema holding just those fields.
+
+
+@lru_cache(maxsize=128)
+def partial_schema(Schema, fields: tuple):
+    """Copy of Schema restricted to `fields`, keeping its field serializers."""
+    serializers = {}
+    for name, dec in Schema.__pydantic_decorators__.field_serializers.items():
+        kept = [f for f in dec.info.fields if f in fields]
+        if kept:
+            serializers[name] = field_serializer(
+                *kept, mode=dec.info.mode, when_used=dec.info.when_used
+            )(dec.func)
+
+    return create_model(
+        f"{Schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        __validators__=serializers,
+        **{
+            f: (Schema.model_fields[f].annotation, Schema.model_fields[f])
+            for f in fields
+        },
+    )
+
+
+def select_fields(Model, Schema, fields, extra_columns=()):
+    """
+    Validate the requested fields against Schema and return
+    (load_only option, partial schema).
+    extra_columns are loaded too but not returned (e.g. the cursor sort column).
+    """
+    fields = tuple(dict.fromkeys(fields))  # keep order, drop duplicates
+    unknown = [f for f in fields if f not in Schema.model_fields]
+    if unknown:
+        return api_response(400, f"Unknown fields: {', '.join(unknown)}")
+
+    # Relationships (e.g. user) are loaded by their own loader strategy
+    columns = Model.__mapper__.column_attrs.keys()
+    load = [f for f in ("id", *fields, *extra_columns) if f in columns]
+    option = load_only(*[getattr(Model, f) for f in dict.fromkeys(load)])
+
+    return option, partial_schema(Schema, fields)
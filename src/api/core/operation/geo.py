@@ -0,0 +1,115 @@
+import math
+
+from sqlalchemy import Float, cast
+from sqlmodel import and_, func, or_
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def bounding_box(lat: float, lng: float, radius_km: float):
+    """
+    Smallest lat/lng box containing the circle of radius_km around (lat, lng).
+    Returns (min_lat, max_lat, min_lng, max_lng); longitudes may leave
+    [-180, 180] when the circle crosses the antimeridian.
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angular)
+    min_lat, max_lat = lat - dlat, lat + dlat
+
+    if min_lat <= -90 or max_lat >= 90:
+        # Circle covers a pole -> every longitude is possible
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+
+    dlng = math.degrees(
+        math.asin(min(1.0, math.sin(angular) / math.cos(math.radians(lat))))
+    )
+    return min_lat, max_lat, lng - dlng, lng + dlng
+
+
+def bounding_box_condition(lat_col, lng_col, lat: float, lng: float, radius_km: float):
+    """Index friendly range condition (B-tree on (lat, lng)) for the prefilter."""
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    lat_cond = lat_col.between(min_lat, max_lat)
+
+    if min_lng < -180:
+        lng_cond = or_(lng_col >= min_lng + 360, lng_col <= max_lng)
+    elif max_lng > 180:
+        lng_cond = or_(lng_col >= min_lng, lng_col <= max_lng - 360)
+    else:
+        lng_cond = lng_col.between(min_lng, max_lng)
+
+    return and_(lat_cond, lng_cond)
+
+
+def distance_km(lat: float, lng: float, lat_col, lng_col):
+    """Great-circle distance (KM) between a point and lat/lng columns."""
+    cos_angle = func.cos(func.radians(lat)) * func.cos(
+        func.radians(lat_col)
+    ) * func.cos(func.radians(lng_col) - func.radians(lng)) + func.sin(
+        func.radians(lat)
+    ) * func.sin(
+        func.radians(lat_col)
+    )
+
+    # Rounding can push the cosine slightly above 1 for identical points,
+    # acos() would then raise "input is out of range"
+    return EARTH_RADIUS_KM * func.acos(func.least(1.0, func.greatest(-1.0, cos_angle)))
+
+
+def location_columns(Model, prefix: str = "from"):
+    """
+    (lat_col, lng_col) for '<prefix>_location'.
+    Uses the indexed generated columns (from_lat/from_lng) when the model
+    has them, otherwise reads the GeoJSON coordinates [lng, lat].
+    """
+    lat_col = getattr(Model, f"{prefix}_lat", None)
+    lng_col = getattr(Model, f"{prefix}_lng", None)
+    if lat_col is not None and lng_col is not None:
+        return lat_col, lng_col
+
+    coordinates = getattr(Model, f"{prefix}_location").op("->")("coordinates")
+    return (
+        cast(coordinates.op("->>")(1), Float),
+        cast(coordinates.op("->>")(0), Float),
+    )
+
+
+def geo_radius_filter(
+    statement, Model, lat: float, lng: float, radius_km: float, prefix: str = "from"
+):
+    """
+    Keep rows whose <prefix>_location is within radius_km of (lat, lng).
+    The bounding box is served by the (lat, lng) index, the exact distance is
+    only computed for those candidates. Returns (statement, distance_expr).
+    """
+    lat_col, lng_col = location_columns(Model, prefix)
+    distance = distance_km(lat, lng, lat_col, lng_col)
+
+    statement = statement.where(
+        bounding_box_condition(lat_col, lng_col, lat, lng, radius_km)
+    ).where(distance <= radius_km)
+
+    return statement, distance
+
+
+def route_match_filter(
+    statement,
+    Model,
+    origin: tuple[float, float],
+    destination: tuple[float, float],
+    radius_from_km: float,
+    radius_to_km: float,
+):
+    """
+    Keep rows starting within radius_from_km of origin AND ending within
+    radius_to_km of destination (both (lat, lng)). Each end has its own
+    bounding box on its (lat, lng) index, Postgres can BitmapAnd the two.
+    Returns (statement, from_distance, to_distance).
+    """
+    statement, from_distance = geo_radius_filter(
+        statement, Model, *origin, radius_from_km, prefix="from"
+    )
+    statement, to_distance = geo_radius_filter(
+        statement, Model, *destination, radius_to_km, prefix="to"
+    )
+    return statement, from_distance, to_distance
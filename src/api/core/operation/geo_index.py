@@ -0,0 +1,345 @@
+import ast
+import asyncio
+import logging
+import math
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import false, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.api.core.response import api_response
+from src.api.core.operation.geo import EARTH_RADIUS_KM, bounding_box
+from src.api.core.operation.list_operation_helper import column_datetime
+from src.api.models.rideModel import Ride
+from src.config import (
+    RIDE_GEO_INDEX_CELL_DEG,
+    RIDE_GEO_INDEX_MAX_CELLS,
+    RIDE_GEO_INDEX_MAX_IDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# ===================
+# IN-MEMORY RIDE GEO INDEX ====================================
+# ===================
+# Live rides (active, arriving in the future) kept per worker as parallel
+# NumPy arrays: id, pickup lat/lng, arrival (epoch seconds) and price per
+# seat, plus a uniform grid (RIDE_GEO_INDEX_CELL_DEG) of pickup cells ->
+# array slots. A radius query only looks at the slots of the cells under the
+# circle's bounding box and computes the haversine for all of them in one
+# vectorized call; the database then hydrates just the matching ids.
+# The index may briefly hold a ride that expired or was changed by another
+# worker: callers still filter active/upcoming in SQL. Other workers' writes
+# arrive over the invalidation bus (src/lib/invalidation.py), the periodic
+# rebuild (RIDE_GEO_INDEX_REFRESH) catches anything missed.
+# Sync routes write from the threadpool while the event loop queries, so
+# every access goes through the index's lock.
+
+
+def _epoch(value: datetime) -> float:
+    # naive datetimes are UTC (see column_datetime)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class RideGeoIndex:
+    def __init__(self, cell_deg: float = RIDE_GEO_INDEX_CELL_DEG, capacity: int = 1024):
+        self.cell_deg = cell_deg
+        self.ready = False  # False until the first build, callers use SQL
+        self.built_at: Optional[datetime] = None
+        self._lock = threading.RLock()
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        self.ids = np.full(capacity, -1, dtype=np.int64)
+        self.lat = np.zeros(capacity, dtype=np.float64)
+        self.lng = np.zeros(capacity, dtype=np.float64)
+        self.arrival = np.zeros(capacity, dtype=np.float64)
+        self.price = np.full(capacity, np.nan, dtype=np.float32)
+        self._slots: dict[int, int] = {}  # ride id -> slot
+        self._free: list[int] = list(range(capacity - 1, -1, -1))
+        self._cells: dict[tuple[int, int], set[int]] = {}  # cell -> slots
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._slots)
+
+    def _cell(self, lat: float, lng: float) -> tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg)
+
+    def _grow(self) -> None:
+        old = len(self.ids)
+        new = old * 2
+        for name in ("ids", "lat", "lng", "arrival", "price"):
+            array = getattr(self, name)
+            grown = np.resize(array, new)
+            grown[old:] = -1 if name == "ids" else 0
+            setattr(self, name, grown)
+        self.price[old:] = np.nan
+        self._free.extend(range(new - 1, old - 1, -1))
+
+    # ======================================================
+    # ✏️ WRITES
+    # ======================================================
+    def add(
+        self,
+        ride_id: int,
+        lat: float,
+        lng: float,
+        arrival: datetime,
+        price: Optional[float] = None,
+    ) -> None:
+        with self._lock:
+            self.remove(ride_id)
+            if not self._free:
+                self._grow()
+            slot = self._free.pop()
+            self.ids[slot] = ride_id
+            self.lat[slot] = lat
+            self.lng[slot] = lng
+            self.arrival[slot] = _epoch(arrival)
+            self.price[slot] = np.nan if price is None else price
+            self._slots[ride_id] = slot
+            self._cells.setdefault(self._cell(lat, lng), set()).add(slot)
+
+    def remove(self, ride_id: int) -> None:
+        with self._lock:
+            slot = self._slots.pop(ride_id, None)
+            if slot is None:
+                return
+            cell = self._cell(self.lat[slot], self.lng[slot])
+            slots = self._cells.get(cell)
+            if slots is not None:
+                slots.discard(slot)
+                if not slots:
+                    del self._cells[cell]
+            self.ids[slot] = -1
+            self._free.append(slot)
+
+    def upsert(self, ride, now: Optional[datetime] = None) -> None:
+        """
+        Index ride (a Ride or a row with the same attributes) if it is live
+        with a pickup location, else drop it.
+        """
+        now = now or datetime.now(timezone.utc)
+        if (
+            ride.active
+            and ride.from_lat is not None
+            and ride.from_lng is not None
+            and ride.arrival_time is not None
+            and _epoch(ride.arrival_time) >= now.timestamp()
+        ):
+            self.add(
+                ride.id,
+                ride.from_lat,
+                ride.from_lng,
+                ride.arrival_time,
+                ride.price_per_seat,
+            )
+        else:
+            self.remove(ride.id)
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """Drop rides that arrived before now."""
+        now = (now or datetime.now(timezone.utc)).timestamp()
+        with self._lock:
+            past = self.ids[(self.ids >= 0) & (self.arrival < now)].tolist()
+            for ride_id in past:
+                self.remove(ride_id)
+        return len(past)
+
+    def load(self, rows) -> None:
+        """Replace the whole index with (id, lat, lng, arrival, price) rows."""
+        fresh = RideGeoIndex(self.cell_deg, capacity=max(1024, len(rows) * 2))
+        for row in rows:
+            fresh.add(*row)
+        # swap in one go, readers never see a half built index; the lock
+        # stays the one other threads may be waiting on
+        state = {k: v for k, v in fresh.__dict__.items() if k != "_lock"}
+        with self._lock:
+            self.__dict__.update(state)
+            self.ready = True
+            self.built_at = datetime.now(timezone.utc)
+
+    # ======================================================
+    # 🔍 RADIUS QUERY
+    # ======================================================
+    def _candidates(self, lat: float, lng: float, radius_km: float) -> np.ndarray:
+        min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+        lat0, lng0 = self._cell(min_lat, min_lng)
+        lat1, lng1 = self._cell(max_lat, max_lng)
+        cells = (lat1 - lat0 + 1) * (lng1 - lng0 + 1)
+        if min_lng < -180 or max_lng > 180 or cells > RIDE_GEO_INDEX_MAX_CELLS:
+            # huge circle / antimeridian: a full vectorized scan is cheaper
+            return np.fromiter(self._slots.values(), dtype=np.int64)
+        slots = [
+            slot
+            for cell_lat in range(lat0, lat1 + 1)
+            for cell_lng in range(lng0, lng1 + 1)
+            for slot in self._cells.get((cell_lat, cell_lng), ())
+        ]
+        return np.asarray(slots, dtype=np.int64)
+
+    def within(
+        self,
+        lat: float,
+        lng: float,
+        radius_km: float,
+        now: Optional[datetime] = None,
+        max_price: Optional[float] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (ride ids, distances km) of indexed rides picking up within radius_km
+        of (lat, lng) and arriving after now, nearest first.
+        """
+        now = (now or datetime.now(timezone.utc)).timestamp()
+        # slots and the arrays they index are read together: a concurrent
+        # write may reuse a slot or grow (replace) the arrays
+        with self._lock:
+            slots = self._candidates(lat, lng, radius_km)
+            if not len(slots):
+                return np.empty(0, dtype=np.int64), np.empty(0)
+            keep = self.arrival[slots] >= now
+            if max_price is not None:
+                # NaN > max_price is False: rides without a price are kept
+                keep &= ~(self.price[slots] > max_price)
+            slots = slots[keep]
+            ids = self.ids[slots]
+            lat2 = np.radians(self.lat[slots])
+            lng2 = np.radians(self.lng[slots])
+
+        # haversine, all candidates at once
+        lat1, lng1 = math.radians(lat), math.radians(lng)
+        a = (
+            np.sin((lat2 - lat1) / 2) ** 2
+            + math.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+        )
+        distance = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+        inside = distance <= radius_km
+        ids, distance = ids[inside], distance[inside]
+        order = np.argsort(distance, kind="stable")
+        return ids[order], distance[order]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "rides": len(self._slots),
+                "cells": len(self._cells),
+                "capacity": len(self.ids),
+                "bytes": sum(
+                    getattr(self, name).nbytes
+                    for name in ("ids", "lat", "lng", "arrival", "price")
+                ),
+                "built_at": self.built_at.isoformat() if self.built_at else None,
+            }
+
+
+# One index per worker process
+ride_geo_index = RideGeoIndex()
+
+
+def indexed_radius_filter(geo_filters, max_ids: int = RIDE_GEO_INDEX_MAX_IDS):
+    """
+    ?geo_filters (from_lat, from_lng, radius_from) answered by ride_geo_index:
+    an otherFilters hook keeping the matching ids, or None when more than
+    max_ids rides match (the caller falls back to the SQL radius filter).
+    The hook only filters: rows keep the listing's sort + id order, the same
+    as the SQL path, so keyset cursors work on both.
+    """
+    try:
+        terms = (
+            ast.literal_eval(geo_filters)
+            if isinstance(geo_filters, str)
+            else geo_filters
+        )
+        geo_dict = dict(terms)
+        if geo_dict.get("from_lat") is None or geo_dict.get("from_lng") is None:
+            return api_response(400, "Latitude and Longitude required")
+        lat = float(geo_dict["from_lat"])
+        lng = float(geo_dict["from_lng"])
+        radius = float(geo_dict.get("radius_from", 5))
+    except (ValueError, TypeError, SyntaxError) as e:
+        return api_response(400, f"Geo filter error: {str(e)}")
+
+    ids = ride_geo_index.within(lat, lng, radius)[0].tolist()
+    if len(ids) > max_ids:
+        return None  # one bind per id, a huge IN list costs more than SQL
+
+    def hook(statement, Model):
+        if not ids:
+            return statement.where(false())
+        return statement.where(Model.id.in_(ids))
+
+    return hook
+
+
+async def build_ride_geo_index(engine: AsyncEngine) -> int:
+    """Load every live ride with a pickup location into ride_geo_index."""
+    now = datetime.now(timezone.utc)
+    statement = select(
+        Ride.id, Ride.from_lat, Ride.from_lng, Ride.arrival_time, Ride.price_per_seat
+    ).where(
+        Ride.active,
+        Ride.arrival_time >= column_datetime(Ride.arrival_time, now),
+        Ride.from_lat.is_not(None),
+        Ride.from_lng.is_not(None),
+    )
+    async with engine.connect() as conn:
+        rows = (await conn.execute(statement)).all()
+    ride_geo_index.load(rows)
+    logger.info("Ride geo index built with %s rides", len(rows))
+    return len(rows)
+
+
+async def refresh_ride(engine: AsyncEngine, ride_id: int) -> None:
+    """Re-read one ride into ride_geo_index (written by another worker)."""
+    statement = select(
+        Ride.id,
+        Ride.from_lat,
+        Ride.from_lng,
+        Ride.arrival_time,
+        Ride.price_per_seat,
+        Ride.active,
+    ).where(Ride.id == ride_id)
+    async with engine.connect() as conn:
+        row = (await conn.execute(statement)).first()
+    if row is None:
+        ride_geo_index.remove(ride_id)
+    else:
+        ride_geo_index.upsert(row)
+
+
+def geo_index_invalidator(engine: AsyncEngine):
+    """Invalidation bus callback for "rides" events."""
+
+    async def invalidate(event) -> None:
+        if event.op == "seats":
+            return  # bookings, seat counts aren't indexed
+        if event.op == "expire":
+            ride_geo_index.prune()
+        elif event.id is None:
+            await build_ride_geo_index(engine)
+        elif event.op == "delete":
+            ride_geo_index.remove(event.id)
+        else:
+            await refresh_ride(engine, event.id)
+
+    return invalidate
+
+
+async def geo_index_loop(engine: AsyncEngine, interval: float) -> None:
+    """Build ride_geo_index now and rebuild it every interval seconds."""
+    while True:
+        try:
+            await build_ride_geo_index(engine)
+        except Exception:
+            logger.exception("Ride geo index build failed")
+        if interval <= 0:
+            return
+        await asyncio.sleep(interval)
@@ -0,0 +1,453 @@
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.sql import sqltypes as SATypes
+
+from src.api.core.operation.search import search_config
+from src.config import INDEX_ADVISOR_MAX_SHAPES, INDEX_ADVISOR_MIN_HITS
+
+# ======================================================
+# 🧭 INDEX ADVISOR
+# ======================================================
+# applyFilters records the *shape* of every list query: which columns are
+# compared with = / ILIKE / a range / JSON containment, which one sorts and
+# which columns the global searchTerm reads.
+# Values are never kept, except booleans, which become partial index
+# predicates (WHERE active). recommend() compares the hot shapes with the
+# indexes that exist in the database and proposes the missing ones.
+
+
+class Shape(NamedTuple):
+    table: str
+    eq: tuple  # columns compared with =
+    flags: tuple  # (boolean column, value) -> partial index WHERE
+    range: Optional[str]  # dateRange / numberRange column
+    sort: Optional[str]  # ORDER BY column, the id tiebreaker is implied
+    ilike: tuple  # string columns filtered with ILIKE '%..%'
+    contains: tuple  # stringArrayFilters / objectArrayFilters columns
+    search: tuple  # columns searchTerm matches (search_text/search_vector or ILIKE)
+
+
+_shapes: Counter = Counter()
+_lock = threading.Lock()
+
+
+def _column_of(attr):
+    # (table name, column name) behind a mapped attribute
+    column = attr.property.columns[0]
+    return column.table.name, column.name
+
+
+def _empty() -> dict:
+    return {
+        "eq": set(),
+        "flags": set(),
+        "range": None,
+        "sort": None,
+        "ilike": set(),
+        "contains": set(),
+        "search": set(),
+    }
+
+
+def _search_columns(Model, plan, search: list) -> list:
+    # Same split as search_condition: covered fields are served by the
+    # generated columns, the others by ILIKE on the column itself
+    config = search_config(Model)
+    covered = set(config["fields"]) if config else set()
+    columns = []
+    if covered.intersection(search):
+        for key in ("text_column", "vector_column"):
+            if config.get(key):
+                column = Model.__table__.c[config[key]]
+                columns.append((column.table.name, column.name))
+    for path in search:
+        column_plan = plan.columns.get(path)
+        if path in covered or column_plan is None:
+            continue
+        # enum labels are matched in Python, no index to propose
+        if isinstance(column_plan.col_type, SATypes.Enum):
+            continue
+        columns.append(_column_of(column_plan.attr))
+    return columns
+
+
+def record_shape(
+    Model,
+    plan,
+    filters: Optional[list] = None,
+    ranges: Optional[list] = None,
+    sort: Optional[str] = None,
+    contains: Optional[list] = None,
+    search: Optional[list] = None,
+) -> None:
+    """
+    filters:  [(path, raw value)] from columnFilters/customFilters
+    ranges:   [column] from dateRange/numberRange (columns of Model)
+    contains: [path] from stringArrayFilters/objectArrayFilters
+    search:   [path] searchFields, when a searchTerm was given
+    Relationship paths ("user.name") are counted for their own table.
+    """
+    tables: dict[str, dict] = {}
+
+    for path, value in filters or []:
+        column_plan = plan.columns.get(path)
+        if column_plan is None:
+            continue
+        table, column = _column_of(column_plan.attr)
+        entry = tables.setdefault(table, _empty())
+        col_type = column_plan.col_type
+        try:
+            value = column_plan.coerce(col_type, value, path)
+        except Exception:
+            continue
+        if isinstance(value, bool):
+            entry["flags"].add((column, value))
+        elif isinstance(value, str):
+            entry["ilike"].add(column)
+        else:
+            entry["eq"].add(column)
+
+    for column_name in ranges or []:
+        attr = getattr(Model, column_name, None)
+        if attr is not None:
+            table, column = _column_of(attr)
+            tables.setdefault(table, _empty())["range"] = column
+
+    if sort and sort in plan.columns:
+        table, column = _column_of(plan.columns[sort].attr)
+        tables.setdefault(table, _empty())["sort"] = column
+
+    for path in contains or []:
+        column_plan = plan.columns.get(path)
+        if column_plan is not None:
+            table, column = _column_of(column_plan.attr)
+            tables.setdefault(table, _empty())["contains"].add(column)
+
+    for table, column in _search_columns(Model, plan, search or []):
+        tables.setdefault(table, _empty())["search"].add(column)
+
+    with _lock:
+        for table, entry in tables.items():
+            shape = Shape(
+                table,
+                tuple(sorted(entry["eq"])),
+                tuple(sorted(entry["flags"])),
+                entry["range"],
+                entry["sort"],
+                tuple(sorted(entry["ilike"])),
+                tuple(sorted(entry["contains"])),
+                tuple(sorted(entry["search"])),
+            )
+            # bounded: unseen shapes are dropped once the counter is full
+            if shape in _shapes or len(_shapes) < INDEX_ADVISOR_MAX_SHAPES:
+                _shapes[shape] += 1
+
+
+def observed_shapes() -> list[dict]:
+    with _lock:
+        items = _shapes.most_common()
+    return [{**shape._asdict(), "hits": hits} for shape, hits in items]
+
+
+def reset_shapes() -> None:
+    with _lock:
+        _shapes.clear()
+
+
+# ======================================================
+# 🔎 RECOMMENDATIONS
+# ======================================================
+class IndexRecommendation(NamedTuple):
+    table: str
+    columns: tuple
+    where: Optional[str] = None
+    using: Optional[str] = None  # None = btree
+    ops: Optional[str] = None  # operator class (gin_trgm_ops, jsonb_path_ops)
+    hits: int = 0
+    reason: str = ""
+
+    @property
+    def name(self) -> str:
+        suffix = {"gin_trgm_ops": "_trgm", "jsonb_path_ops": "_gin"}.get(
+            self.ops, "_gin" if self.using == "gin" else ""
+        )
+        where = (
+            "_" + self.where.replace("NOT ", "not_").replace(" AND ", "_")
+            if self.where
+            else ""
+        )
+        # postgres truncates identifiers at 63 bytes
+        return f"ix_{self.table}_{'_'.join(self.columns)}{suffix}{where}"[:63]
+
+    @property
+    def ddl(self) -> str:
+        using = f" USING {self.using}" if self.using else ""
+        cols = ", ".join(f"{c} {self.ops}" if self.ops else c for c in self.columns)
+        where = f" WHERE {self.where}" if self.where else ""
+        return (
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {self.name} "
+            f"ON {self.table}{using} ({cols}){where};"
+        )
+
+
+def _existing_indexes(inspector, table: str) -> list[dict]:
+    indexes = []
+    for ix in inspector.get_indexes(table):
+        options = ix.get("dialect_options", {})
+        indexes.append(
+            {
+                "columns": [c for c in ix["column_names"] if c],
+                "where": str(options.get("postgresql_where") or ""),
+                "using": options.get("postgresql_using") or "btree",
+            }
+        )
+    pk = inspector.get_pk_constraint(table).get("constrained_columns") or []
+    if pk:
+        indexes.append({"columns": pk, "where": "", "using": "btree"})
+    for unique in inspector.get_unique_constraints(table):
+        indexes.append(
+            {"columns": unique["column_names"], "where": "", "using": "btree"}
+        )
+    return indexes
+
+
+def _btree_covers(index: dict, eq: tuple, next_column: Optional[str]) -> bool:
+    """The index leads with every eq column (any order), then next_column."""
+    if index["using"] != "btree":
+        return False
+    columns = index["columns"]
+    if set(columns[: len(eq)]) != set(eq):
+        return False
+    if next_column is None:
+        return True
+    return len(columns) > len(eq) and columns[len(eq)] == next_column
+
+
+def _usable(index: dict, flags: tuple) -> bool:
+    # A partial index only serves queries that repeat its predicate
+    return not index["where"] or (
+        flags and all(column in index["where"] for column, _ in flags)
+    )
+
+
+def _has_gin(indexes: list[dict], column: str) -> bool:
+    return any(ix["using"] == "gin" and column in ix["columns"] for ix in indexes)
+
+
+def _reason(shape: Shape) -> str:
+    parts = []
+    if shape.eq:
+        parts.append("= " + ", ".join(shape.eq))
+    if shape.flags:
+        parts.append("flags " + ", ".join(f"{c}={v}" for c, v in shape.flags))
+    if shape.range:
+        parts.append(f"range {shape.range}")
+    if shape.sort:
+        parts.append(f"sort {shape.sort}")
+    if shape.search:
+        parts.append("search " + ", ".join(shape.search))
+    return "; ".join(parts)
+
+
+def recommend(
+    engine, min_hits: int = INDEX_ADVISOR_MIN_HITS
+) -> list[IndexRecommendation]:
+    """Missing indexes for shapes seen at least min_hits times, hottest first."""
+    with _lock:
+        shapes = _shapes.most_common()
+
+    inspector = inspect(engine)
+    existing: dict[str, list[dict]] = {}
+    columns: dict[str, dict] = {}
+    found: dict[tuple, IndexRecommendation] = {}
+
+    def add(rec: IndexRecommendation):
+        key = (rec.table, rec.columns, rec.where, rec.using, rec.ops)
+        if key in found:
+            rec = rec._replace(hits=rec.hits + found[key].hits)
+        found[key] = rec
+
+    for shape, hits in shapes:
+        if hits < min_hits:
+            continue
+        if shape.table not in existing:
+            if not inspector.has_table(shape.table):
+                continue
+            existing[shape.table] = _existing_indexes(inspector, shape.table)
+            columns[shape.table] = {
+                c["name"]: c["type"] for c in inspector.get_columns(shape.table)
+            }
+        indexes = existing[shape.table]
+
+        # B-tree: equality columns first, then the range column, else the
+        # sort column (+ id, the tiebreaker) so ORDER BY ... LIMIT walks the index
+        next_column = shape.range or shape.sort
+        if shape.eq or next_column:
+            where = " AND ".join(
+                column if value else f"NOT {column}" for column, value in shape.flags
+            )
+            usable = [ix for ix in indexes if _usable(ix, shape.flags)]
+            if not any(_btree_covers(ix, shape.eq, next_column) for ix in usable):
+                cols = [*shape.eq, *([next_column] if next_column else [])]
+                if next_column == shape.sort and shape.sort != "id":
+                    cols.append("id")
+                add(
+                    IndexRecommendation(
+                        shape.table,
+                        tuple(cols),
+                        where=where or None,
+                        hits=hits,
+                        reason=_reason(shape),
+                    )
+                )
+
+        # ILIKE '%term%' can only use a trigram index
+        for column in shape.ilike:
+            if not _has_gin(indexes, column):
+                add(
+                    IndexRecommendation(
+                        shape.table,
+                        (column,),
+                        using="gin",
+                        ops="gin_trgm_ops",
+                        hits=hits,
+                        reason=f"ILIKE on {column} (pg_trgm)",
+                    )
+                )
+
+        # Containment on JSON arrays — plain json has no GIN operator class
+        for column in shape.contains:
+            if not isinstance(columns[shape.table].get(column), JSONB):
+                continue
+            if not _has_gin(indexes, column):
+                add(
+                    IndexRecommendation(
+                        shape.table,
+                        (column,),
+                        using="gin",
+                        ops="jsonb_path_ops",
+                        hits=hits,
+                        reason=f"JSON containment on {column}",
+                    )
+                )
+
+        # searchTerm: tsvector @@ needs a plain GIN, ILIKE / <% a trigram one
+        for column in shape.search:
+            if _has_gin(indexes, column):
+                continue
+            fulltext = isinstance(columns[shape.table].get(column), TSVECTOR)
+            add(
+                IndexRecommendation(
+                    shape.table,
+                    (column,),
+                    using="gin",
+                    ops=None if fulltext else "gin_trgm_ops",
+                    hits=hits,
+                    reason=f"searchTerm on {column}"
+                    + (" (tsvector)" if fulltext else " (pg_trgm)"),
+                )
+            )
+
+    return sorted(found.values(), key=lambda rec: -rec.hits)
+
+
+# ======================================================
+# 📝 DRAFT MIGRATION
+# ======================================================
+def _create_index(rec: IndexRecommendation) -> str:
+    lines = [
+        "        op.create_index(",
+        f'            "{rec.name}",',
+        f'            "{rec.table}",',
+        "            [" + ", ".join(f'"{c}"' for c in rec.columns) + "],",
+        "            unique=False,",
+    ]
+    if rec.using:
+        lines.append(f'            postgresql_using="{rec.using}",')
+    if rec.ops:
+        ops = ", ".join(f'"{c}": "{rec.ops}"' for c in rec.columns)
+        lines.append(f"            postgresql_ops={{{ops}}},")
+    if rec.where:
+        lines.append(f'            postgresql_where=sa.text("{rec.where}"),')
+    lines.append("            postgresql_concurrently=True,")
+    lines.append("        )")
+    return "\n".join(lines)
+
+
+def render_revision(
+    recommendations: list[IndexRecommendation],
+    down_revision: Optional[str],
+    message: str = "advised list indexes",
+) -> tuple[str, str]:
+    """(revision id, source) of an Alembic revision creating the indexes."""
+    revision = uuid.uuid4().hex[-12:]
+    upgrade = []
+    if any(rec.ops == "gin_trgm_ops" for rec in recommendations):
+        upgrade.append('    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")')
+    upgrade.append("    # CONCURRENTLY can't run inside a transaction")
+    upgrade.append("    with op.get_context().autocommit_block():")
+    upgrade.extend(_create_index(rec) for rec in recommendations)
+    downgrade = [
+        f'    op.drop_index("{rec.name}", table_name="{rec.table}")'
+        for rec in reversed(recommendations)
+    ]
+    upgrade_body = "\n".join(upgrade) if recommendations else "    pass"
+    downgrade_body = "\n".join(downgrade) or "    pass"
+
+    source = f'''"""{message}
+
+Revision ID: {revision}
+Revises: {down_revision or ""}
+Create Date: {datetime.now()}
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "{revision}"
+down_revision: Union[str, Sequence[str], None] = {f'"{down_revision}"' if down_revision else None}
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+{upgrade_body}
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+{downgrade_body}
+'''
+    return revision, source
+
+
+def draft_revision(
+    recommendations: list[IndexRecommendation],
+    config_file: str = "alembic.ini",
+) -> dict:
+    """
+    Render the draft chained on the current Alembic head. Nothing is written:
+    save the source under migration/versions/<filename> and review it
+    before `alembic upgrade`.
+    """
+    # alembic is only needed here, not on every request
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    script = ScriptDirectory.from_config(Config(config_file))
+    revision, source = render_revision(recommendations, script.get_current_head())
+    return {
+        "revision": revision,
+        "filename": f"{revision}_advised_list_indexes.py",
+        "source": source,
+    }
@@ -0,0 +1,134 @@
+import time
+from threading import Lock
+from typing import Awaitable, Callable, Hashable, Iterable
+
+from fastapi.responses import JSONResponse, Response
+
+from src.api.core.cache import LRUCache
+from src.config import LIST_CACHE_PRIMARY_WINDOW, LIST_CACHE_SIZE, LIST_CACHE_TTL
+from src.lib.replicas import RoutingSession
+
+# ======================================================
+# 🔢 TABLE GENERATIONS
+# ======================================================
+# Every write route bumps the generation of the tables it touched.
+# Cache keys embed the generations they were built from, so a bump makes
+# all older entries unreachable (they age out of the LRU on their own).
+_generations: dict[str, int] = {}
+_bumped_at: dict[str, float] = {}
+_generations_lock = Lock()
+
+
+def bump_generation(*tables: str) -> None:
+    """Call after session.commit() in create/update/delete routes."""
+    now = time.monotonic()
+    with _generations_lock:
+        for table in tables:
+            _generations[table] = _generations.get(table, 0) + 1
+            _bumped_at[table] = now
+
+
+def invalidate_change(event) -> None:
+    """Invalidation bus callback: another worker wrote event.table."""
+    bump_generation(event.table, *event.related)
+
+
+def table_generations(tables: Iterable[str]) -> tuple:
+    return tuple((table, _generations.get(table, 0)) for table in sorted(set(tables)))
+
+
+def recently_bumped(tables: Iterable[str], window: float) -> bool:
+    """True when one of tables was bumped less than window seconds ago."""
+    since = time.monotonic() - window
+    return any(_bumped_at.get(table, -window) > since for table in tables)
+
+
+# ======================================================
+# 🗄️ RESULT CACHE
+# ======================================================
+_result_cache = LRUCache(maxsize=LIST_CACHE_SIZE, ttl=LIST_CACHE_TTL)
+
+
+def _freeze(value) -> Hashable:
+    # query_params / filters -> hashable, order independent for dicts
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items() if v is not None))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def list_cache_key(namespace: str, tables: Iterable[str], *parts) -> tuple:
+    """
+    Build a key from the route namespace, the current generation of every
+    table the response reads, and the normalized request parts.
+    Generations are read BEFORE the query runs, so a write that lands while
+    the page is being built leaves it under an already stale key.
+    """
+    return (namespace, table_generations(tables), _freeze(parts))
+
+
+def cached_response(key: tuple, build: Callable[[], JSONResponse]) -> Response:
+    """
+    Return the cached body for key, or build() it and keep it when it
+    succeeded. Errors raised by build() (api_response >= 400) are not cached.
+    """
+    hit = _cached_hit(key)
+    if hit is not None:
+        return hit
+    return _store(key, build())
+
+
+async def acached_response(
+    key: tuple, build: Callable[[], Awaitable[JSONResponse]]
+) -> Response:
+    hit = _cached_hit(key)
+    if hit is not None:
+        return hit
+    return _store(key, await build())
+
+
+def fill_session(session, tables: Iterable[str]):
+    """
+    session, switched to the primary when one of tables was written in the
+    last LIST_CACHE_PRIMARY_WINDOW seconds: a replica may still miss the
+    write and the page would be cached under the new generation. Wrap the
+    session given to every cache fill, e.g.
+        cached_response(key, lambda: build(fill_session(session, tables)))
+    """
+    routing = getattr(session, "sync_session", session)
+    if isinstance(routing, RoutingSession) and recently_bumped(
+        tables, LIST_CACHE_PRIMARY_WINDOW
+    ):
+        routing.use_primary()
+    return session
+
+
+def _cached_hit(key: tuple) -> Response | None:
+    body = _result_cache.get(key)
+    if body is None:
+        return None
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"X-Cache": "HIT"},
+    )
+
+
+def _store(key: tuple, response: JSONResponse) -> JSONResponse:
+    if response.status_code == 200:
+        _result_cache.set(key, response.body)
+    response.headers["X-Cache"] = "MISS"
+    return response
+
+
+def list_cache_stats() -> dict:
+    return {
+        **_result_cache.stats(),
+        "ttl": _result_cache.ttl,
+        "generations": dict(_generations),
+    }
+
+
+def clear_list_cache() -> None:
+    _result_cache.clear()
@@ -1,13 +1,21 @@
 import ast
+import base64
+import binascii
 from datetime import datetime, timezone
+from functools import lru_cache
 import json
-from typing import List, Optional
-from sqlalchemy import Float, cast
-from sqlmodel import SQLModel, and_, asc, desc, func, or_
+from typing import Any, Callable, List, NamedTuple, Optional
+from sqlalchemy import tuple_
+from sqlmodel import SQLModel, and_, asc, desc, func, not_, or_
 from sqlmodel.sql.expression import Select, SelectOfScalar
 
+from src.api.core.cache import LRUCache
+from src.api.core.operation.geo import geo_radius_filter
+from src.api.core.operation.index_advisor import record_shape
+from src.api.core.operation.search import search_condition, search_rank
 from src.api.core.response import api_response
-from src.api.core.utility import parse_date
+from src.api.core.utility import parse_date, parse_dates
+from src.config import LIST_PLAN_CACHE_SIZE
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import sqltypes as SATypes
 
@@ -15,9 +23,13 @@ from sqlalchemy.sql import sqltypes as SATypes
 def _get_column_type(attr):
     # attr is InstrumentedAttribute of a column
     try:
-        return attr.property.columns[0].type
+        col_type = attr.property.columns[0].type
     except Exception:
         return None  # relationship or something unexpected
+    # SQLModel wraps str/datetime columns in TypeDecorators (AutoString, ...)
+    while isinstance(col_type, SATypes.TypeDecorator):
+        col_type = col_type.impl
+    return col_type
 
 
 def _is_string_type(t):
@@ -42,69 +54,281 @@ def _is_datetime_type(t):
     return isinstance(t, SATypes.DateTime)
 
 
-def _coerce_value_for_column(col_type, value, col_name: str):
-    """Coerce incoming value (possibly a string) to a Python value compatible with the column type."""
-    if col_type is None:
-        # Fallback – treat as string
+def _coerce_number(col_type, value, col_name: str):
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        v = value.strip()
+        try:
+            if _is_integer_type(col_type):
+                return int(v)
+            else:
+                return float(v)
+        except ValueError:
+            raise api_response(
+                400,
+                f"Column '{col_name}' expects a number; got '{value}'.",
+            )
+    raise api_response(400, f"Column '{col_name}' expects a number.")
+
+
+def _coerce_bool(col_type, value, col_name: str):
+    if isinstance(value, bool):
         return value
+    if isinstance(value, str):
+        v = value.strip().lower()
+        if v in ("true", "1", "yes"):
+            return True
+        if v in ("false", "0", "no"):
+            return False
+    raise api_response(400, f"Column '{col_name}' expects a boolean.")
+
+
+def _coerce_datetime(col_type, value, col_name: str):
+    if isinstance(value, str):
+        # reuse your existing parse_date
+        return parse_date(value)
+    raise api_response(400, f"Column '{col_name}' expects a datetime string.")
+
+
+def _coerce_string(col_type, value, col_name: str):
+    # string-like or other -> ensure string
+    return str(value) if not isinstance(value, str) else value
 
+
+def _coerce_passthrough(col_type, value, col_name: str):
+    # Fallback – treat as string
+    return value
+
+
+def _coercer_for(col_type):
+    """Pick the coercion function once per column (stored in the filter plan)."""
+    if col_type is None:
+        return _coerce_passthrough
     if _is_numeric_type(col_type):
-        if isinstance(value, (int, float)):
-            return value
-        if isinstance(value, str):
-            v = value.strip()
-            try:
-                if _is_integer_type(col_type):
-                    return int(v)
-                else:
-                    return float(v)
-            except ValueError:
-                raise api_response(
-                    400,
-                    f"Column '{col_name}' expects a number; got '{value}'.",
-                )
-        raise api_response(400, f"Column '{col_name}' expects a number.")
-    elif _is_bool_type(col_type):
-        if isinstance(value, bool):
-            return value
-        if isinstance(value, str):
-            v = value.strip().lower()
-            if v in ("true", "1", "yes"):
-                return True
-            if v in ("false", "0", "no"):
-                return False
-        raise api_response(400, f"Column '{col_name}' expects a boolean.")
-    elif _is_datetime_type(col_type):
-        if isinstance(value, str):
-            # reuse your existing parse_date
-            return parse_date(value)
-        raise api_response(400, f"Column '{col_name}' expects a datetime string.")
-    else:
-        # string-like or other -> ensure string
-        return str(value) if not isinstance(value, str) else value
-
-
-def resolve_column(Model, col: str, statement):  # nested object filter
-    """
-    Given 'product.owner.role.title', return (attr, updated_statement).
-    """
+        return _coerce_number
+    if _is_bool_type(col_type):
+        return _coerce_bool
+    if _is_datetime_type(col_type):
+        return _coerce_datetime
+    return _coerce_string
+
+
+def _coerce_value_for_column(col_type, value, col_name: str):
+    """Coerce incoming value (possibly a string) to a Python value compatible with the column type."""
+    return _coercer_for(col_type)(col_type, value, col_name)
+
+
+# ===================
+# FILTER PLAN CACHE ====================================
+# ===================
+# Resolving 'user.role.title' walks the mapper on every request and parsing the
+# filter strings runs ast.literal_eval/json.loads each time. Clients send a
+# handful of filter *shapes* with different values, so the shape -> plan
+# (joins, attributes, coercers) is cached and only the values are bound per
+# request. SQLAlchemy's own compiled cache then reuses the SQL string.
+class ColumnPlan(NamedTuple):
+    attr: Any
+    joins: tuple  # relationship attributes to outer-join, in path order
+    col_type: Any
+    coerce: Callable
+
+
+class FilterPlan(NamedTuple):
+    joins: tuple  # deduplicated joins for every path of the shape
+    columns: dict  # path -> ColumnPlan (missing if the path doesn't resolve)
+
+
+_plan_cache = LRUCache(maxsize=LIST_PLAN_CACHE_SIZE)
+
+
+def _column_plan(Model, col: str) -> ColumnPlan:
+    """Given 'product.owner.role.title', return its ColumnPlan (no statement involved)."""
     parts = col.split(".")
     current_model = Model
     attr = None
+    joins = []
 
-    for i, part in enumerate(parts):  # enumerate = index + value in one go
+    for part in parts:
         mapper_attr = getattr(current_model, part)
 
         if hasattr(mapper_attr, "property") and hasattr(mapper_attr.property, "mapper"):
             # It's a relationship -> join it
-            related_model = mapper_attr.property.mapper.class_
-            statement = statement.join(mapper_attr, isouter=True)
-            current_model = related_model
+            joins.append(mapper_attr)
+            current_model = mapper_attr.property.mapper.class_
         else:
             # It's a column
             attr = mapper_attr
 
-    return attr, statement
+    col_type = _get_column_type(attr)
+    return ColumnPlan(attr, tuple(joins), col_type, _coercer_for(col_type))
+
+
+def get_filter_plan(Model, paths) -> FilterPlan:
+    shape = (Model, tuple(sorted(set(paths))))
+    plan = _plan_cache.get(shape)
+    if plan is not None:
+        return plan
+
+    columns = {}
+    joins = []
+    joined = set()  # relationship properties (attributes overload ==)
+    for col in shape[1]:
+        try:
+            column_plan = _column_plan(Model, col)
+        except AttributeError:
+            continue  # reported when the filter actually uses it
+        columns[col] = column_plan
+        for join in column_plan.joins:
+            if join.property not in joined:
+                joined.add(join.property)
+                joins.append(join)
+
+    plan = FilterPlan(tuple(joins), columns)
+    _plan_cache.set(shape, plan)
+    return plan
+
+
+@lru_cache(maxsize=LIST_PLAN_CACHE_SIZE)
+def _parse_filter(raw: str, parser: str):
+    """Parse a filter query string once; identical strings come from the cache."""
+    parsed = ast.literal_eval(raw) if parser == "literal" else json.loads(raw)
+    return _freeze(parsed)
+
+
+def _freeze(value):
+    # Cached results are shared between requests -> make them immutable
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def plan_cache_stats() -> dict:
+    parsed = _parse_filter.cache_info()
+    return {
+        "plans": _plan_cache.stats(),
+        "parsed_filters": {
+            "size": parsed.currsize,
+            "maxsize": parsed.maxsize,
+            "hits": parsed.hits,
+            "misses": parsed.misses,
+        },
+    }
+
+
+def resolve_column(Model, col: str, statement, plan: FilterPlan = None):
+    """
+    Given 'product.owner.role.title', return (attr, updated_statement).
+    With a plan the joins were already applied once for the whole shape.
+    """
+    if plan is not None:
+        column_plan = plan.columns.get(col)
+        if column_plan is None:
+            raise AttributeError(f"{Model.__name__} has no column '{col}'")
+        return column_plan.attr, statement
+
+    column_plan = _column_plan(Model, col)
+    for join in column_plan.joins:
+        statement = statement.join(join, isouter=True)
+    return column_plan.attr, statement
+
+
+def parse_sort(sort: str):
+    """'["created_at","desc"]' -> ("created_at", "desc")"""
+    column_name, direction = _parse_filter(sort, "json")
+    return column_name, direction.lower()
+
+
+def _sorts_lowercase(attr) -> bool:
+    # Case-insensitive sorting for String/Text columns. The declared type is
+    # checked, not the unwrapped one: AutoString columns sort by their raw
+    # value, so a plain b-tree index serves ORDER BY ... LIMIT
+    try:
+        return _is_string_type(attr.property.columns[0].type)
+    except Exception:
+        return False
+
+
+def _order_expression(attr):
+    if _sorts_lowercase(attr):
+        return func.lower(attr)
+    return attr
+
+
+# ===================
+# KEYSET (CURSOR) PAGINATION ====================================
+# ===================
+# The cursor is an opaque token holding the sort spec plus the last row's
+# sort value and id. The next page is "everything after (value, id)" in sort
+# order, so deep pages cost the same as page 1 (no OFFSET scan).
+def encode_cursor(sort_spec, value, row_id) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif hasattr(value, "value"):  # Enum
+        value = value.value
+    raw = json.dumps([list(sort_spec), value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_spec, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return tuple(sort_spec), value, row_id
+    except (binascii.Error, ValueError, TypeError):
+        raise api_response(400, "Invalid cursor")
+
+
+def keyset_column(Model, sort: str):
+    """Cursor mode sorts on a plain column of the model (no relationship paths)."""
+    column_name, direction = parse_sort(sort)
+    if "." in column_name or direction not in ("asc", "desc"):
+        raise api_response(400, "Cursor pagination needs a plain column sort")
+    attr = getattr(Model, column_name, None)
+    if attr is None:
+        raise api_response(400, f"Invalid sort column '{column_name}'")
+    return attr, (column_name, direction)
+
+
+def apply_keyset(statement, Model, sort: str, cursor: str):
+    """Add the WHERE (sort_col, id) > / < (last_value, last_id) condition."""
+    attr, sort_spec = keyset_column(Model, sort)
+    cursor_spec, value, row_id = decode_cursor(cursor)
+    if cursor_spec != sort_spec:
+        raise api_response(400, "Cursor does not match the sort parameter")
+
+    col_type = _get_column_type(attr)
+    order_expr = _order_expression(attr)
+    ascending = sort_spec[1] == "asc"
+    # Postgres sorts NULLs last for asc and first for desc
+    if value is None:
+        after = Model.id > row_id if ascending else Model.id < row_id
+        condition = and_(order_expr.is_(None), after)
+        if not ascending:
+            condition = or_(condition, order_expr.is_not(None))
+        return statement.where(condition)
+
+    if _is_datetime_type(col_type):
+        value = datetime.fromisoformat(value)
+    last_value = func.lower(value) if _sorts_lowercase(attr) else value
+    keyset = tuple_(order_expr, Model.id)
+    if not ascending:
+        return statement.where(keyset < tuple_(last_value, row_id))
+    condition = keyset > tuple_(last_value, row_id)
+    if _nullable(attr):
+        # the NULL rows still follow the last non-NULL value
+        condition = or_(condition, order_expr.is_(None))
+    return statement.where(condition)
+
+
+def _nullable(attr) -> bool:
+    return all(column.nullable for column in attr.property.columns)
+
+
+def next_cursor(rows, Model, sort: str):
+    attr, sort_spec = keyset_column(Model, sort)
+    last = rows[-1]
+    return encode_cursor(sort_spec, getattr(last, attr.key), last.id)
 
 
 # ===================
@@ -113,7 +337,7 @@ def resolve_column(Model, col: str, statement):  # nested object filter
 # -------------------------
 # string_array_filter
 # -------------------------
-def string_array_filter(statement: Select, Model, parsed_filters):
+def string_array_filter(statement: Select, Model, parsed_filters, plan=None):
     """
     parsed_filters expected format:
     [
@@ -135,7 +359,7 @@ def string_array_filter(statement: Select, Model, parsed_filters):
         if not isinstance(values, (list, tuple)):
             values = [values]
 
-        attr, statement = resolve_column(Model, col_name, statement)
+        attr, statement = resolve_column(Model, col_name, statement, plan)
         col_type = _get_column_type(attr)
 
         ors = []
@@ -157,7 +381,7 @@ def string_array_filter(statement: Select, Model, parsed_filters):
 
 # object_array_filter
 # -------------------------
-def object_array_filter(statement: Select, Model, parsed_filters):
+def object_array_filter(statement: Select, Model, parsed_filters, plan=None):
     """
     parsed_filters expected examples (multiple forms supported):
 
@@ -200,7 +424,7 @@ def object_array_filter(statement: Select, Model, parsed_filters):
         ]  # list of arrays like ["name","color"] or ["values", ["value","Red"], ...]
 
         try:
-            attr, statement = resolve_column(Model, col_name, statement)
+            attr, statement = resolve_column(Model, col_name, statement, plan)
         except Exception:
             continue
 
@@ -281,6 +505,24 @@ def object_array_filter(statement: Select, Model, parsed_filters):
     return statement
 
 
+def column_datetime(column, value: datetime) -> datetime:
+    """
+    Naive UTC for "timestamp without time zone" columns: a timestamptz bound
+    is only comparable at run time, a plain timestamp lets the planner prune
+    partitions (rides.arrival_time) up front.
+    """
+    if not getattr(column.type, "timezone", True):
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _bool_condition(attr, value: bool):
+    # "active" / "NOT active" rather than "active = $1": a partial index
+    # WHERE active is only used when the planner can see the predicate,
+    # which a bound parameter hides on prepared (asyncpg) statements
+    return attr if value else not_(attr)
+
+
 def applyFilters(
     statement: SelectOfScalar,
     Model: type[SQLModel],
@@ -295,28 +537,82 @@ def applyFilters(
     stringArrayFilters: Optional[List[List[str]]] = None,
     objectArrayFilters: Optional[List[List[str]]] = None,
     geoFilters: Optional[List[List[str]]] = None,
+    searchRank: bool = False,
 ):
 
     if otherFilters:
         # pass the current statement through the hook
         statement = otherFilters(statement, Model)
+
+    # Parse the query strings first (cached), they decide the plan's shape
+    paths = []
+    try:
+        if columnFilters:
+            columnFilters = _parse_filter(columnFilters, "literal")
+            paths.extend(col for col, _ in columnFilters)
+    except Exception as e:
+        return api_response(
+            400,
+            f" {e}",
+        )
+    try:
+        if stringArrayFilters and isinstance(stringArrayFilters, str):
+            stringArrayFilters = _parse_filter(stringArrayFilters, "literal")
+    except Exception as e:
+        return api_response(400, f"stringArrayFilter parse error: {e}")
+    try:
+        if objectArrayFilters and isinstance(objectArrayFilters, str):
+            objectArrayFilters = _parse_filter(objectArrayFilters, "literal")
+    except Exception as e:
+        return api_response(400, f"objectArrayFilter parse error: {e}")
+
+    if searchTerm and searchFields:
+        paths.extend(searchFields)
+    if customFilters:
+        paths.extend(col for col, _ in customFilters)
+    if sort:
+        try:
+            paths.append(parse_sort(sort)[0])
+        except Exception as e:
+            return api_response(
+                400,
+                f"Invalid sort parameter: {e}",
+            )
+    for entries in (stringArrayFilters, objectArrayFilters):
+        if entries:
+            paths.extend(
+                entry[0]
+                for entry in entries
+                if isinstance(entry, (list, tuple)) and entry
+            )
+
+    # Join every relationship of the shape exactly once
+    plan = get_filter_plan(Model, paths)
+    for join in plan.joins:
+        statement = statement.join(join, isouter=True)
+
     # Global search
     if searchTerm and searchFields:
         # search_filters = [
         #     getattr(Model, field).ilike(f"%{searchTerm}%") for field in searchTerms
         # ]
-        search_filters = []
-        for col in searchFields:
-            attr, statement = resolve_column(Model, col, statement)
-            search_filters.append(attr.ilike(f"%{searchTerm}%"))
-        statement = statement.where(or_(*search_filters))
+        def resolve_search_field(col):
+            if col not in plan.columns:
+                resolve_column(Model, col, statement, plan)  # raises
+            return plan.columns[col]
+
+        statement = statement.where(
+            search_condition(Model, searchTerm, searchFields, resolve_search_field)
+        )
+
+        # Most relevant first (tsvector rank), the sort below breaks ties
+        rank = search_rank(Model, searchTerm) if searchRank else None
+        if rank is not None:
+            statement = statement.order_by(desc(rank))
 
     # Column-specific search
     if columnFilters:
         try:
-            parsed_terms = ast.literal_eval(columnFilters)
-            columnFilters = [tuple(sublist) for sublist in parsed_terms]
-
             # Group filters by column name
             grouped = {}
             for col, value in columnFilters:
@@ -324,11 +620,11 @@ def applyFilters(
 
             filters = []
             for col, values in grouped.items():
-                attr, statement = resolve_column(Model, col, statement)
-                col_type = _get_column_type(attr)
+                attr, statement = resolve_column(Model, col, statement, plan)
+                column_plan = plan.columns[col]
 
                 coerced_values = [
-                    _coerce_value_for_column(col_type, v, col) for v in values
+                    column_plan.coerce(column_plan.col_type, v, col) for v in values
                 ]
 
                 # If multiple values → OR
@@ -336,6 +632,8 @@ def applyFilters(
                 for v in coerced_values:
                     if isinstance(v, str):
                         ors.append(attr.ilike(f"%{v}%"))
+                    elif isinstance(v, bool):
+                        ors.append(_bool_condition(attr, v))
                     else:
                         ors.append(attr == v)
                 filters.append(or_(*ors))
@@ -351,24 +649,29 @@ def applyFilters(
     if customFilters:
         filters = []
         for col, value in customFilters:
-            attr, statement = resolve_column(Model, col, statement)
+            attr, statement = resolve_column(Model, col, statement, plan)
             # optional handling formats
-            col_type = _get_column_type(attr)
-            value = _coerce_value_for_column(col_type, value, col)
+            column_plan = plan.columns[col]
+            value = column_plan.coerce(column_plan.col_type, value, col)
 
             if isinstance(value, str):
                 filters.append(attr.ilike(f"%{value}%"))
+            elif isinstance(value, bool):
+                filters.append(_bool_condition(attr, value))
             else:
                 filters.append(attr == value)
 
         if filters:
             statement = statement.where(and_(*filters))
 
+    ranges = []
+
     # Number range
     if numberRange:
         # number_range should be like ("amount", "0", "100000")
-        parsed = tuple(json.loads(numberRange))
+        parsed = _parse_filter(numberRange, "json")
         column_name, *values = parsed  # first element is column name, rest are values
+        ranges.append(column_name)
 
         # Assign safely
         min_val = float(values[0]) if len(values) >= 1 and values[0] else None
@@ -386,15 +689,16 @@ def applyFilters(
 
     # Date range
     if dateRange:
-        dateRangeParse = json.loads(dateRange)
-        dateRange = tuple(dateRangeParse)
-        print("===========================daterange", dateRange)
+        dateRange = _parse_filter(dateRange, "json")
 
         column_name = dateRange[0]  # e.g. "created_at"
         column = getattr(Model, column_name)  # map to SQLModel column
+        ranges.append(column_name)
 
-        start_date = parse_date(dateRange[1])
-        end_date = parse_date(dateRange[2]) if len(dateRange) > 2 else None
+        start_date, *end = parse_dates(dateRange[1:3])
+        end_date = end[0] if end else None
+        start_date = column_datetime(column, start_date)
+        end_date = column_datetime(column, end_date) if end_date else None
 
         statement = (
             statement.where(and_(column >= start_date, column <= end_date))
@@ -406,50 +710,35 @@ def applyFilters(
 
     if sort:
         try:
-            column_name, direction = json.loads(sort)
-            attr, statement = resolve_column(Model, column_name, statement)
-            col_type = _get_column_type(attr)
-
-            # Case-insensitive sorting for strings
-            if _is_string_type(col_type):
-                order_expr = func.lower(attr)
-            else:
-                order_expr = attr
+            column_name, direction = parse_sort(sort)
+            attr, statement = resolve_column(Model, column_name, statement, plan)
+            order_expr = _order_expression(attr)
+            # id breaks ties so pages never repeat/skip rows with equal sort values
+            tiebreaker = getattr(Model, "id", None)
 
-            if direction.lower() in ["asc", "asc"]:
+            if direction == "asc":
                 statement = statement.order_by(asc(order_expr))
-            elif direction.lower() in ["desc", "desc"]:
+                if tiebreaker is not None:
+                    statement = statement.order_by(asc(tiebreaker))
+            elif direction == "desc":
                 statement = statement.order_by(desc(order_expr))
+                if tiebreaker is not None:
+                    statement = statement.order_by(desc(tiebreaker))
         except Exception as e:
             return api_response(
                 400,
                 f"Invalid sort parameter: {e}",
             )
     if stringArrayFilters:
-        string_array_raw = stringArrayFilters
-        if string_array_raw:
-            try:
-                parsed = (
-                    ast.literal_eval(string_array_raw)
-                    if isinstance(string_array_raw, str)
-                    else string_array_raw
-                )
-                statement = string_array_filter(statement, Model, parsed)
-            except Exception as e:
-                return api_response(400, f"stringArrayFilter parse error: {e}")
+        try:
+            statement = string_array_filter(statement, Model, stringArrayFilters, plan)
+        except Exception as e:
+            return api_response(400, f"stringArrayFilter parse error: {e}")
     if objectArrayFilters:
-        object_array_raw = objectArrayFilters
-
-        if object_array_raw:
-            try:
-                parsed = (
-                    ast.literal_eval(object_array_raw)
-                    if isinstance(object_array_raw, str)
-                    else object_array_raw
-                )
-                statement = object_array_filter(statement, Model, parsed)
-            except Exception as e:
-                return api_response(400, f"objectArrayFilter parse error: {e}")
+        try:
+            statement = object_array_filter(statement, Model, objectArrayFilters, plan)
+        except Exception as e:
+            return api_response(400, f"objectArrayFilter parse error: {e}")
 
     # ======================================
     # GEO FILTER
@@ -458,46 +747,43 @@ def applyFilters(
     if geoFilters:
         try:
             parsed_terms = (
-                ast.literal_eval(geoFilters)
+                _parse_filter(geoFilters, "literal")
                 if isinstance(geoFilters, str)
                 else geoFilters
             )
 
             geo_dict = dict(parsed_terms)
 
+            if geo_dict.get("from_lat") is None or geo_dict.get("from_lng") is None:
+                return api_response(400, "Latitude and Longitude required")
+
             lat = float(geo_dict.get("from_lat"))
             lng = float(geo_dict.get("from_lng"))
             radius = float(geo_dict.get("radius_from", 5))
 
-            if lat is None or lng is None:
-                return api_response(400, "Latitude and Longitude required")
-
-            # 🔥 CORRECT WAY (no .astext)
-            coordinates = Model.from_location.op("->")("coordinates")
-
-            lng_col = cast(
-                coordinates.op("->>")(0),  # ->> 0
-                Float,
-            )
-
-            lat_col = cast(
-                coordinates.op("->>")(1),  # ->> 1
-                Float,
-            )
-
-            # Haversine (KM)
-            distance = 6371 * func.acos(
-                func.cos(func.radians(lat))
-                * func.cos(func.radians(lat_col))
-                * func.cos(func.radians(lng_col) - func.radians(lng))
-                + func.sin(func.radians(lat)) * func.sin(func.radians(lat_col))
-            )
-
-            statement = statement.where(distance <= radius)
+            # Bounding box on the indexed from_lat/from_lng, haversine on candidates
+            statement, distance = geo_radius_filter(statement, Model, lat, lng, radius)
 
             # Optional: sort nearest first
             statement = statement.order_by(distance.asc())
 
         except Exception as e:
             return api_response(400, f"Geo filter error: {str(e)}")
+
+    # Feed the index advisor (shape only, see /system/index-advisor)
+    record_shape(
+        Model,
+        plan,
+        filters=[*(columnFilters or []), *(customFilters or [])],
+        ranges=ranges,
+        sort=parse_sort(sort)[0] if sort else None,
+        contains=[
+            entry[0]
+            for entries in (stringArrayFilters, objectArrayFilters)
+            if entries
+            for entry in entries
+            if isinstance(entry, (list, tuple)) and entry
+        ],
+        search=searchFields if searchTerm else None,
+    )
     return statement
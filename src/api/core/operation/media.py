@@ -9,6 +9,7 @@ from sqlalchemy import func
 import os
 from typing import List, Optional, TypedDict
 from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 BASE_DIR = "/var/www"
 SUB_DIR = "travelmedia"
@@ -29,36 +30,52 @@ class MediaType(TypedDict):
     media_type: str
 
 
+def _media_record(existing_media, file_info: MediaType) -> Media:
+    if existing_media:
+        # ✅ Update existing record
+        existing_media.extension = file_info["extension"]
+        existing_media.original = file_info["original"]
+        existing_media.size_mb = file_info["size_mb"]
+        existing_media.thumbnail = file_info.get("thumbnail")
+        existing_media.media_type = "image"
+        return existing_media
+
+    # ✅ Create new record
+    return Media(
+        filename=file_info["filename"],
+        extension=file_info["extension"],
+        original=file_info["original"],
+        size_mb=file_info["size_mb"],
+        thumbnail=file_info.get("thumbnail"),
+        media_type="image",
+    )
+
+
 def entryMedia(session: GetSession, files: List[MediaType]):
     records = []
     for file_info in files:
         existing_media = session.scalar(
             select(Media).where(Media.filename == file_info["filename"])
         )
-        print(existing_media)
-
-        if existing_media:
-            # ✅ Update existing record
-            existing_media.extension = file_info["extension"]
-            existing_media.original = file_info["original"]
-            existing_media.size_mb = file_info["size_mb"]
-            existing_media.thumbnail = file_info.get("thumbnail")
-            existing_media.media_type = "image"
-            session.add(existing_media)
-            records.append(existing_media)
-        else:
-            # ✅ Create new record
-            media = Media(
-                filename=file_info["filename"],
-                extension=file_info["extension"],
-                original=file_info["original"],
-                size_mb=file_info["size_mb"],
-                thumbnail=file_info.get("thumbnail"),
-                media_type="image",
-            )
-            session.add(media)
+        media = _media_record(existing_media, file_info)
+        session.add(media)
+        if not existing_media:
             session.flush()  # ensures ID assigned
-            records.append(media)
+        records.append(media)
+    return records
+
+
+async def aentryMedia(session: AsyncSession, files: List[MediaType]):
+    records = []
+    for file_info in files:
+        existing_media = await session.scalar(
+            select(Media).where(Media.filename == file_info["filename"])
+        )
+        media = _media_record(existing_media, file_info)
+        session.add(media)
+        if not existing_media:
+            await session.flush()  # ensures ID assigned
+        records.append(media)
     return records
 
 
@@ -147,17 +164,10 @@ async def uploadImage(files, thumbnail, unique=True):
     return saved_files
 
 
-def delete_media_items(
-    session: GetSession,
+def _media_statement(
     ids: Optional[List[int]] = None,
     filenames: Optional[List[str]] = None,
-) -> dict:
-    """
-    Delete media by IDs or filenames.
-    - Skips deletion for media referenced in MediaTrack.
-    - Removes files + thumbnails from disk and deletes DB rows.
-    Returns a dict with deleted and skipped items.
-    """
+):
     if not ids and not filenames:
         raise ValueError("Must provide either ids or filenames to delete.")
 
@@ -168,36 +178,53 @@ def delete_media_items(
         stmt = stmt.where(
             func.lower(Media.filename).in_([f.lower() for f in filenames])
         )
+    return stmt
 
-    media_records = session.exec(stmt).all()
+
+def _remove_media_files(media: Media):
+    # --- Delete original file ---
+    file_path = os.path.join(MEDIA_DIR, media.filename)
+    if os.path.exists(file_path):
+        try:
+            os.remove(file_path)
+        except Exception:
+            pass  # silently ignore file deletion error
+
+    # -------------------------
+    # Delete thumbnail
+    # -------------------------
+    if media.thumbnail:
+        thumb_path = os.path.join(MEDIA_DIR, os.path.basename(media.thumbnail))
+    else:
+        base, _ = os.path.splitext(media.filename)
+        thumb_path = os.path.join(MEDIA_DIR, f"{base}_thumb.webp")
+
+    if os.path.exists(thumb_path):
+        try:
+            os.remove(thumb_path)
+        except Exception:
+            pass  # ignore thumbnail deletion error
+
+
+def delete_media_items(
+    session: GetSession,
+    ids: Optional[List[int]] = None,
+    filenames: Optional[List[str]] = None,
+) -> dict:
+    """
+    Delete media by IDs or filenames.
+    - Skips deletion for media referenced in MediaTrack.
+    - Removes files + thumbnails from disk and deletes DB rows.
+    Returns a dict with deleted and skipped items.
+    """
+    media_records = session.exec(_media_statement(ids, filenames)).all()
     if not media_records:
         return {"deleted": [], "skipped": [], "message": "No matching media found."}
 
     deleted_files = []
 
     for media in media_records:
-        # --- Delete original file ---
-        file_path = os.path.join(MEDIA_DIR, media.filename)
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except Exception:
-                pass  # silently ignore file deletion error
-
-        # -------------------------
-        # Delete thumbnail
-        # -------------------------
-        if media.thumbnail:
-            thumb_path = os.path.join(MEDIA_DIR, os.path.basename(media.thumbnail))
-        else:
-            base, _ = os.path.splitext(media.filename)
-            thumb_path = os.path.join(MEDIA_DIR, f"{base}_thumb.webp")
-
-        if os.path.exists(thumb_path):
-            try:
-                os.remove(thumb_path)
-            except Exception:
-                pass  # ignore thumbnail deletion error
+        _remove_media_files(media)
 
         # --- Remove from DB ---
         session.delete(media)
@@ -211,3 +238,28 @@ def delete_media_items(
         "deleted": deleted_files,
         "message": message,
     }
+
+
+async def adelete_media_items(
+    session: AsyncSession,
+    ids: Optional[List[int]] = None,
+    filenames: Optional[List[str]] = None,
+) -> dict:
+    """delete_media_items on an AsyncSession."""
+    media_records = (await session.exec(_media_statement(ids, filenames))).all()
+    if not media_records:
+        return {"deleted": [], "skipped": [], "message": "No matching media found."}
+
+    deleted_files = []
+
+    for media in media_records:
+        _remove_media_files(media)
+        await session.delete(media)
+        deleted_files.append(media.filename)
+
+    await session.flush()
+
+    return {
+        "deleted": deleted_files,
+        "message": "Media deletion completed.",
+    }
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session
+
+from src.api.core.security import mark_revoked
+from src.api.models.revokedTokenModel import RevokedToken
+from src.config import REVOCATION_LOAD_ATTEMPTS, REVOCATION_LOAD_RETRY_SECONDS
+from src.lib.invalidation import notify_statement
+
+logger = logging.getLogger(__name__)
+
+# ===================
+# TOKEN REVOCATION ====================================
+# ===================
+# Logout refuses its tokens in the worker that handled it (security.py) and
+# stores their digests in revoked_tokens. The same transaction notifies the
+# other workers over the invalidation bus, each one marks the row's digest.
+# Workers load every unexpired digest before serving requests (startup fails
+# when they can't) and again after their listener reconnects (notifications
+# sent meanwhile are lost).
+
+
+def _as_datetime(exp: Optional[float]) -> Optional[datetime]:
+    # naive UTC, like every timestamp column
+    if exp is None:
+        return None
+    return datetime.fromtimestamp(exp, timezone.utc).replace(tzinfo=None)
+
+
+def _as_epoch(value: Optional[datetime]) -> Optional[float]:
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _unexpired(now: datetime):
+    return or_(RevokedToken.expires_at.is_(None), RevokedToken.expires_at > now)
+
+
+def store_revocations(
+    session: Session, revoked: list[tuple[str, Optional[float]]]
+) -> None:
+    """Persist (digest, exp) pairs from revoke_token and tell other workers."""
+    if not revoked:
+        return
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    # expired rows are useless, drop them on the way (indexed)
+    session.exec(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+    ids = session.exec(
+        insert(RevokedToken)
+        .values(
+            [
+                {"digest": digest, "expires_at": _as_datetime(exp), "created_at": now}
+                for digest, exp in revoked
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=["digest"])
+        .returning(RevokedToken.id)
+    ).all()
+    for (row_id,) in ids:
+        session.exec(notify_statement("revoked_tokens", row_id, "insert"))
+    session.commit()
+
+
+async def load_revocations(engine: AsyncEngine) -> int:
+    """Mark every unexpired revoked token in this worker."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    statement = select(RevokedToken.digest, RevokedToken.expires_at).where(
+        _unexpired(now)
+    )
+    async with engine.connect() as conn:
+        rows = (await conn.execute(statement)).all()
+    for digest, expires_at in rows:
+        mark_revoked(digest, _as_epoch(expires_at))
+    logger.info("Loaded %s revoked tokens", len(rows))
+    return len(rows)
+
+
+async def load_revocations_at_startup(
+    engine: AsyncEngine,
+    attempts: int = REVOCATION_LOAD_ATTEMPTS,
+    delay: float = REVOCATION_LOAD_RETRY_SECONDS,
+) -> int:
+    """
+    load_revocations, retried; raises after the last attempt. Awaited in the
+    lifespan: a worker without them would accept logged out tokens.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return await load_revocations(engine)
+        except Exception:
+            if attempt >= attempts:
+                raise
+            logger.warning(
+                "Loading revoked tokens failed (attempt %s/%s), retrying",
+                attempt,
+                attempts,
+                exc_info=True,
+            )
+            await asyncio.sleep(delay)
+
+
+def revocation_invalidator(engine: AsyncEngine):
+    """Invalidation bus callback for "revoked_tokens" events."""
+
+    async def invalidate(event) -> None:
+        if event.id is None:
+            await load_revocations(engine)
+            return
+        statement = select(RevokedToken.digest, RevokedToken.expires_at).where(
+            RevokedToken.id == event.id
+        )
+        async with engine.connect() as conn:
+            row = (await conn.execute(statement)).first()
+        if row is not None:
+            mark_revoked(row.digest, _as_epoch(row.expires_at))
+
+    return invalidate
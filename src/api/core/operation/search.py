@@ -0,0 +1,98 @@
+import re
+
+from sqlalchemy import literal
+from sqlmodel import func, or_
+from sqlalchemy.sql import sqltypes as SATypes
+
+# ===================
+# SEARCH BACKEND ====================================
+# ===================
+# Models opt in with a __search__ dict:
+#
+#   __search__ = {
+#       "fields": ["from_address", "to_address", ...],  # covered columns
+#       "text_column": "search_text",      # generated text, GIN gin_trgm_ops
+#       "vector_column": "search_vector",  # generated tsvector, GIN
+#       "config": "simple",                # text search configuration
+#   }
+#
+# searchTerm on covered fields becomes one index served condition:
+#   search_text ILIKE '%term%'   (substring, pg_trgm index)
+#   term <% search_text          (typo tolerant word similarity, pg_trgm)
+#   search_vector @@ to_tsquery  (whole words / prefixes, tsvector index)
+# Fields that are not covered keep the old ILIKE per column.
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+MIN_TRIGRAM_LENGTH = 3  # shorter terms have no trigram to look up
+
+
+def search_config(Model):
+    return getattr(Model, "__search__", None)
+
+
+def _search_column(Model, name):
+    # Search columns are generated by Postgres and not mapped on the model
+    return Model.__table__.c[name]
+
+
+def prefix_tsquery(searchTerm: str):
+    """'lahore isl' -> 'lahore:* & isl:*' (None if there is no word)."""
+    words = _WORD.findall(searchTerm)
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
+
+
+def _enum_condition(attr, col_type, searchTerm: str):
+    # Enum columns can't be in a generated column (enum -> text isn't
+    # immutable); match the labels in Python instead of casting every row
+    term = searchTerm.lower()
+    matches = [label for label in col_type.enums if term in label.lower()]
+    return attr.in_(matches) if matches else None
+
+
+def search_condition(Model, searchTerm: str, searchFields, resolve):
+    """
+    OR condition for the global searchTerm.
+    resolve(col) -> ColumnPlan of a (possibly nested) search field.
+    """
+    config = search_config(Model)
+    covered = set(config["fields"]) if config else set()
+
+    conditions = []
+    if covered.intersection(searchFields):
+        text_col = _search_column(Model, config["text_column"])
+        conditions.append(text_col.ilike(f"%{searchTerm}%"))
+        if len(searchTerm.strip()) >= MIN_TRIGRAM_LENGTH:
+            conditions.append(literal(searchTerm, SATypes.Text).op("<%")(text_col))
+
+        tsquery = prefix_tsquery(searchTerm)
+        if tsquery and config.get("vector_column"):
+            vector_col = _search_column(Model, config["vector_column"])
+            conditions.append(
+                vector_col.op("@@")(func.to_tsquery(config["config"], tsquery))
+            )
+
+    for col in searchFields:
+        if col in covered:
+            continue
+        column_plan = resolve(col)
+        attr = column_plan.attr
+        if isinstance(column_plan.col_type, SATypes.Enum):
+            condition = _enum_condition(attr, column_plan.col_type, searchTerm)
+            if condition is not None:
+                conditions.append(condition)
+        else:
+            conditions.append(attr.ilike(f"%{searchTerm}%"))
+
+    return or_(*conditions)
+
+
+def search_rank(Model, searchTerm: str):
+    """ts_rank expression for ordering by relevance (None if not supported)."""
+    config = search_config(Model)
+    tsquery = prefix_tsquery(searchTerm)
+    if not config or not config.get("vector_column") or not tsquery:
+        return None
+    vector_col = _search_column(Model, config["vector_column"])
+    return func.ts_rank(vector_col, func.to_tsquery(config["config"], tsquery))
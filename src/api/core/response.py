@@ -1,5 +1,6 @@
 from typing import Any, Optional, Union
 
+import orjson
 from fastapi import HTTPException
 from fastapi.encoders import (
     jsonable_encoder,
@@ -8,28 +9,44 @@ from fastapi.responses import (
     JSONResponse,
 )
 
+from src.api.core.serialization import is_validated, to_jsonable
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (bytes straight from Rust)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
 
 def api_response(
     code: int,
     detail: str,
     data: Optional[Union[dict, list]] = None,
     total: Optional[int] = None,
+    extra: Optional[dict] = None,
 ):
 
     content = {
         "success": (1 if code < 300 else 0),
         "detail": detail,
-        "data": jsonable_encoder(data),
+        # Validated models are dumped by pydantic-core directly,
+        # jsonable_encoder would walk them again in Python
+        "data": to_jsonable(data) if is_validated(data) else jsonable_encoder(data),
     }
 
     if total is not None:
         content["total"] = total
 
+    # e.g. {"next_cursor": ...} for cursor paginated lists
+    if extra:
+        content.update(jsonable_encoder(extra))
+
     # Raise error if code >= 400
     if code >= 400:
         raise HTTPException(status_code=code, detail=detail)
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=code,
         content=content,
     )
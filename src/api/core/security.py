@@ -1,5 +1,8 @@
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional
+import hashlib
+from threading import Lock
+import time
+from typing import Callable, Dict, List, Optional, Tuple
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from sqlalchemy import select
@@ -16,7 +19,8 @@ from fastapi.security import (
     HTTPBearer,
 )
 
-from src.config import SECRET_KEY, ACCESS_TOKEN_EXPIRE
+from src.config import SECRET_KEY, ACCESS_TOKEN_EXPIRE, TOKEN_CACHE_SIZE
+from src.api.core.cache import LRUCache
 from src.api.core.response import api_response
 
 
@@ -70,9 +74,99 @@ def create_access_token(
     return token
 
 
+# ======================================================
+# 🎟️ VERIFIED CLAIMS CACHE
+# ======================================================
+# A mobile session sends the same token dozens of times a minute. The claims
+# of a token that passed jwt.decode (signature + exp) are kept by the token's
+# sha256 until its exp, so repeat requests skip the HMAC and JSON parsing.
+# The cached dicts are shared between requests: treat them as read-only.
+# Revocation hooks run on every lookup, hit or miss.
+# Revoked digests are not an LRU: an entry may only leave once its token has
+# expired. Logout stores them in revoked_tokens and the invalidation bus
+# brings them to every worker (src/api/core/operation/revocation.py).
+_claims_cache = LRUCache(maxsize=TOKEN_CACHE_SIZE)
+_revoked: Dict[str, Optional[float]] = {}  # digest -> exp (None = never)
+_revoked_lock = Lock()
+_revoked_pruned = time.time()
+_revocation_hooks: List[Callable[[str, Dict], bool]] = []
+
+
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def register_revocation_hook(hook: Callable[[str, Dict], bool]) -> None:
+    """hook(digest, claims) -> True when the token must be refused."""
+    _revocation_hooks.append(hook)
+
+
+def _locally_revoked(digest: str, claims: Dict) -> bool:
+    return digest in _revoked
+
+
+register_revocation_hook(_locally_revoked)
+
+
+def _prune_revoked(now: float) -> None:
+    global _revoked_pruned
+    _revoked_pruned = now
+    for digest, exp in list(_revoked.items()):
+        if exp is not None and exp <= now:
+            del _revoked[digest]
+
+
+def mark_revoked(digest: str, exp: Optional[float]) -> None:
+    """Refuse the token with this digest in this worker until exp."""
+    now = time.time()
+    if exp is not None and exp <= now:
+        return  # jwt.decode refuses it anyway
+    _claims_cache.pop(digest)
+    with _revoked_lock:
+        _revoked[digest] = exp
+        if now - _revoked_pruned > 60:
+            _prune_revoked(now)
+
+
+def revoke_token(token: str) -> Optional[Tuple[str, Optional[float]]]:
+    """
+    Refuse token in this worker until it expires (logout). Returns
+    (digest, exp) for the shared store, None for an invalid/expired token.
+    """
+    digest = _token_digest(token)
+    claims = _claims_cache.get(digest)
+    if claims is None:
+        try:
+            claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            return None  # invalid or expired already
+    exp = claims.get("exp")
+    mark_revoked(digest, exp)
+    return digest, exp
+
+
+def verified_claims(token: str) -> Dict:
+    """jwt.decode() through the cache. Raises JWTError like jwt.decode."""
+    digest = _token_digest(token)
+    claims = _claims_cache.get(digest)
+    if claims is None:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])  # checks exp
+        exp = claims.get("exp")
+        ttl = exp - time.time() if exp else None
+        if ttl is None or ttl > 0:
+            _claims_cache.set(digest, claims, ttl=ttl)
+    if any(hook(digest, claims) for hook in _revocation_hooks):
+        raise JWTError("Token has been revoked")
+    return claims
+
+
+def token_cache_stats() -> dict:
+    return {**_claims_cache.stats(), "revoked": len(_revoked)}
+
+
 def verify_refresh_token(token: str):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = verified_claims(token)
         return payload
     except JWTError:
         return None
@@ -82,12 +176,8 @@ def decode_token(
     token: str,
 ) -> Optional[Dict]:
     try:
-        decode = jwt.decode(
-            token,
-            SECRET_KEY,
-            algorithms=[ALGORITHM],
-            options={"verify_exp": True},  # Ensure expiration is verified
-        )
+        # expiration is verified (cached claims expire with the token)
+        decode = verified_claims(token)
 
         return decode
 
@@ -111,12 +201,7 @@ def is_authenticated(authorization: Optional[str] = Header(None)):
 
     token = parts[1]
     try:
-        payload = jwt.decode(
-            token,
-            SECRET_KEY,
-            algorithms=[ALGORITHM],
-            options={"verify_exp": True},  # verifies expiration
-        )
+        payload = verified_claims(token)  # verifies expiration
         user = payload.get("user")
         return user
     except JWTError:
@@ -129,11 +214,7 @@ def require_signin(
     token = credentials.credentials  # Extract token from Authorization header
 
     try:
-        payload = jwt.decode(
-            token,
-            SECRET_KEY,
-            algorithms=[ALGORITHM],
-        )
+        payload = verified_claims(token)
         user = payload.get("user")
 
         if user is None:
@@ -0,0 +1,45 @@
+from functools import lru_cache
+from typing import Any, Iterable
+
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_jsonable_python
+
+# ======================================================
+# ⚡ PAGE SERIALIZATION
+# ======================================================
+# One TypeAdapter per Schema validates/dumps a whole page in a single
+# pydantic-core call instead of a Python loop over Schema.model_validate.
+
+
+@lru_cache(maxsize=256)
+def list_adapter(Schema: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[Schema])
+
+
+def validate_list(Schema: type[BaseModel], rows: Iterable[Any]) -> list:
+    """ORM rows -> list of Schema instances."""
+    return list_adapter(Schema).validate_python(list(rows), from_attributes=True)
+
+
+def dump_list(Schema: type[BaseModel], rows: Iterable[Any]) -> list:
+    """ORM rows -> JSON ready list of dicts (field serializers applied)."""
+    adapter = list_adapter(Schema)
+    return adapter.dump_python(
+        adapter.validate_python(list(rows), from_attributes=True), mode="json"
+    )
+
+
+def is_validated(data: Any) -> bool:
+    """True for a model or a list of models — already typed, no need to walk it."""
+    if isinstance(data, BaseModel):
+        return True
+    return (
+        isinstance(data, list)
+        and bool(data)
+        and all(isinstance(item, BaseModel) for item in data)
+    )
+
+
+def to_jsonable(data: Any) -> Any:
+    # pydantic-core's serializer, same output as jsonable_encoder for models
+    return to_jsonable_python(data)
@@ -1,24 +1,25 @@
 from datetime import datetime, timezone
 import json
 import re
-from typing import Any, List
+from typing import Any, Iterable, List
 import unicodedata
 
 from fastapi import UploadFile
 
+from src.api.core.cache import LRUCache
 
+
+# Non-ISO inputs, tried in order. strptime's %d / %m already accept "1" as
+# well as "01". The "%-d" / "%-m" spellings are a glibc strftime extension:
+# strptime rejects them on every platform ("'-' is a bad directive"), so they
+# never matched and are gone — "%-d-%b-%Y" is kept as "%d-%b-%Y".
+# ISO-8601 strings ("2025-01-31", "2025-01-31T10:00:00.000Z") never get
+# here, datetime.fromisoformat parses them first.
 date_formats = [
     "%d-%m-%Y",
     "%d/%m/%Y",
-    "%-d/%-m/%Y",
-    "%d/%-m/%Y",
-    "%-d/%m/%Y",
-    "%d-%-m-%Y",
-    "%-d-%m-%Y",
-    "%-d-%-m-%Y",
-    "%-d-%b-%y",
     "%d-%b-%y",
-    "%-d-%b-%Y",
+    "%d-%b-%Y",
     "%Y-%m-%dT%H:%M:%S.%fZ",
     "%Y-%m-%dT%H:%M:%S.%f",
     "%Y-%m-%dT%H:%M:%S",
@@ -27,17 +28,90 @@ date_formats = [
     "%Y-%m-%d",
 ]
 
+# "31/01/2025" -> "99/99/9999", "5-Jan-25" -> "9-aaa-99"
+_DATE_SHAPE = str.maketrans(
+    "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ",
+    "9" * 10 + "a" * 52,
+)
+# shape -> the format that parsed it last time (a handful of shapes in practice)
+_format_by_shape = LRUCache(maxsize=256)
+
+
+def _as_utc(dt: datetime) -> datetime:
+    # naive values are taken as UTC, aware ones are converted
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _looks_iso(date_str: str) -> bool:
+    return len(date_str) >= 10 and date_str[4] == "-" and date_str[:4].isdigit()
+
 
 def parse_date(date_str: str) -> datetime:
+    """
+    Parse a date/datetime string into an aware UTC datetime.
+    ISO-8601 goes through fromisoformat; other inputs use the format that
+    last matched the same shape, so a miss-per-format ValueError loop only
+    runs the first time a shape is seen.
+    """
+    if isinstance(date_str, datetime):
+        return _as_utc(date_str)
+
+    if _looks_iso(date_str):
+        try:
+            return _as_utc(datetime.fromisoformat(date_str))
+        except ValueError:
+            pass
+
+    shape = date_str.translate(_DATE_SHAPE)
+    fmt = _format_by_shape.get(shape)
+    if fmt is not None:
+        try:
+            return datetime.strptime(date_str, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            pass  # same shape, other format ("01-02-25" vs "1-Jan-25")
+
     for fmt in date_formats:
         try:
             dt = datetime.strptime(date_str, fmt)
-            return dt.replace(tzinfo=timezone.utc)
         except ValueError:
             continue
+        _format_by_shape.set(shape, fmt)
+        return dt.replace(tzinfo=timezone.utc)
     raise ValueError(f"Date '{date_str}' is not in a valid UTC format.")
 
 
+def parse_dates(values: Iterable[str]) -> List[datetime]:
+    """
+    parse_date for many values (dateRange bounds, imports, column filters).
+    Values sharing a shape are resolved once; raises ValueError on the first
+    value that can't be parsed.
+    """
+    resolved: dict[str, str] = {}  # shape -> format, local to this batch
+    parsed = []
+    for value in values:
+        if isinstance(value, datetime) or _looks_iso(value):
+            parsed.append(parse_date(value))
+            continue
+        shape = value.translate(_DATE_SHAPE)
+        fmt = resolved.get(shape)
+        if fmt is not None:
+            try:
+                parsed.append(
+                    datetime.strptime(value, fmt).replace(tzinfo=timezone.utc)
+                )
+                continue
+            except ValueError:
+                pass
+        dt = parse_date(value)
+        fmt = _format_by_shape.get(shape)
+        if fmt is not None:
+            resolved[shape] = fmt
+        parsed.append(dt)
+    return parsed
+
+
 # slug = slugify("ACME Industries Inc.")
 # print(slug)  # acme-industries-inc
 def slugify(text: str) -> str:
@@ -1,8 +1,20 @@
 from src.api.models.userModel import User
 from src.api.models.roleModel import Role
 from src.api.models.mediaModel import Media
-from src.api.models.rideModel import Ride
+from src.api.models.rideModel import Ride, RideRouteCell
 from src.api.models.defaultRideSettingModel import DefaultRideSetting
 from src.api.models.reviewModel import Review
+from src.api.models.bookingModel import Booking
+from src.api.models.revokedTokenModel import RevokedToken
 
-__all__ = ["User", "Role", "Media", "Ride", "DefaultRideSetting", "Review"]
+__all__ = [
+    "User",
+    "Role",
+    "Media",
+    "Ride",
+    "RideRouteCell",
+    "DefaultRideSetting",
+    "Review",
+    "Booking",
+    "RevokedToken",
+]
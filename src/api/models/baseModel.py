@@ -1,12 +1,37 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 from pydantic import BaseModel
+from sqlalchemy import DateTime, Interval, TypeDecorator
 from sqlmodel import Field, SQLModel
 
 
+class NaiveUTCDateTime(TypeDecorator):
+    """
+    "timestamp without time zone" holding UTC. Aware values are converted to
+    naive UTC on the way in: asyncpg refuses aware datetimes for these
+    columns (psycopg2 let Postgres cast them in the session time zone).
+    """
+
+    impl = DateTime
+    cache_ok = True
+
+    def coerce_compared_value(self, op, value):
+        # arrival_time - interval stays an interval bind
+        if isinstance(value, timedelta):
+            return Interval()
+        return self
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, datetime) and value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+
 class TimeStampedModel(SQLModel):
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: Optional[datetime] = None
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), sa_type=NaiveUTCDateTime
+    )
+    updated_at: Optional[datetime] = Field(default=None, sa_type=NaiveUTCDateTime)
 
 
 class TimeStampReadModel(BaseModel):
@@ -0,0 +1,65 @@
+from datetime import datetime
+from enum import Enum
+from typing import Literal, Optional
+
+from sqlalchemy import Index, UniqueConstraint
+from sqlmodel import Field, SQLModel
+
+from src.api.models.baseModel import (
+    NaiveUTCDateTime,
+    TimeStampedModel,
+    TimeStampReadModel,
+)
+
+
+class BookingStatus(str, Enum):
+    confirmed = "confirmed"
+    cancelled = "cancelled"
+
+
+class Booking(TimeStampedModel, table=True):
+    """
+    Seats booked on a ride. The seats are taken from rides.seats_available by
+    one conditional UPDATE (see src/api/core/operation/booking.py) and given
+    back when the booking is cancelled.
+    """
+
+    __tablename__: Literal["bookings"] = "bookings"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # No foreign key: rides' primary key is (id, arrival_time) since partitioning
+    ride_id: int = Field(nullable=False)
+    user_id: int = Field(foreign_key="users.id", nullable=False)
+    seats: int = Field(ge=1, nullable=False)
+    status: BookingStatus = Field(default=BookingStatus.confirmed)
+    # Client supplied (Idempotency-Key header): a retried request returns the
+    # booking it already made instead of taking more seats
+    idempotency_key: Optional[str] = Field(default=None, max_length=64)
+    cancelled_at: Optional[datetime] = Field(default=None, sa_type=NaiveUTCDateTime)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id",
+            "idempotency_key",
+            name="uq_bookings_user_idempotency_key",
+        ),
+        Index("ix_bookings_ride_id", "ride_id"),
+        Index("ix_bookings_user_id_created_at", "user_id", "created_at"),
+    )
+
+
+class BookingCreate(SQLModel):
+    seats: int = Field(default=1, ge=1, le=20)
+
+
+class BookingRead(TimeStampReadModel):
+    id: int
+    ride_id: int
+    user_id: int
+    seats: int
+    status: BookingStatus
+    idempotency_key: Optional[str] = None
+    cancelled_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
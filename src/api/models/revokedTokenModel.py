@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from sqlmodel import Field
+
+from src.api.models.baseModel import NaiveUTCDateTime, TimeStampedModel
+
+
+class RevokedToken(TimeStampedModel, table=True):
+    """
+    A logged out token, refused by every worker until it expires (see
+    src/api/core/operation/revocation.py). Only the token's sha256 is kept.
+    """
+
+    __tablename__: Literal["revoked_tokens"] = "revoked_tokens"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    digest: str = Field(max_length=64, unique=True, nullable=False)
+    # the token's exp, None = never expires; expired rows are deleted
+    expires_at: Optional[datetime] = Field(
+        default=None, index=True, sa_type=NaiveUTCDateTime
+    )
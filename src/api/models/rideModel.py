@@ -2,7 +2,17 @@ from datetime import datetime
 from enum import Enum
 from enum import Enum
 import json
-from typing import TYPE_CHECKING, Annotated, Any, Dict, List, Literal, Optional, Union
+from typing import (
+    TYPE_CHECKING,
+    Annotated,
+    Any,
+    ClassVar,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Union,
+)
 
 from fastapi import File, Form, UploadFile
 
@@ -11,10 +21,16 @@ from pydantic import (
     EmailStr,
 )
 
+from sqlalchemy import Computed, Float, Text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlmodel import JSON, Column, Field, Index, Relationship, SQLModel, text
 from src.api.models.mediaModel import MediaRead
 from src.api.core.response import api_response
-from src.api.models.baseModel import TimeStampedModel, TimeStampReadModel
+from src.api.models.baseModel import (
+    NaiveUTCDateTime,
+    TimeStampedModel,
+    TimeStampReadModel,
+)
 from src.api.models.roleModel import RoleRead
 
 if TYPE_CHECKING:
@@ -46,6 +62,16 @@ class Location(SQLModel):
     )
 
 
+def _coordinate_sql(column: str, index: int) -> str:
+    # GeoJSON coordinates are [longitude, latitude]
+    return f"((({column} -> 'coordinates') ->> {index}))::double precision"
+
+
+# Free-text search covers these columns (car_type is an enum, matched by label)
+SEARCH_FIELDS = ["from_address", "to_address", "car_number", "car_name", "car_model"]
+_SEARCH_TEXT_SQL = " || ' ' || ".join(f"coalesce({f}, '')" for f in SEARCH_FIELDS)
+
+
 # ===============================
 # Ride Schema
 # ===============================
@@ -62,10 +88,42 @@ class Ride(TimeStampedModel, table=True):
         sa_column=Column(JSON), description="Destination location (GeoJSON)"
     )
 
+    # Generated by Postgres from the GeoJSON coordinates [lng, lat] so geo
+    # search can use a B-tree bounding box instead of parsing JSON per row
+    from_lat: Optional[float] = Field(
+        default=None,
+        sa_column=Column(
+            Float, Computed(_coordinate_sql("from_location", 1), persisted=True)
+        ),
+    )
+    from_lng: Optional[float] = Field(
+        default=None,
+        sa_column=Column(
+            Float, Computed(_coordinate_sql("from_location", 0), persisted=True)
+        ),
+    )
+    to_lat: Optional[float] = Field(
+        default=None,
+        sa_column=Column(
+            Float, Computed(_coordinate_sql("to_location", 1), persisted=True)
+        ),
+    )
+    to_lng: Optional[float] = Field(
+        default=None,
+        sa_column=Column(
+            Float, Computed(_coordinate_sql("to_location", 0), persisted=True)
+        ),
+    )
+
     from_address: str = Field(index=True, description="Origin address string")
     to_address: str = Field(index=True, description="Destination address string")
 
-    arrival_time: datetime = Field(description="Arrival time of ride")
+    # Partition key: the table is range partitioned by month on arrival_time
+    # and its primary key is (id, arrival_time) in the database. The mapper
+    # keeps id alone, so session.get(Ride, id) works as before.
+    arrival_time: datetime = Field(
+        index=True, sa_type=NaiveUTCDateTime, description="Arrival time of ride"
+    )
 
     car_number: str = Field(description="Car registration number")
     car_pic: Optional[Dict[str, Any]] = Field(
@@ -81,14 +139,83 @@ class Ride(TimeStampedModel, table=True):
     negotiable: Optional[bool] = Field(default=False)
     notes: Optional[str] = None
 
-    car_type: CarType = Field(description="Type of car")
+    car_type: CarType = Field(index=True, description="Type of car")
     car_name: str = Field(description="Car name / brand")
     car_model: Optional[str] = Field(default=None)
 
     active: bool = Field(default=True)
 
+    # Simplified route as an encoded polyline (None = straight line between
+    # the endpoints); rasterized into ride_route_cells for corridor search
+    route_polyline: Optional[str] = Field(default=None, sa_column=Column(Text))
+
+    # Generated search columns (not loaded by the ORM, see __mapper_args__)
+    search_text: Optional[str] = Field(
+        default=None,
+        sa_column=Column(Text, Computed(_SEARCH_TEXT_SQL, persisted=True)),
+    )
+    search_vector: Optional[str] = Field(
+        default=None,
+        sa_column=Column(
+            TSVECTOR,
+            Computed(
+                f"to_tsvector('simple'::regconfig, {_SEARCH_TEXT_SQL})", persisted=True
+            ),
+        ),
+    )
+
     user: Optional["User"] = Relationship(back_populates="rides")
 
+    # searchTerm on these fields is served by the trigram/tsvector indexes
+    __search__: ClassVar[dict] = {
+        "fields": SEARCH_FIELDS,
+        "text_column": "search_text",
+        "vector_column": "search_vector",
+        "config": "simple",
+    }
+    __mapper_args__ = {"exclude_properties": ["search_text", "search_vector"]}
+
+    __table_args__ = (
+        Index("ix_rides_from_lat_lng", "from_lat", "from_lng"),
+        Index("ix_rides_to_lat_lng", "to_lat", "to_lng"),
+        Index(
+            "ix_rides_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+        Index("ix_rides_search_vector", "search_vector", postgresql_using="gin"),
+        # Public listing only reads live rides (past ones are expired by a job)
+        Index(
+            "ix_rides_active_arrival_time",
+            "arrival_time",
+            postgresql_where=text("active"),
+        ),
+        Index(
+            "ix_rides_active_created_at",
+            "created_at",
+            postgresql_where=text("active"),
+        ),
+    )
+
+
+class RideRouteCell(SQLModel, table=True):
+    """
+    Grid cells (see RIDE_ROUTE_CELL_DEG) a ride's route passes through, seq
+    is the order along the route. No foreign key: rides' primary key is
+    (id, arrival_time) since partitioning — rows are replaced when a ride's
+    route changes and removed with the ride or when it expires.
+    """
+
+    __tablename__ = "ride_route_cells"
+
+    ride_id: int = Field(primary_key=True)
+    cell_lat: int = Field(primary_key=True)
+    cell_lng: int = Field(primary_key=True)
+    seq: int
+
+    __table_args__ = (Index("ix_ride_route_cells_cell", "cell_lat", "cell_lng", "seq"),)
+
 
 class UserRideForm:
     def __init__(
@@ -116,6 +243,8 @@ class UserRideForm:
         car_pic: Optional[Union[UploadFile, str]] = File(None),
         other_images: List[UploadFile] = File(default=[]),
         delete_images: Optional[List[str]] = Form(None),
+        # encoded polyline (Google format) of the planned route
+        route: Optional[str] = Form(None),
     ):
         # Convert empty → None
         # Convert empty string → None
@@ -201,6 +330,8 @@ class UserRideForm:
 
         self.delete_images = clean(delete_images)
 
+        self.route_polyline = clean(route)
+
 
 class LocationRead(BaseModel):
     type: str
@@ -248,3 +379,19 @@ class UserReadRide(SQLModel):
 
 class RideReadWithUser(RideRead):
     user: UserReadRide
+
+
+class RideMatchRead(SQLModel):
+    ride: RideRead
+    from_distance_km: float  # pickup detour
+    to_distance_km: float  # drop-off detour
+    arrival_offset_hours: float  # |arrival_time - wanted arrival|
+    score: float  # lower is better
+
+
+class RideCorridorRead(SQLModel):
+    ride: RideRead
+    pickup_distance_km: float  # rider pickup -> closest point of the route
+    dropoff_distance_km: float  # rider drop-off -> closest point of the route
+    arrival_offset_hours: float
+    score: float  # lower is better
@@ -8,7 +8,11 @@ from pydantic import BaseModel, EmailStr, constr, field_validator, model_validat
 from sqlmodel import JSON, Column, Field, Index, Relationship, SQLModel, text
 from src.api.models.mediaModel import MediaRead
 from src.api.core.response import api_response
-from src.api.models.baseModel import TimeStampedModel, TimeStampReadModel
+from src.api.models.baseModel import (
+    NaiveUTCDateTime,
+    TimeStampedModel,
+    TimeStampReadModel,
+)
 from src.api.models.roleModel import RoleRead
 
 if TYPE_CHECKING:
@@ -61,7 +65,7 @@ class User(
     currency_code: str = Field(description="Currency code (e.g., PKR)")
     currency_symbol: str = Field(description="Currency symbol (e.g., ₨)")
     otp_code: Optional[str] = None
-    otp_expires_at: Optional[datetime] = None
+    otp_expires_at: Optional[datetime] = Field(default=None, sa_type=NaiveUTCDateTime)
     # need_refresh: bool = False
     # relation
     role: Optional["Role"] = Relationship(back_populates="users")
@@ -1,8 +1,9 @@
 from datetime import datetime, timedelta, timezone
 from random import randint
-from fastapi import APIRouter, Depends, Response
+from fastapi import APIRouter, Depends, Request, Response
 from sqlmodel import delete, or_, select
 from src.api.core.operation import updateOp
+from src.api.core.operation.revocation import store_revocations
 from src.api.core.response import raiseExceptions
 from src.api.core.smtp import send_email
 from src.config import ACCESS_TOKEN_EXPIRE_MINUTES, DOMAIN
@@ -11,6 +12,7 @@ from src.api.core.security import (
     decode_token,
     exist_user,
     hash_password,
+    revoke_token,
     verify_password,
     verify_refresh_token,
 )
@@ -347,7 +349,16 @@ def refresh_token(
 
 
 @router.post("/logout")
-def logout(response: Response):
+def logout(request: Request, response: Response, session: GetSession):
+    # both tokens are refused from now on, by every worker
+    tokens = []
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        tokens.append(authorization[7:].strip())
+    if request.cookies.get("refresh_token"):
+        tokens.append(request.cookies["refresh_token"])
+    revoked = [r for r in map(revoke_token, tokens) if r is not None]
+    store_revocations(session, revoked)
     response.delete_cookie("refresh_token")
     response.delete_cookie("access_token")
     return {"message": "Logged out"}
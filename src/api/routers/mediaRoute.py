@@ -3,14 +3,23 @@ from typing import List
 from fastapi import APIRouter, Query, UploadFile, File
 from fastapi.responses import FileResponse
 
-from sqlalchemy import select
-
 
 from src.api.core.operation import listRecords
+from src.api.core.operation.list_cache import bump_generation
 from src.api.models.mediaModel import Media, MediaRead
-from src.api.core.operation.media import MEDIA_DIR, delete_media_items, uploadImage
-from src.api.core.dependencies import GetSession, ListQueryParams
+from src.api.core.operation.media import (
+    MEDIA_DIR,
+    adelete_media_items,
+    aentryMedia,
+    uploadImage,
+)
+from src.api.core.dependencies import (
+    GetAsyncSession,
+    GetReadSession,
+    ListQueryParams,
+)
 from src.api.core.response import api_response, raiseExceptions
+from src.lib.invalidation import notify_statement
 
 from src.api.core import requireSignin, requireAdmin
 
@@ -19,48 +28,23 @@ router = APIRouter(prefix="/media", tags=["Media"])
 
 @router.post("/create")
 async def upload_images(
-    session: GetSession,
+    session: GetAsyncSession,
     user: requireSignin,
     files: List[UploadFile] = File(...),
     thumbnail: bool = False,
 ):
-    records = []  # collect both old and new
     message = "Images uploaded successfully"
 
     # 🔑 Save files to disk + build file_info dicts
     saved_files = await uploadImage(files, thumbnail)
-    print(saved_files)
-
-    for file_info in saved_files:
-        existing_media = session.scalar(
-            select(Media).where(Media.filename == file_info["filename"])
-        )
-        print(existing_media)
-
-        if existing_media:
-            # ✅ Update existing record
-            existing_media.extension = file_info["extension"]
-            existing_media.original = file_info["original"]
-            existing_media.size_mb = file_info["size_mb"]
-            existing_media.thumbnail = file_info.get("thumbnail")
-            existing_media.media_type = "image"
-            session.add(existing_media)
-            records.append(existing_media)
-        else:
-            # ✅ Create new record
-            media = Media(
-                filename=file_info["filename"],
-                extension=file_info["extension"],
-                original=file_info["original"],
-                size_mb=file_info["size_mb"],
-                thumbnail=file_info.get("thumbnail"),
-                media_type="image",
-            )
-            session.add(media)
-            session.flush()  # ensures ID assigned
-            records.append(media)
-
-    session.commit()
+
+    # Update existing records by filename or create new ones
+    records = await aentryMedia(session, saved_files)
+
+    # one event per upload, other workers drop their cached media lists
+    await session.exec(notify_statement("media", op="update"))
+    await session.commit()
+    bump_generation("media")
 
     return api_response(
         200,
@@ -71,7 +55,7 @@ async def upload_images(
 
 # ✅ READ (single)
 @router.get("/read/{id}", response_model=MediaRead)
-def get(id: int, session: GetSession):
+def get(id: int, session: GetReadSession):
     read = session.get(Media, id)
     raiseExceptions((read, 404, "Media not found"))
 
@@ -79,11 +63,12 @@ def get(id: int, session: GetSession):
 
 
 @router.get("/list", response_model=list[MediaRead])
-def list(user: requireAdmin, query_params: ListQueryParams):
+def list(user: requireAdmin, query_params: ListQueryParams, session: GetReadSession):
     query_params = vars(query_params)
     searchFields = ["media_type"]
 
     return listRecords(
+        session,
         query_params=query_params,
         searchFields=searchFields,
         Model=Media,
@@ -109,20 +94,19 @@ async def get_image(filename: str):
 # ----------------------------
 @router.delete("/delete-by-ids")
 async def delete_by_ids(
-    session: GetSession,
+    session: GetAsyncSession,
     user: requireAdmin,
     ids: List[int] = Query(
         ..., description="IDs of media to delete"
     ),  # e.g. /media/delete-by-ids?ids=1&ids=2&ids=3
 ):
-    response = delete_media_items(
-        session=session,
-        ids=ids,
-        forceRemove=True,
-    )
+    response = await adelete_media_items(session=session, ids=ids)
     if len(response["deleted"]) == 0:
         return api_response(400, response["message"])
-    session.commit()
+
+    await session.exec(notify_statement("media", op="delete"))
+    await session.commit()
+    bump_generation("media")
 
     return api_response(
         200,
@@ -133,22 +117,20 @@ async def delete_by_ids(
 
 @router.delete("/delete-by-filenames")
 async def delete_by_filenames(
-    session: GetSession,
+    session: GetAsyncSession,
     user: requireAdmin,
     filenames: List[str] = Query(
         ...,
         description="Filenames of media to delete. Example: ?filenames=1.webp&filenames=2.webp",
     ),
 ):
-    response = delete_media_items(
-        session=session,
-        filenames=filenames,
-        forceRemove=True,
-    )
+    response = await adelete_media_items(session=session, filenames=filenames)
     if len(response["deleted"]) == 0:
         return api_response(400, response["message"])
 
-    session.commit()
+    await session.exec(notify_statement("media", op="delete"))
+    await session.commit()
+    bump_generation("media")
 
     return api_response(
         200,
@@ -1,9 +1,26 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
 from sqlmodel import Session, func, select
 from src.api.core.operation import listRecords
+from src.api.core.operation.eager import load_options, related_tables
+from src.api.core.operation.export import ExportFormat, export_statement, stream_export
+from src.api.core.operation.list_cache import (
+    bump_generation,
+    cached_response,
+    fill_session,
+    list_cache_key,
+)
 from src.api.core.response import api_response, raiseExceptions
+from src.api.core.serialization import dump_list
 from src.api.models.reviewModel import Review, ReviewCreate, ReviewUpdate, ReviewRead
-from src.api.core.dependencies import GetSession, ListQueryParams, requireSignin
+from src.lib.invalidation import notify_statement
+from src.api.core.dependencies import (
+    GetReadSession,
+    GetSession,
+    ListQueryParams,
+    requireAdmin,
+    requireSignin,
+)
 
 router = APIRouter(prefix="/review", tags=["Review"])
 
@@ -22,7 +39,11 @@ def create(
     )
 
     session.add(review)
+    session.flush()  # id for the notification
+    # other workers drop their cached reviews once this commits
+    session.exec(notify_statement("reviews", review.id, "insert"))
     session.commit()
+    bump_generation("reviews")
     session.refresh(review)
 
     return api_response(
@@ -53,7 +74,9 @@ def update(
     if request.comment is not None:
         review.comment = request.comment
 
+    session.exec(notify_statement("reviews", review.id, "update"))
     session.commit()
+    bump_generation("reviews")
     session.refresh(review)
 
     return api_response(
@@ -81,7 +104,9 @@ def delete(
     raiseExceptions((review, 404, "Review not found"))
 
     session.delete(review)
+    session.exec(notify_statement("reviews", review.id, "delete"))
     session.commit()
+    bump_generation("reviews")
 
     return api_response(200, "Review Deleted Successfully")
 
@@ -89,21 +114,32 @@ def delete(
 @router.get("/list/{user_id}")
 def list_reviews(
     user_id: int,
-    session: GetSession,
+    session: GetReadSession,
     query_params: ListQueryParams,
 ):
     query_params = vars(query_params)
 
+    # reviewer/target are nested users (+ roles), so their writes invalidate too
+    tables = ["reviews", *related_tables(Review, ReviewRead)]
+    key = list_cache_key(f"review:list:{user_id}", tables, query_params)
+    return cached_response(
+        key,
+        lambda: _list_reviews(user_id, fill_session(session, tables), query_params),
+    )
+
+
+def _list_reviews(user_id: int, session, query_params: dict):
     response = listRecords(
+        session,
         query_params=query_params,
         searchFields=["comment"],
         customFilters=[["target_id", user_id]],
         Model=Review,
+        # reviewer/target (+ their roles) in the same query, not per row
+        join_options=list(load_options(Review, ReviewRead)),
     )
 
-    list_data = [
-        ReviewRead.model_validate(prod).model_dump() for prod in response["data"]
-    ]
+    list_data = dump_list(ReviewRead, response["data"])
 
     stats = session.exec(
         select(
@@ -127,13 +163,18 @@ def list_reviews(
         "data found",
         data,
         response["total"],
+        extra=(
+            {"next_cursor": response["next_cursor"]}
+            if "next_cursor" in response
+            else None
+        ),
     )
 
 
 @router.get("/stats/{user_id}")
 def stats_reviews(
     user_id: int,
-    session: GetSession,
+    session: GetReadSession,
 ):
     stats = session.exec(
         select(
@@ -152,3 +193,20 @@ def stats_reviews(
             "startDate": stats[2],
         },
     )
+
+
+@router.get("/export")
+def export_reviews(
+    user: requireAdmin,
+    query_params: ListQueryParams,
+    target_id: Optional[int] = None,
+    format: ExportFormat = Query("ndjson", description="ndjson or csv"),
+):
+    statement, Schema = export_statement(
+        Review,
+        ReviewRead,
+        query_params=vars(query_params),
+        searchFields=["comment"],
+        customFilters=[["target_id", target_id]] if target_id else None,
+    )
+    return stream_export(statement, Schema, format, filename="reviews")
@@ -1,22 +1,61 @@
 from datetime import datetime, timezone
 import json
 from typing import List, Optional, Union
-from fastapi import APIRouter, Depends, File, Query
+from fastapi import APIRouter, Depends, File, Header, Query
 from fastapi import UploadFile as UploadFileType
-from sqlmodel import select
+from sqlalchemy import delete
+from sqlmodel import func, select
 from starlette.datastructures import UploadFile
 from fastapi.encoders import jsonable_encoder
+from src.api.models.bookingModel import Booking, BookingCreate, BookingRead
 from src.api.models.mediaModel import Media
 from src.api.core.dependencies import ListQueryParams
 from src.api.core.response import raiseExceptions
+from src.api.core.serialization import validate_list
+from src.config import RIDE_CORRIDOR_CANDIDATES, RIDE_MATCH_KM_PER_HOUR
 from src.api.core.utility import (
     parse_date,
     parse_list,
 )
-from src.api.core.operation import listRecords, serialize_obj, updateOp
-from src.api.core.operation.media import delete_media_items, entryMedia, uploadImage
-from src.api.models.rideModel import Ride, RideRead, RideReadWithUser, UserRideForm
+from src.api.core.operation import (
+    alistRecords,
+    listRecords,
+    serialize_obj,
+    updateOp,
+)
+from src.api.core.operation.booking import book_seats, cancel_booking
+from src.api.core.operation.export import ExportFormat, export_statement, stream_export
+from src.api.core.operation.corridor import (
+    arrival_offset_hours,
+    corridor_candidates,
+    corridor_match,
+    normalize_route,
+    store_route_cells,
+)
+from src.api.core.operation.geo import route_match_filter
+from src.api.core.operation.geo_index import indexed_radius_filter, ride_geo_index
+from src.api.core.operation.list_operation_helper import column_datetime
+from src.api.core.operation.list_cache import bump_generation
+from src.lib.invalidation import notify_statement
+from src.api.core.operation.media import (
+    adelete_media_items,
+    aentryMedia,
+    delete_media_items,
+    uploadImage,
+)
+from src.api.models.rideModel import (
+    Ride,
+    RideCorridorRead,
+    RideMatchRead,
+    RideRead,
+    RideReadWithUser,
+    RideRouteCell,
+    UserRideForm,
+)
 from src.api.core import (
+    GetAsyncReadSession,
+    GetAsyncSession,
+    GetReadSession,
     GetSession,
     api_response,
     requireSignin,
@@ -28,10 +67,28 @@ from src.api.core import (
 router = APIRouter(prefix="/ride", tags=["ride"])
 
 
+def upcoming_range(column: str) -> str:
+    """
+    dateRange for "from now on". A lower bound on the partition key lets
+    Postgres skip every past month of rides. Truncated to the minute so the
+    list cache key stays the same within that minute.
+    """
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    return json.dumps([column, now.isoformat()])
+
+
+def valid_route(encoded: str) -> str:
+    # client polyline -> validated + simplified polyline, 400 if malformed
+    try:
+        return normalize_route(encoded)
+    except ValueError as e:
+        return api_response(400, f"Invalid route: {e}")
+
+
 @router.post("/create", response_model=RideRead)
 async def create_ride(
     user: verifiedUser,
-    session: GetSession,
+    session: GetAsyncSession,
     request: UserRideForm = Depends(),
 ):
     user_id = user.get("id")
@@ -41,7 +98,7 @@ async def create_ride(
         files = [request.car_pic]
         saved_files = await uploadImage(files, thumbnail=False)
 
-        records = entryMedia(session, saved_files)
+        records = await aentryMedia(session, saved_files)
 
         request.car_pic = records[0].model_dump(
             include={"id", "filename", "original", "media_type"}
@@ -49,7 +106,7 @@ async def create_ride(
 
     if isinstance(request.car_pic, str):  # URL should be string, not URL type
         statement = select(Media).where(Media.filename == request.car_pic)
-        media = session.exec(statement).first()
+        media = (await session.exec(statement)).first()
 
         if media:
             request.car_pic = media.model_dump(
@@ -60,7 +117,7 @@ async def create_ride(
         other_files = request.other_images
         saved_files = await uploadImage(other_files, thumbnail=False)
 
-        records = entryMedia(session, saved_files)
+        records = await aentryMedia(session, saved_files)
 
         request.other_images = records
 
@@ -90,11 +147,20 @@ async def create_ride(
     if "arrival_time" in ride_data:
         ride_data["arrival_time"] = parse_date(ride_data["arrival_time"])
 
+    if ride_data.get("route_polyline"):
+        ride_data["route_polyline"] = valid_route(ride_data["route_polyline"])
+
     # Create Ride instance
     ride = Ride(**ride_data)
     session.add(ride)
-    session.commit()
-    session.refresh(ride)
+    await session.flush()  # id for the route cells
+    await store_route_cells(session, ride)
+    # other workers drop their cached rides once this commits
+    await session.exec(notify_statement("rides", ride.id, "insert", ("media",)))
+    await session.commit()
+    bump_generation("rides", "media")
+    await session.refresh(ride)
+    ride_geo_index.upsert(ride)
     print("typeof", type(ride))
     # ride_json = jsonable_encoder(RideRead.model_validate(ride))
     return api_response(200, "Ride Create Successfully", ride)
@@ -104,7 +170,7 @@ async def create_ride(
 async def update_ride(
     ride_id: int,
     user: verifiedUser,
-    session: GetSession,
+    session: GetAsyncSession,
     request: UserRideForm = Depends(),
 ):
 
@@ -113,7 +179,7 @@ async def update_ride(
     # ------------------------------
     #  Find Ride and Verify Owner
     # ------------------------------
-    ride = session.get(Ride, ride_id)
+    ride = await session.get(Ride, ride_id)
 
     if not ride:
         return api_response(404, "Ride not found")
@@ -152,11 +218,11 @@ async def update_ride(
     # ------------------------------
     if isinstance(request.car_pic, UploadFile):
         if ride.car_pic:
-            delete_media_items(session, filenames=[ride.car_pic["filename"]])
+            await adelete_media_items(session, filenames=[ride.car_pic["filename"]])
 
         files = [request.car_pic]
         saved_files = await uploadImage(files, thumbnail=False)
-        records = entryMedia(session, saved_files)
+        records = await aentryMedia(session, saved_files)
 
         request.car_pic = records[0].model_dump(
             include={"id", "filename", "original", "media_type"}
@@ -188,7 +254,7 @@ async def update_ride(
         ]
 
         # Delete from media table
-        delete_media_items(session, filenames=filenames_to_delete)
+        await adelete_media_items(session, filenames=filenames_to_delete)
 
     # -----------------------
     # 2️⃣ HANDLE NEW UPLOADS
@@ -198,7 +264,7 @@ async def update_ride(
 
         if upload_files:
             saved_files = await uploadImage(upload_files, thumbnail=False)
-            records = entryMedia(session, saved_files)
+            records = await aentryMedia(session, saved_files)
 
             new_uploaded_images = [
                 r.model_dump(include={"id", "filename", "original", "media_type"})
@@ -215,17 +281,34 @@ async def update_ride(
     #  Convert to serializable dict
     # ------------------------------
 
-    # delete_files = json.loads(request.delete_images)
-    update_data = updateOp(ride, request, session)
+    if request.route_polyline:
+        request.route_polyline = valid_route(request.route_polyline)
 
     # ------------------------------
-    # Convert arrival_time string → datetime
+    # Convert arrival_time string → datetime (before it reaches the model)
     # ------------------------------
-    if "arrival_time" in update_data and update_data["arrival_time"]:
-        update_data["arrival_time"] = parse_date(update_data["arrival_time"])
+    if request.arrival_time:
+        request.arrival_time = parse_date(request.arrival_time)
 
-    session.commit()
-    session.refresh(update_data)
+    # delete_files = json.loads(request.delete_images)
+    update_data = updateOp(ride, request, session)
+
+    # endpoints, route, timing or status changed -> re-rasterize for corridor
+    # search (expiry deleted the cells of a ride that is now re-activated)
+    if (
+        request.from_
+        or request.to_
+        or request.route_polyline
+        or request.arrival_time
+        or request.active is not None
+    ):
+        await store_route_cells(session, ride)
+
+    await session.exec(notify_statement("rides", ride.id, "update", ("media",)))
+    await session.commit()
+    bump_generation("rides", "media")
+    await session.refresh(update_data)
+    ride_geo_index.upsert(update_data)  # moved, re-timed or deactivated
 
     # ------------------------------
     # Return formatted response
@@ -236,7 +319,7 @@ async def update_ride(
 @router.get("/read/{id}", response_model=RideReadWithUser)
 def findOne(
     id: int,
-    session: GetSession,
+    session: GetReadSession,
 ):
 
     read = session.get(Ride, id)  # Like findById
@@ -251,13 +334,14 @@ def findOne(
 
 
 @router.get("/list", response_model=list[RideRead])
-def list(
+async def list(
     query_params: ListQueryParams,
-    session: GetSession,
+    session: GetAsyncReadSession,
     geo_filters: Optional[str] = Query(
         None,
         description='Example : [["from_lat",33.5953242],["from_lng",73.0543264],["radius_from",20]]',
     ),
+    includePast: bool = Query(False, description="Also list past and inactive rides"),
 ):
     query_params = vars(query_params)
     searchFields = [
@@ -269,19 +353,262 @@ def list(
         "car_model",
     ]
     # print("geo_filters===========", geo_filters)
-
-    return listRecords(
+    # Live rides only by default: served by the partial indexes WHERE active
+    customFilters = None
+    otherFilters = None
+    if not includePast:
+        customFilters = [["active", True]]
+        if not query_params.get("dateRange"):
+            query_params["dateRange"] = upcoming_range("arrival_time")
+        # Radius search on the in-memory index, SQL only loads the matching ids
+        if geo_filters and ride_geo_index.ready:
+            otherFilters = indexed_radius_filter(geo_filters)
+            if otherFilters is not None:
+                geo_filters = None
+
+    return await alistRecords(
+        session,
         query_params=query_params,
         geo_filters=geo_filters,
         searchFields=searchFields,
         Model=Ride,
         Schema=RideRead,
+        customFilters=customFilters,
+        otherFilters=otherFilters,
         badStatusMsg="No Ride found",
+        totalMode="estimated",
+        cache=True,
+        includes={"user": RideReadWithUser},  # ?include=user
+    )
+
+
+@router.get("/match", response_model=List[RideMatchRead])
+async def match(
+    session: GetAsyncReadSession,
+    from_lat: float = Query(..., ge=-90, le=90),
+    from_lng: float = Query(..., ge=-180, le=180),
+    to_lat: float = Query(..., ge=-90, le=90),
+    to_lng: float = Query(..., ge=-180, le=180),
+    radius_from: float = Query(5, gt=0, le=200, description="KM around the pickup"),
+    radius_to: float = Query(5, gt=0, le=200, description="KM around the drop-off"),
+    arrival_time: Optional[str] = Query(
+        None, description="Wanted arrival time, defaults to now"
+    ),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """
+    Rides starting near (from_lat, from_lng) and ending near (to_lat, to_lng),
+    best first: pickup + drop-off detour (km) plus RIDE_MATCH_KM_PER_HOUR for
+    every hour between the ride's arrival and the wanted one.
+    """
+    now = datetime.now(timezone.utc)
+    wanted = parse_date(arrival_time) if arrival_time else now
+
+    statement, from_distance, to_distance = route_match_filter(
+        select(Ride),
+        Ride,
+        origin=(from_lat, from_lng),
+        destination=(to_lat, to_lng),
+        radius_from_km=radius_from,
+        radius_to_km=radius_to,
+    )
+    offset_hours = (
+        func.abs(
+            func.extract(
+                "epoch", Ride.arrival_time - column_datetime(Ride.arrival_time, wanted)
+            )
+        )
+        / 3600
+    )
+    score = (from_distance + to_distance + offset_hours * RIDE_MATCH_KM_PER_HOUR).label(
+        "score"
+    )
+
+    statement = (
+        statement.add_columns(
+            from_distance.label("from_distance_km"),
+            to_distance.label("to_distance_km"),
+            offset_hours.label("arrival_offset_hours"),
+            score,
+        )
+        # live, upcoming rides only (partial index + partition pruning)
+        .where(Ride.active)
+        .where(Ride.arrival_time >= column_datetime(Ride.arrival_time, now))
+        .order_by(score, Ride.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    rows = (await session.exec(statement)).all()
+    if not rows:
+        return api_response(404, "No matching ride found")
+
+    data = validate_list(
+        RideMatchRead,
+        (
+            {
+                "ride": ride,
+                "from_distance_km": from_km,
+                "to_distance_km": to_km,
+                "arrival_offset_hours": hours,
+                "score": ride_score,
+            }
+            for ride, from_km, to_km, hours, ride_score in rows
+        ),
+    )
+    return api_response(200, "Matching rides found", data)
+
+
+@router.get("/corridor", response_model=List[RideCorridorRead])
+async def corridor(
+    session: GetAsyncReadSession,
+    from_lat: float = Query(..., ge=-90, le=90),
+    from_lng: float = Query(..., ge=-180, le=180),
+    to_lat: float = Query(..., ge=-90, le=90),
+    to_lng: float = Query(..., ge=-180, le=180),
+    radius: float = Query(3, gt=0, le=50, description="KM from the ride's route"),
+    arrival_time: Optional[str] = Query(
+        None, description="Wanted arrival time, defaults to now"
+    ),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """
+    Rides whose route passes within radius km of the pickup and then of the
+    drop-off (riders along the way, not only at the ends), ranked like
+    /ride/match: pickup + drop-off distance plus RIDE_MATCH_KM_PER_HOUR per
+    hour away from the wanted arrival.
+    """
+    now = datetime.now(timezone.utc)
+    wanted = parse_date(arrival_time) if arrival_time else now
+    pickup, dropoff = (from_lat, from_lng), (to_lat, to_lng)
+
+    statement = (
+        select(Ride)
+        .where(Ride.id.in_(corridor_candidates(pickup, dropoff, radius, now, wanted)))
+        .where(Ride.arrival_time >= column_datetime(Ride.arrival_time, now))
+    )
+    rides = (await session.exec(statement)).all()
+    matches = []
+    for ride in rides:
+        distances = corridor_match(ride, pickup, dropoff, radius)
+        if distances is None:
+            continue
+        hours = arrival_offset_hours(ride, wanted)
+        matches.append(
+            {
+                "ride": ride,
+                "pickup_distance_km": distances[0],
+                "dropoff_distance_km": distances[1],
+                "arrival_offset_hours": hours,
+                "score": sum(distances) + hours * RIDE_MATCH_KM_PER_HOUR,
+            }
+        )
+    if not matches:
+        return api_response(404, "No ride passes along this route")
+
+    matches.sort(key=lambda match: (match["score"], match["ride"].id))
+    data = validate_list(RideCorridorRead, matches[skip : skip + limit])
+    # only the RIDE_CORRIDOR_CANDIDATES rides closest in time were checked
+    capped = len(rides) >= RIDE_CORRIDOR_CANDIDATES
+    return api_response(
+        200,
+        "Rides along the route found",
+        data,
+        len(matches),
+        extra={"capped": True} if capped else None,
+    )
+
+
+@router.post("/{id}/book", response_model=BookingRead)
+async def book(
+    id: int,
+    request: BookingCreate,
+    user: verifiedUser,
+    session: GetAsyncSession,
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=64,
+        description="Retries with the same key return the first booking",
+    ),
+):
+    booking, created = await book_seats(
+        session,
+        ride_id=id,
+        user_id=user.get("id"),
+        seats=request.seats,
+        idempotency_key=idempotency_key,
+    )
+    if not created:
+        return api_response(
+            200, "Booking already made", BookingRead.model_validate(booking)
+        )
+    return api_response(
+        201, "Ride Booked Successfully", BookingRead.model_validate(booking)
+    )
+
+
+@router.post("/booking/{booking_id}/cancel", response_model=BookingRead)
+async def cancel_book(
+    booking_id: int,
+    user: requireSignin,
+    session: GetAsyncSession,
+):
+    booking = await cancel_booking(session, booking_id, user.get("id"))
+    return api_response(
+        200, "Booking Cancelled Successfully", BookingRead.model_validate(booking)
+    )
+
+
+@router.get("/bookings", response_model=List[BookingRead])
+async def my_bookings(
+    query_params: ListQueryParams,
+    user: requireSignin,
+    session: GetAsyncReadSession,
+):
+    return await alistRecords(
+        session,
+        query_params=vars(query_params),
+        searchFields=[],
+        Model=Booking,
+        Schema=BookingRead,
+        customFilters=[["user_id", user.get("id")]],
+        badStatusMsg="No booking found",
+    )
+
+
+@router.get("/export")
+def export_rides(
+    user: requireAdmin,
+    query_params: ListQueryParams,
+    geo_filters: Optional[str] = Query(
+        None,
+        description='Example : [["from_lat",33.5953242],["from_lng",73.0543264],["radius_from",20]]',
+    ),
+    format: ExportFormat = Query("ndjson", description="ndjson or csv"),
+):
+    searchFields = [
+        "from_address",
+        "to_address",
+        "car_number",
+        "car_type",
+        "car_name",
+        "car_model",
+    ]
+    statement, Schema = export_statement(
+        Ride,
+        RideRead,
+        query_params=vars(query_params),
+        searchFields=searchFields,
+        geo_filters=geo_filters,
+        includes={"user": RideReadWithUser},
     )
+    return stream_export(statement, Schema, format, filename="rides")
 
 
 @router.get("/listbyuserid", response_model=List[RideRead])
-def list(query_params: ListQueryParams, user: requireSignin, session: GetSession):
+def list(query_params: ListQueryParams, user: requireSignin, session: GetReadSession):
     query_params = vars(query_params)
     searchFields = [
         "from_address",
@@ -293,6 +620,7 @@ def list(query_params: ListQueryParams, user: requireSignin, session: GetSession
     ]
     user_id = user.get("id")
     return listRecords(
+        session,
         query_params=query_params,
         searchFields=searchFields,
         Model=Ride,
@@ -339,5 +667,9 @@ def delete_role(
         delete_media_items(session, filenames=filenames_to_delete)
 
     session.delete(ride)
+    session.exec(delete(RideRouteCell).where(RideRouteCell.ride_id == ride.id))
+    session.exec(notify_statement("rides", ride.id, "delete", ("media",)))
     session.commit()
+    bump_generation("rides", "media")
+    ride_geo_index.remove(ride.id)
     return api_response(200, f"Ride {ride.id} deleted")
@@ -0,0 +1,145 @@
+from fastapi import APIRouter, Query, Request
+
+from src.api.core import api_response, requireAdmin
+from src.api.core.security import token_cache_stats
+from src.api.core.middleware.rate_limit import rate_limit_stats
+from src.api.core.operation.geo_index import ride_geo_index
+from src.api.core.operation.index_advisor import (
+    draft_revision,
+    observed_shapes,
+    recommend,
+    reset_shapes,
+)
+from src.api.core.operation.list_cache import clear_list_cache, list_cache_stats
+from src.api.core.operation.list_operation_helper import plan_cache_stats
+from src.lib.invalidation import bus_stats
+from src.lib.db_con import async_read_router, engine, pool_monitors, read_router
+from src.config import INDEX_ADVISOR_MIN_HITS, RATE_LIMIT_BACKEND
+from src.lib.partitions import RIDE_PARTITIONS, attached_partitions, run_maintenance
+from src.lib.sql_monitor import totals as sql_totals
+
+router = APIRouter(prefix="/system", tags=["system"])
+
+
+@router.get("/cache-stats")
+def cache_stats(user: requireAdmin):
+    return api_response(
+        200,
+        "Cache stats",
+        {
+            "list_results": list_cache_stats(),
+            "filter_plans": plan_cache_stats(),
+            "ride_geo_index": ride_geo_index.stats(),
+            "invalidation_bus": bus_stats(),
+            "token_claims": token_cache_stats(),
+        },
+    )
+
+
+@router.delete("/cache")
+def clear_cache(user: requireAdmin):
+    clear_list_cache()
+    return api_response(200, "List cache cleared")
+
+
+@router.get("/pool")
+def pool_stats(user: requireAdmin):
+    return api_response(
+        200,
+        "Connection pool stats",
+        {name: monitor.report() for name, monitor in pool_monitors.items()},
+    )
+
+
+@router.get("/rate-limits")
+def rate_limits(user: requireAdmin):
+    return api_response(
+        200,
+        "Rate limit counters (this worker)",
+        {"backend": RATE_LIMIT_BACKEND, "policies": rate_limit_stats()},
+    )
+
+
+@router.get("/sql")
+def sql_stats(request: Request, user: requireAdmin):
+    return api_response(
+        200,
+        "SQL stats",
+        {
+            "process": dict(sql_totals),
+            # this request's own queries (auth lookup etc.)
+            "request": request.state.sql.summary(),
+        },
+    )
+
+
+@router.get("/replicas")
+def replica_stats(user: requireAdmin):
+    return api_response(
+        200,
+        "Read replica status",
+        {"sync": read_router.status(), "async": async_read_router.status()},
+    )
+
+
+@router.get("/index-advisor")
+def index_advisor(
+    user: requireAdmin,
+    min_hits: int = Query(INDEX_ADVISOR_MIN_HITS, ge=1),
+):
+    # inspected on the primary: replicas carry the same indexes
+    recommendations = recommend(engine, min_hits)
+    return api_response(
+        200,
+        "Index recommendations",
+        {
+            "shapes": observed_shapes(),
+            "recommendations": [
+                {**rec._asdict(), "name": rec.name, "ddl": rec.ddl}
+                for rec in recommendations
+            ],
+            "ddl": "\n".join(rec.ddl for rec in recommendations),
+            "migration": (
+                draft_revision(recommendations)["source"]
+                if recommendations
+                else None
+            ),
+        },
+    )
+
+
+@router.get("/index-advisor/revision")
+def index_advisor_revision(
+    user: requireAdmin,
+    min_hits: int = Query(INDEX_ADVISOR_MIN_HITS, ge=1),
+):
+    # returned, not written: workers don't touch migration/versions
+    recommendations = recommend(engine, min_hits)
+    if not recommendations:
+        return api_response(404, "No missing indexes for the observed list queries")
+    return api_response(
+        200,
+        "Draft migration, save it under migration/versions and review it",
+        draft_revision(recommendations),
+    )
+
+
+@router.delete("/index-advisor")
+def index_advisor_reset(user: requireAdmin):
+    reset_shapes()
+    return api_response(200, "Observed list shapes cleared")
+
+
+@router.get("/partitions")
+def partitions(user: requireAdmin):
+    with engine.connect() as conn:
+        data = attached_partitions(conn, RIDE_PARTITIONS["table"])
+    return api_response(200, "Ride partitions", data)
+
+
+@router.post("/partitions/maintenance")
+def partition_maintenance(user: requireAdmin):
+    # same pass the lifespan loop runs, on demand
+    return api_response(
+        200, "Partition maintenance done", run_maintenance(engine, **RIDE_PARTITIONS)
+    )
@@ -8,10 +8,19 @@ from src.config import DOMAIN
 from src.api.core.operation.media import delete_media_items, entryMedia, uploadImage
 from src.api.core.response import api_response, raiseExceptions
 from src.api.core.operation import listop
+from src.api.core.operation.export import ExportFormat, export_statement, stream_export
+from src.api.core.operation.list_cache import bump_generation
+from src.lib.invalidation import notify_statement
 
 from src.api.core.security import create_access_token, hash_password
 from src.api.core import updateOp, requireSignin
-from src.api.core.dependencies import GetSession, requirePermission, requireAdmin
+from src.api.core.dependencies import (
+    GetReadSession,
+    GetSession,
+    ListQueryParams,
+    requirePermission,
+    requireAdmin,
+)
 
 from src.api.models.userModel import (
     UpdateUserByAdmin,
@@ -38,7 +47,7 @@ def get_user(
 @router.get("/read/{id}", response_model=UserRead)
 def get_user(
     id: int,
-    session: GetSession,
+    session: GetReadSession,
 ):
     user_id = id
     db_user = session.get(User, user_id)  # Like findById
@@ -109,7 +118,10 @@ async def update_user(
             body=html_template,
         )
 
+    # other workers drop their cached users once this commits
+    session.exec(notify_statement("users", db_user.id, "update", ("media",)))
     session.commit()
+    bump_generation("users", "media")
     session.refresh(updated_user)
     return api_response(
         200, "User Update Successfully", UserRead.model_validate(updated_user)
@@ -136,7 +148,9 @@ def update_user(
     if request.password:
         updated_user.password = hash_password(request.password)
 
+    session.exec(notify_statement("users", db_user.id, "update", ("media",)))
     session.commit()
+    bump_generation("users", "media")
     session.refresh(db_user)
     return api_response(200, "User Found", UserRead.model_validate(db_user))
 
@@ -145,7 +159,7 @@ def update_user(
 @router.get("/list", response_model=list[UserRead])  # no response_model
 def list_users(
     user: requireAdmin,
-    session: GetSession,
+    session: GetReadSession,
     dateRange: Optional[
         str
     ] = None,  # JSON string like '["created_at", "01-01-2025", "01-12-2025"]'
@@ -187,3 +201,18 @@ def list_users(
         data,
         result["total"],
     )
+
+
+@router.get("/export")
+def export_users(
+    user: requireAdmin,
+    query_params: ListQueryParams,
+    format: ExportFormat = Query("ndjson", description="ndjson or csv"),
+):
+    statement, Schema = export_statement(
+        User,
+        UserRead,
+        query_params=vars(query_params),
+        searchFields=["full_name", "phone", "email"],
+    )
+    return stream_export(statement, Schema, format, filename="users")
@@ -5,6 +5,70 @@ from dotenv import load_dotenv
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# asyncpg URL for the async engine, derived from DATABASE_URL when unset
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# Read replicas (comma separated URLs), used by GetReadSession/GetAsyncReadSession
+DATABASE_REPLICA_URLS = [
+    url.strip()
+    for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+# Replicas lagging more than this are skipped, reads fall back to the primary
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", 5))
+DB_REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", 5))
+DB_REPLICA_COOLDOWN = float(os.getenv("DB_REPLICA_COOLDOWN", 30))
+
+# Connection pool (per engine, per worker process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+# Connections held longer than this many seconds are reported as possible leaks
+DB_POOL_LEAK_SECONDS = float(os.getenv("DB_POOL_LEAK_SECONDS", 10))
+DB_POOL_TRACK_STACK = os.getenv("DB_POOL_TRACK_STACK", "false").lower() == "true"
+
+# SQL instrumentation
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() == "true"  # SQLAlchemy echo
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", 200))
+# Same statement this many times in one request -> logged as likely N+1
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", 5))
+
+# rides is range partitioned by month on arrival_time (see src/lib/partitions.py)
+RIDE_PARTITIONS_AHEAD = int(os.getenv("RIDE_PARTITIONS_AHEAD", 3))  # months
+# Partitions ending more than this many months ago are detached into
+# RIDE_ARCHIVE_SCHEMA (0 keeps everything attached)
+RIDE_PARTITION_RETENTION_MONTHS = int(os.getenv("RIDE_PARTITION_RETENTION_MONTHS", 12))
+RIDE_ARCHIVE_SCHEMA = os.getenv("RIDE_ARCHIVE_SCHEMA", "archive")
+# Past rides are set inactive every RIDE_EXPIRY_INTERVAL seconds (0 disables),
+# in transactions of RIDE_EXPIRY_BATCH_SIZE rows, at most RIDE_EXPIRY_MAX_BATCHES per run
+RIDE_EXPIRY_INTERVAL = float(os.getenv("RIDE_EXPIRY_INTERVAL", 300))
+RIDE_EXPIRY_BATCH_SIZE = int(os.getenv("RIDE_EXPIRY_BATCH_SIZE", 1000))
+RIDE_EXPIRY_MAX_BATCHES = int(os.getenv("RIDE_EXPIRY_MAX_BATCHES", 50))
+# /ride/match ranking: one hour away from the wanted arrival time weighs
+# as much as this many km of detour
+RIDE_MATCH_KM_PER_HOUR = float(os.getenv("RIDE_MATCH_KM_PER_HOUR", 10))
+# Corridor search: route grid cell size (degrees, 0.05 ~ 5.5 km), Douglas-Peucker
+# tolerance for stored routes (degrees, 0.001 ~ 110 m) and rides checked exactly
+RIDE_ROUTE_CELL_DEG = float(os.getenv("RIDE_ROUTE_CELL_DEG", 0.05))
+RIDE_ROUTE_SIMPLIFY_DEG = float(os.getenv("RIDE_ROUTE_SIMPLIFY_DEG", 0.001))
+RIDE_CORRIDOR_CANDIDATES = int(os.getenv("RIDE_CORRIDOR_CANDIDATES", 500))
+# In-memory geo index of live rides for ?geo_filters radius queries (per worker),
+# rebuilt every RIDE_GEO_INDEX_REFRESH seconds (0 = only at startup). Grid cells
+# are RIDE_GEO_INDEX_CELL_DEG wide (0.1 ~ 11 km); circles spanning more than
+# RIDE_GEO_INDEX_MAX_CELLS cells scan every indexed ride instead. Circles with
+# more than RIDE_GEO_INDEX_MAX_IDS rides go to the SQL radius filter
+RIDE_GEO_INDEX = os.getenv("RIDE_GEO_INDEX", "true").lower() == "true"
+RIDE_GEO_INDEX_REFRESH = float(os.getenv("RIDE_GEO_INDEX_REFRESH", 600))
+RIDE_GEO_INDEX_CELL_DEG = float(os.getenv("RIDE_GEO_INDEX_CELL_DEG", 0.1))
+RIDE_GEO_INDEX_MAX_CELLS = int(os.getenv("RIDE_GEO_INDEX_MAX_CELLS", 400))
+RIDE_GEO_INDEX_MAX_IDS = int(os.getenv("RIDE_GEO_INDEX_MAX_IDS", 2000))
+# Bookings wait at most this long (ms) for a ride's row lock, then get a 503
+BOOKING_LOCK_TIMEOUT_MS = int(os.getenv("BOOKING_LOCK_TIMEOUT_MS", 2000))
+# Seconds between maintenance runs in each worker (0 disables the loop)
+PARTITION_MAINTENANCE_INTERVAL = float(
+    os.getenv("PARTITION_MAINTENANCE_INTERVAL", 6 * 60 * 60)
+)
 SECRET_KEY = os.getenv("SECRET_KEY")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(
     os.getenv(
@@ -18,8 +82,58 @@ ACCESS_TOKEN_EXPIRE = int(
         30,
     )
 )
+# Verified JWT claims kept in memory (per worker) until each token's exp
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+# Revoked tokens are loaded before a worker serves requests: attempts and
+# seconds between them, startup fails after the last one
+REVOCATION_LOAD_ATTEMPTS = int(os.getenv("REVOCATION_LOAD_ATTEMPTS", 5))
+REVOCATION_LOAD_RETRY_SECONDS = float(os.getenv("REVOCATION_LOAD_RETRY_SECONDS", 2))
 DOMAIN = os.getenv("DOMAIN")
 
+# List endpoints: planner estimates replace count(*) above this many rows
+LIST_COUNT_ESTIMATE_THRESHOLD = int(os.getenv("LIST_COUNT_ESTIMATE_THRESHOLD", 10000))
+# Cached filter shapes (joins/attributes/coercers) per model
+LIST_PLAN_CACHE_SIZE = int(os.getenv("LIST_PLAN_CACHE_SIZE", 512))
+# Rendered list pages kept in memory, dropped on writes or after the TTL (seconds)
+LIST_CACHE_SIZE = int(os.getenv("LIST_CACHE_SIZE", 1024))
+LIST_CACHE_TTL = float(os.getenv("LIST_CACHE_TTL", 30))
+# Pages of tables written this recently are built on the primary, a replica
+# may not have the write yet (defaults to the replica lag allowance)
+LIST_CACHE_PRIMARY_WINDOW = float(
+    os.getenv("LIST_CACHE_PRIMARY_WINDOW", DB_REPLICA_MAX_LAG_SECONDS)
+)
+# Rows fetched per server-side cursor round trip in /export endpoints
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+# Index advisor: distinct filter shapes remembered / hits before a shape counts
+INDEX_ADVISOR_MAX_SHAPES = int(os.getenv("INDEX_ADVISOR_MAX_SHAPES", 500))
+INDEX_ADVISOR_MIN_HITS = int(os.getenv("INDEX_ADVISOR_MIN_HITS", 20))
+# Cross-worker cache invalidation over LISTEN/NOTIFY (see src/lib/invalidation.py),
+# the listener pings its connection after this many idle seconds
+CACHE_INVALIDATION_BUS = os.getenv("CACHE_INVALIDATION_BUS", "true").lower() == "true"
+CACHE_INVALIDATION_CHANNEL = os.getenv(
+    "CACHE_INVALIDATION_CHANNEL", "cache_invalidation"
+)
+CACHE_INVALIDATION_KEEPALIVE = float(os.getenv("CACHE_INVALIDATION_KEEPALIVE", 30))
+
+# Rate limits on login/register/OTP/upload routes (policies in
+# src/api/core/middleware/rate_limit.py). Backend "memory" counts per worker,
+# "postgres" shares the counters (rate_limits table) between workers
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_MEMORY_KEYS = int(os.getenv("RATE_LIMIT_MEMORY_KEYS", 100000))
+RATE_LIMIT_CLEANUP_INTERVAL = float(os.getenv("RATE_LIMIT_CLEANUP_INTERVAL", 60))
+# Bodies above this many bytes are not parsed for the identifier key
+RATE_LIMIT_MAX_BODY = int(os.getenv("RATE_LIMIT_MAX_BODY", 16384))
+# Reverse proxies / load balancers in front of the app (comma separated IPs
+# or CIDRs). Requests from them are keyed on the X-Forwarded-For client, else
+# every client behind the proxy shares one bucket. Leave empty when nothing
+# proxies the app, or when uvicorn already rewrites the client address
+# (--proxy-headers --forwarded-allow-ips)
+RATE_LIMIT_TRUSTED_PROXIES = [
+    proxy.strip()
+    for proxy in os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "").split(",")
+    if proxy.strip()
+]
 
 # Email
 SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
@@ -1,17 +1,44 @@
 from contextlib import contextmanager
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import (
     Session,
     create_engine,
 )
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.config import DATABASE_URL
+from src.config import (
+    ASYNC_DATABASE_URL,
+    DATABASE_REPLICA_URLS,
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_LEAK_SECONDS,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_POOL_TRACK_STACK,
+    DB_REPLICA_CHECK_INTERVAL,
+    DB_REPLICA_COOLDOWN,
+    DB_REPLICA_MAX_LAG_SECONDS,
+    SQL_ECHO,
+)
+from src.lib.pool_monitor import PoolMonitor
+from src.lib.replicas import ReplicaRouter, RoutingSession
+from src.lib.sql_monitor import instrument_engine
+
+POOL_OPTIONS = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,  # fail fast instead of queueing forever
+    pool_pre_ping=True,  # checks if connection is alive
+    pool_recycle=DB_POOL_RECYCLE,  # refresh stale connections
+)
 
 
 engine = create_engine(
     DATABASE_URL,
-    echo=True,
-    pool_pre_ping=True,  # checks if connection is alive
-    pool_recycle=1800,  # refresh stale connections
+    echo=SQL_ECHO,
+    **POOL_OPTIONS,
 )
 
 
@@ -21,3 +48,85 @@ def get_session():
         yield session
     finally:
         session.close()
+
+
+# ======================================================
+# ⚡ ASYNC ENGINE (asyncpg)
+# ======================================================
+def _async_url(url: str):
+    # postgresql+psycopg2://... -> postgresql+asyncpg://...
+    return make_url(url).set(drivername="postgresql+asyncpg")
+
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL or _async_url(DATABASE_URL),
+    echo=SQL_ECHO,
+    **POOL_OPTIONS,
+)
+
+
+async def get_async_session():
+    # expire_on_commit=False: attributes stay readable after commit,
+    # an implicit refresh would need an await
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+# ======================================================
+# 📚 READ REPLICAS
+# ======================================================
+replica_engines = [
+    create_engine(url, echo=SQL_ECHO, **POOL_OPTIONS) for url in DATABASE_REPLICA_URLS
+]
+async_replica_engines = [
+    create_async_engine(_async_url(url), echo=SQL_ECHO, **POOL_OPTIONS)
+    for url in DATABASE_REPLICA_URLS
+]
+
+REPLICA_OPTIONS = dict(
+    max_lag=DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval=DB_REPLICA_CHECK_INTERVAL,
+    cooldown=DB_REPLICA_COOLDOWN,
+)
+read_router = ReplicaRouter(engine, replica_engines, **REPLICA_OPTIONS)
+# AsyncSession runs its sync Session inside a greenlet, so the router works
+# with the sync_engine side of the async engines
+async_read_router = ReplicaRouter(
+    async_engine.sync_engine,
+    [e.sync_engine for e in async_replica_engines],
+    **REPLICA_OPTIONS,
+)
+
+
+def get_read_session():
+    """Session for read-only routes — replicas when available, else primary."""
+    session = RoutingSession(router=read_router)
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+async def get_async_read_session():
+    async with AsyncSession(
+        sync_session_class=RoutingSession,
+        router=async_read_router,
+        expire_on_commit=False,
+    ) as session:
+        yield session
+
+
+# Per-request query counts/timings — see SQLStatsMiddleware
+for _engine in [engine, async_engine, *replica_engines, *async_replica_engines]:
+    instrument_engine(_engine)
+
+# Checkout/checkin tracking — see /system/pool
+pool_monitors = {
+    name: PoolMonitor(name, DB_POOL_LEAK_SECONDS, DB_POOL_TRACK_STACK).attach(e)
+    for name, e in [
+        ("sync", engine),
+        ("async", async_engine),
+        *[(f"replica-{i}", e) for i, e in enumerate(replica_engines)],
+        *[(f"async-replica-{i}", e) for i, e in enumerate(async_replica_engines)],
+    ]
+}
@@ -0,0 +1,214 @@
+import asyncio
+import inspect
+import json
+import logging
+import os
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, NamedTuple, Optional
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+
+from src.config import (
+    ASYNC_DATABASE_URL,
+    CACHE_INVALIDATION_CHANNEL,
+    CACHE_INVALIDATION_KEEPALIVE,
+    DATABASE_URL,
+)
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# 📣 CACHE INVALIDATION BUS (LISTEN/NOTIFY)
+# ======================================================
+# Every worker process keeps its own caches (list pages, ride geo index...).
+# A write adds a pg_notify(table, id, op) to its transaction, Postgres
+# delivers it only when that transaction commits, and every worker's LISTEN
+# connection hands it to the invalidators registered for the table. The
+# writing worker already invalidated its own caches and skips its events.
+# Notifications sent while a listener is disconnected are lost, so after a
+# reconnect every registered cache is flushed.
+
+# Tells this process' notifications apart from other workers'
+WORKER_ID = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+# Postgres rejects payloads of 8000 bytes or more
+_MAX_PAYLOAD = 7900
+
+
+class ChangeEvent(NamedTuple):
+    table: str
+    id: Optional[int]  # None = many / unknown rows
+    op: str  # insert | update | delete | expire ...
+    related: tuple[str, ...] = ()  # other tables the write touched (media...)
+    origin: str = ""
+
+
+Invalidator = Callable[[ChangeEvent], Any]
+
+_invalidators: dict[str, list[Invalidator]] = defaultdict(list)
+_flushers: list[Callable[[], Any]] = []
+_tasks: set[asyncio.Task] = set()  # running async callbacks (keeps references)
+_stats = {
+    "connected": False,
+    "received": 0,
+    "own": 0,
+    "dispatched": 0,
+    "errors": 0,
+    "reconnects": 0,
+    "flushes": 0,
+}
+
+
+def register_invalidator(table: str, callback: Invalidator) -> None:
+    """callback(event) for writes to table ("*" = every table), sync or async."""
+    _invalidators[table].append(callback)
+
+
+def register_flush(callback: Callable[[], Any]) -> None:
+    """callback() drops a whole cache, run when the listener reconnects."""
+    _flushers.append(callback)
+
+
+def notify_statement(
+    table: str,
+    id: Optional[int] = None,
+    op: str = "update",
+    related: tuple[str, ...] = (),
+):
+    """
+    SELECT pg_notify(...) to run inside the write's transaction, before commit:
+        session.exec(notify_statement("rides", ride.id, "update"))
+    """
+    payload = json.dumps(
+        {
+            "table": table,
+            "id": id,
+            "op": op,
+            "related": list(related),
+            "origin": WORKER_ID,
+        }
+    )
+    if len(payload) > _MAX_PAYLOAD:
+        raise ValueError("Invalidation payload too large")
+    return select(func.pg_notify(CACHE_INVALIDATION_CHANNEL, payload))
+
+
+# ======================================================
+# 🔁 DISPATCH
+# ======================================================
+def _run(callback, *args) -> None:
+    try:
+        result = callback(*args)
+    except Exception:
+        _stats["errors"] += 1
+        logger.exception("Cache invalidator %r failed", callback)
+        return
+    if inspect.isawaitable(result):
+        task = asyncio.ensure_future(result)
+        _tasks.add(task)
+        task.add_done_callback(_task_done)
+
+
+def _task_done(task: asyncio.Task) -> None:
+    _tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        _stats["errors"] += 1
+        logger.error("Cache invalidator failed", exc_info=task.exception())
+
+
+def dispatch(event: ChangeEvent) -> None:
+    for callback in (*_invalidators.get(event.table, ()), *_invalidators.get("*", ())):
+        _run(callback, event)
+    _stats["dispatched"] += 1
+
+
+def flush_all() -> None:
+    for callback in _flushers:
+        _run(callback)
+    _stats["flushes"] += 1
+
+
+def _on_notification(connection, pid, channel, payload: str) -> None:
+    _stats["received"] += 1
+    try:
+        data = json.loads(payload)
+        event = ChangeEvent(
+            table=data["table"],
+            id=data.get("id"),
+            op=data.get("op", "update"),
+            related=tuple(data.get("related") or ()),
+            origin=data.get("origin", ""),
+        )
+    except (ValueError, KeyError, TypeError):
+        _stats["errors"] += 1
+        logger.warning("Ignoring malformed invalidation payload %r", payload)
+        return
+    if event.origin == WORKER_ID:
+        _stats["own"] += 1
+        return
+    dispatch(event)
+
+
+# ======================================================
+# 👂 LISTENER
+# ======================================================
+def _listen_dsn() -> str:
+    # asyncpg.connect() wants a plain postgresql:// URL
+    url = make_url(ASYNC_DATABASE_URL or DATABASE_URL).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+async def _listen_once(reconnect: bool) -> None:
+    """One LISTEN connection, returns (or raises) when it is lost."""
+    connection = await asyncpg.connect(_listen_dsn())
+    lost = asyncio.Event()
+    try:
+        connection.add_termination_listener(lambda _: lost.set())
+        await connection.add_listener(CACHE_INVALIDATION_CHANNEL, _on_notification)
+        _stats["connected"] = True
+        if reconnect:
+            # whatever was notified while we were away is gone
+            flush_all()
+        logger.info("Listening for cache invalidations")
+
+        while not lost.is_set():
+            try:
+                await asyncio.wait_for(lost.wait(), CACHE_INVALIDATION_KEEPALIVE)
+            except asyncio.TimeoutError:
+                # half-open TCP connections never terminate on their own
+                await asyncio.wait_for(
+                    connection.execute("SELECT 1"), CACHE_INVALIDATION_KEEPALIVE
+                )
+    finally:
+        _stats["connected"] = False
+        if not connection.is_closed():
+            connection.terminate()
+
+
+async def listen_loop() -> None:
+    """Keep a LISTEN connection open (started from the lifespan)."""
+    reconnect, delay = False, 1.0
+    while True:
+        try:
+            await _listen_once(reconnect)
+            delay = 1.0
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Cache invalidation listener lost: %s", e)
+        reconnect = True
+        _stats["reconnects"] += 1
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 30.0)
+
+
+def bus_stats() -> dict:
+    return {
+        **_stats,
+        "worker": WORKER_ID,
+        "invalidators": {table: len(cbs) for table, cbs in _invalidators.items()},
+        "pending": len(_tasks),
+    }
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import re
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from src.config import (
+    RIDE_ARCHIVE_SCHEMA,
+    RIDE_PARTITION_RETENTION_MONTHS,
+    RIDE_PARTITIONS_AHEAD,
+)
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# 🗓️ MONTHLY RANGE PARTITIONS
+# ======================================================
+# rides is PARTITION BY RANGE (arrival_time) with one partition per month
+# (rides_y2025m01 holds [2025-01-01, 2025-02-01)) and rides_default for
+# anything outside them. Filters on arrival_time let Postgres skip whole
+# months; old months are detached and moved to an archive schema instead of
+# being scanned forever.
+
+RIDE_PARTITIONS = dict(
+    table="rides",
+    column="arrival_time",
+    months_ahead=RIDE_PARTITIONS_AHEAD,
+    retention_months=RIDE_PARTITION_RETENTION_MONTHS,
+    schema=RIDE_ARCHIVE_SCHEMA,
+)
+
+# Serializes maintenance across gunicorn workers (pg_try_advisory_lock key)
+MAINTENANCE_LOCK_ID = 7_301_017
+
+_PARTITION_NAME = re.compile(r"_y(\d{4})m(\d{2})$")
+
+
+def month_start(value: date, offset: int = 0) -> date:
+    """First day of value's month, moved by offset months."""
+    months = value.year * 12 + value.month - 1 + offset
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def _partition_month(table: str, name: str) -> Optional[date]:
+    match = _PARTITION_NAME.search(name)
+    if not name.startswith(f"{table}_y") or not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def _today() -> date:
+    # arrival_time is stored as naive UTC
+    return datetime.now(timezone.utc).date()
+
+
+def attached_partitions(conn: Connection, table: str) -> list[dict]:
+    rows = conn.execute(
+        text("""
+            SELECT c.relname AS name,
+                   pg_get_expr(c.relpartbound, c.oid) AS bounds,
+                   greatest(c.reltuples, 0)::bigint AS estimated_rows
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = CAST(:table AS regclass)
+            ORDER BY c.relname
+            """),
+        {"table": table},
+    )
+    return [dict(row._mapping) for row in rows]
+
+
+def _copy_columns(conn: Connection, table: str) -> str:
+    # generated columns (geo, search) are recomputed, they can't be inserted
+    rows = conn.execute(
+        text("""
+            SELECT column_name FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = :table
+              AND is_generated = 'NEVER'
+            ORDER BY ordinal_position
+            """),
+        {"table": table},
+    )
+    return ", ".join(f'"{row[0]}"' for row in rows)
+
+
+def create_partition(
+    conn: Connection, table: str, column: str, month: date
+) -> Optional[str]:
+    """
+    Create table's partition for month unless it exists. Rows already in the
+    default partition for that month are moved into it — Postgres refuses a
+    plain CREATE ... PARTITION OF while the default holds matching rows.
+    """
+    name = partition_name(table, month)
+    if conn.scalar(text("SELECT to_regclass(:name)"), {"name": name}):
+        return None
+
+    lower, upper = month_start(month), month_start(month, 1)
+    bounds = f"FROM ('{lower}') TO ('{upper}')"
+    in_range = f"{column} >= '{lower}' AND {column} < '{upper}'"
+    default = f"{table}_default"
+
+    has_default = conn.scalar(text("SELECT to_regclass(:name)"), {"name": default})
+    if has_default and conn.scalar(
+        text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})")
+    ):
+        columns = _copy_columns(conn, table)
+        conn.execute(
+            text(
+                f"CREATE TABLE {name} "
+                f"(LIKE {table} INCLUDING DEFAULTS INCLUDING GENERATED)"
+            )
+        )
+        conn.execute(
+            text(
+                f"INSERT INTO {name} ({columns}) "
+                f"SELECT {columns} FROM {default} WHERE {in_range}"
+            )
+        )
+        conn.execute(text(f"DELETE FROM {default} WHERE {in_range}"))
+        conn.execute(
+            text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {bounds}")
+        )
+    else:
+        conn.execute(
+            text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}")
+        )
+    logger.info("Created partition %s", name)
+    return name
+
+
+def ensure_partitions(
+    conn: Connection, table: str, column: str, months_ahead: int
+) -> list[str]:
+    """Partitions for the current month and the next months_ahead months."""
+    today = _today()
+    created = []
+    for offset in range(months_ahead + 1):
+        name = create_partition(conn, table, column, month_start(today, offset))
+        if name:
+            created.append(name)
+    return created
+
+
+def archive_partitions(
+    conn: Connection, table: str, retention_months: int, schema: str
+) -> list[str]:
+    """
+    Detach monthly partitions that ended more than retention_months ago and
+    move them to schema. The data stays queryable as schema.<partition>, it
+    just no longer belongs to table (re-attach to bring a month back).
+    """
+    if retention_months <= 0:
+        return []
+    cutoff = month_start(_today(), -retention_months)
+    archived = []
+    for partition in attached_partitions(conn, table):
+        month = _partition_month(table, partition["name"])
+        if month is None or month_start(month, 1) > cutoff:
+            continue
+        conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
+        conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition['name']}"))
+        conn.execute(text(f"ALTER TABLE {partition['name']} SET SCHEMA {schema}"))
+        logger.info("Archived partition %s to %s", partition["name"], schema)
+        archived.append(partition["name"])
+    return archived
+
+
+def run_maintenance(
+    engine: Engine,
+    table: str,
+    column: str,
+    months_ahead: int,
+    retention_months: int,
+    schema: str,
+) -> dict:
+    """One maintenance pass; skipped when another worker holds the lock."""
+    with engine.begin() as conn:
+        if not conn.scalar(
+            text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": MAINTENANCE_LOCK_ID}
+        ):
+            return {"skipped": True, "created": [], "archived": []}
+        created = ensure_partitions(conn, table, column, months_ahead)
+        archived = archive_partitions(conn, table, retention_months, schema)
+    return {"skipped": False, "created": created, "archived": archived}
+
+
+async def maintenance_loop(interval: float, **options) -> None:
+    """Run run_maintenance every interval seconds (started from the lifespan)."""
+    while True:
+        try:
+            await asyncio.to_thread(run_maintenance, **options)
+        except Exception:
+            logger.exception("Partition maintenance failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,96 @@
+import logging
+import threading
+import time
+import traceback
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMonitor:
+    """
+    Tracks pool checkouts so leaked / long-held connections can be found.
+
+    Every checkout is stored with its start time (and the caller's stack when
+    capture_stack is on); checkin removes it again. Connections held longer
+    than threshold seconds are logged on checkin and listed by report().
+    """
+
+    def __init__(self, name: str, threshold: float = 10.0, capture_stack=False):
+        self.name = name
+        self.threshold = threshold
+        self.capture_stack = capture_stack
+        self._held: dict[int, dict] = {}
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.slow_checkins = 0
+        self.max_held_seconds = 0.0
+
+    def attach(self, engine) -> "PoolMonitor":
+        # AsyncEngine events are registered on its sync_engine
+        engine = getattr(engine, "sync_engine", engine)
+        self.pool = engine.pool
+        event.listen(self.pool, "checkout", self._on_checkout)
+        event.listen(self.pool, "checkin", self._on_checkin)
+        return self
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        info = {
+            "since": time.monotonic(),
+            "thread": threading.current_thread().name,
+        }
+        if self.capture_stack:
+            # caller frames only, the SQLAlchemy pool internals are noise
+            frames = [
+                frame
+                for frame in traceback.extract_stack()
+                if "sqlalchemy" not in frame.filename and frame.filename != __file__
+            ]
+            info["stack"] = traceback.format_list(frames[-6:])
+        with self._lock:
+            self._held[id(connection_record)] = info
+            self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            info = self._held.pop(id(connection_record), None)
+        if info is None:
+            return
+
+        held = time.monotonic() - info["since"]
+        self.max_held_seconds = max(self.max_held_seconds, held)
+        if held >= self.threshold:
+            self.slow_checkins += 1
+            logger.warning(
+                "[%s pool] connection held %.1fs (thread %s)%s",
+                self.name,
+                held,
+                info["thread"],
+                "\n" + "".join(info["stack"]) if "stack" in info else "",
+            )
+
+    def long_held(self) -> list[dict]:
+        now = time.monotonic()
+        with self._lock:
+            held = list(self._held.values())
+        return [
+            {
+                "thread": info["thread"],
+                "held_seconds": round(now - info["since"], 2),
+                "stack": info.get("stack"),
+            }
+            for info in held
+            if now - info["since"] >= self.threshold
+        ]
+
+    def report(self) -> dict:
+        return {
+            "pool": self.pool.status(),
+            "checked_out": len(self._held),
+            "checkouts": self.checkouts,
+            "slow_checkins": self.slow_checkins,
+            "max_held_seconds": round(self.max_held_seconds, 2),
+            "threshold_seconds": self.threshold,
+            "long_held": self.long_held(),
+        }
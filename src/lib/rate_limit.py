@@ -0,0 +1,201 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+import math
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config import RATE_LIMIT_CLEANUP_INTERVAL, RATE_LIMIT_MEMORY_KEYS
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# 🚦 RATE LIMIT BACKENDS
+# ======================================================
+# Two algorithms, the same on every backend:
+# - token bucket: `limit` tokens refilled evenly over `window` seconds, a hit
+#   takes one. Allows a burst of `limit`, then a steady rate.
+# - sliding window: counters per fixed window, the previous window's count
+#   weighted by how much of it still overlaps [now - window, now]. Every hit
+#   counts, rejected ones too, so hammering keeps a client locked out.
+# MemoryBackend is per worker; PostgresBackend shares the counters between
+# workers/hosts through the rate_limits table (UNLOGGED, one upsert per hit).
+# Other stores plug in by subclassing RateLimitBackend.
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: float  # seconds until the next hit would be allowed
+
+
+def _bucket_result(allowed: bool, tokens: float, rate: float) -> RateLimitResult:
+    retry_after = 0.0 if tokens >= 1 else (1 - tokens) / rate
+    return RateLimitResult(allowed, max(0, math.floor(tokens)), retry_after)
+
+
+def _window_result(
+    current: int, previous: int, now: float, window: float, limit: int
+) -> RateLimitResult:
+    elapsed = now % window
+    weight = 1 - elapsed / window
+    estimate = previous * weight + current
+    if estimate <= limit:
+        return RateLimitResult(True, max(0, math.floor(limit - estimate)), 0.0)
+    if current > limit:
+        # even a fully expired previous window is not enough
+        retry_after = window - elapsed
+    else:
+        # until the previous window's share drops to (limit - current)
+        retry_after = window * (1 - (limit - current) / previous) - elapsed
+    return RateLimitResult(False, 0, max(retry_after, 0.0))
+
+
+class RateLimitBackend(ABC):
+    name = "base"
+
+    @abstractmethod
+    async def token_bucket(
+        self, key: str, limit: int, window: float, now: float
+    ) -> RateLimitResult: ...
+
+    @abstractmethod
+    async def sliding_window(
+        self, key: str, limit: int, window: float, now: float
+    ) -> RateLimitResult: ...
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+
+class MemoryBackend(RateLimitBackend):
+    """Per worker, bounded LRU of keys (only touched from the event loop)."""
+
+    name = "memory"
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MEMORY_KEYS):
+        self.max_keys = max_keys
+        self._state: OrderedDict = OrderedDict()
+
+    def _set(self, key: str, value) -> None:
+        self._state[key] = value
+        self._state.move_to_end(key)
+        while len(self._state) > self.max_keys:
+            self._state.popitem(last=False)
+
+    async def token_bucket(self, key, limit, window, now) -> RateLimitResult:
+        rate = limit / window
+        tokens, stamp = self._state.get(key, (float(limit), now))
+        tokens = min(float(limit), tokens + (now - stamp) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._set(key, (tokens, now))
+        return _bucket_result(allowed, tokens, rate)
+
+    async def sliding_window(self, key, limit, window, now) -> RateLimitResult:
+        index = int(now // window)
+        current = self._state.get(f"{key}:{index}", 0) + 1
+        self._set(f"{key}:{index}", current)
+        previous = self._state.get(f"{key}:{index - 1}", 0)
+        return _window_result(current, previous, now, window, limit)
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "keys": len(self._state)}
+
+
+class PostgresBackend(RateLimitBackend):
+    """
+    Counters shared through Postgres, one statement per hit. Works against
+    any AsyncEngine, e.g. a throwaway local Postgres in tests.
+    """
+
+    name = "postgres"
+
+    # Refill, check and take a token in one upsert; SET sees the old row
+    _TOKEN_BUCKET = text("""
+        INSERT INTO rate_limits AS r (key, tokens, stamp, allowed, expires_at)
+        VALUES (:key, CAST(:limit AS float8) - 1, :now, true, :expires_at)
+        ON CONFLICT (key) DO UPDATE SET
+            allowed = least(:limit, r.tokens + (:now - r.stamp) * :rate) >= 1,
+            tokens = least(:limit, r.tokens + (:now - r.stamp) * :rate)
+                - CASE WHEN least(:limit, r.tokens + (:now - r.stamp) * :rate) >= 1
+                  THEN 1 ELSE 0 END,
+            stamp = :now,
+            expires_at = :expires_at
+        RETURNING allowed, tokens
+        """)
+    _SLIDING_WINDOW = text("""
+        WITH hit AS (
+            INSERT INTO rate_limits AS r (key, tokens, stamp, allowed, expires_at)
+            VALUES (:current_key, 1, :now, true, :expires_at)
+            ON CONFLICT (key) DO UPDATE SET tokens = r.tokens + 1, stamp = :now
+            RETURNING tokens
+        )
+        SELECT
+            hit.tokens,
+            coalesce(
+                (SELECT tokens FROM rate_limits WHERE key = :previous_key), 0
+            )
+        FROM hit
+        """)
+    _CLEANUP = text("DELETE FROM rate_limits WHERE expires_at < :now")
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self._last_cleanup = time.time()
+        self._cleanup_task = None
+
+    async def _execute(self, statement, params: dict):
+        async with self.engine.begin() as conn:
+            row = (await conn.execute(statement, params)).one()
+        self._maybe_cleanup(params["now"])
+        return row
+
+    def _maybe_cleanup(self, now: float) -> None:
+        # expired keys are dropped in the background, once per interval
+        if now - self._last_cleanup < RATE_LIMIT_CLEANUP_INTERVAL:
+            return
+        if self._cleanup_task and not self._cleanup_task.done():
+            return
+        self._last_cleanup = now
+        self._cleanup_task = asyncio.ensure_future(self._cleanup(now))
+
+    async def _cleanup(self, now: float) -> None:
+        try:
+            async with self.engine.begin() as conn:
+                await conn.execute(self._CLEANUP, {"now": now})
+        except Exception:
+            logger.exception("Rate limit cleanup failed")
+
+    async def token_bucket(self, key, limit, window, now) -> RateLimitResult:
+        rate = limit / window
+        allowed, tokens = await self._execute(
+            self._TOKEN_BUCKET,
+            {
+                "key": key,
+                "limit": float(limit),
+                "rate": rate,
+                "now": now,
+                "expires_at": now + window,
+            },
+        )
+        return _bucket_result(allowed, tokens, rate)
+
+    async def sliding_window(self, key, limit, window, now) -> RateLimitResult:
+        index = int(now // window)
+        current, previous = await self._execute(
+            self._SLIDING_WINDOW,
+            {
+                "current_key": f"{key}:{index}",
+                "previous_key": f"{key}:{index - 1}",
+                "now": now,
+                # the previous window is still read during the next one
+                "expires_at": (index + 2) * window,
+            },
+        )
+        return _window_result(int(current), int(previous), now, window, limit)
@@ -0,0 +1,189 @@
+import itertools
+import logging
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlmodel import Session
+
+logger = logging.getLogger(__name__)
+
+# 0 on an idle, fully replayed standby (replay timestamp would look "old" there)
+LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+    """)
+
+
+def is_connection_error(exc: BaseException) -> bool:
+    # asyncpg raises OSError / TimeoutError unwrapped when it can't connect
+    if isinstance(exc, (OSError, TimeoutError)):
+        return True
+    if isinstance(exc, DBAPIError):
+        return exc.connection_invalidated or isinstance(
+            exc, (OperationalError, InterfaceError)
+        )
+    return False
+
+
+class Replica:
+    def __init__(self, name: str, engine: Engine):
+        self.name = name
+        self.engine = engine
+        self.lag: Optional[float] = None
+        self.checked_at = 0.0
+        self.down_until = 0.0
+        self.failures = 0
+
+
+class ReplicaRouter:
+    """
+    Round-robin over healthy replicas whose replication lag is under max_lag.
+    Lag is re-checked at most every check_interval seconds per replica; a
+    replica that can't be reached is skipped for cooldown seconds.
+    Without usable replicas every read goes to the primary.
+    """
+
+    def __init__(
+        self,
+        primary: Engine,
+        replicas: list[Engine],
+        max_lag: float = 5.0,
+        check_interval: float = 5.0,
+        cooldown: float = 30.0,
+    ):
+        self.primary = primary
+        self.replicas = [Replica(f"replica-{i}", e) for i, e in enumerate(replicas)]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.cooldown = cooldown
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._lock = threading.Lock()
+        self.primary_fallbacks = 0
+
+    def _usable(self, replica: Replica) -> bool:
+        now = time.monotonic()
+        if replica.down_until > now:
+            return False
+        if now - replica.checked_at >= self.check_interval:
+            self._check(replica)
+        return replica.down_until <= now and (replica.lag or 0) <= self.max_lag
+
+    def _check(self, replica: Replica) -> None:
+        replica.checked_at = time.monotonic()
+        try:
+            with replica.engine.connect() as conn:
+                replica.lag = float(conn.execute(LAG_SQL).scalar() or 0)
+            replica.failures = 0
+        except Exception as exc:
+            replica.failures += 1
+            replica.down_until = time.monotonic() + self.cooldown
+            logger.warning("%s unavailable, using others: %s", replica.name, exc)
+            return
+        if replica.lag > self.max_lag:
+            logger.warning(
+                "%s lagging %.1fs, reads go elsewhere", replica.name, replica.lag
+            )
+
+    def mark_failed(self, bind: Engine) -> None:
+        """Take a replica out of rotation (e.g. after a connection error)."""
+        for replica in self.replicas:
+            if replica.engine is bind:
+                replica.failures += 1
+                replica.down_until = time.monotonic() + self.cooldown
+
+    def pick(self) -> Engine:
+        if self._cycle is None:
+            return self.primary
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                replica = next(self._cycle)
+            if self._usable(replica):
+                return replica.engine
+        self.primary_fallbacks += 1
+        return self.primary
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        return {
+            "max_lag_seconds": self.max_lag,
+            "primary_fallbacks": self.primary_fallbacks,
+            "replicas": [
+                {
+                    "name": r.name,
+                    "lag_seconds": r.lag,
+                    "down": r.down_until > now,
+                    "failures": r.failures,
+                }
+                for r in self.replicas
+            ],
+        }
+
+
+class RoutingSession(Session):
+    """
+    Session for read-mostly routes: SELECTs go to one replica picked from the
+    router (sticky for the whole session); flushes, INSERT/UPDATE/DELETE and
+    SELECT ... FOR UPDATE go to the primary, and once the session has written
+    its later reads stay on the primary too (read your own writes).
+    A replica that fails a read is taken out of rotation and the read is
+    retried on the primary, unless objects it loaded earlier would be lost.
+    """
+
+    def __init__(self, *args, router: ReplicaRouter, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.router = router
+        self._replica: Optional[Engine] = None
+        self._on_primary = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self._on_primary
+            or self._flushing
+            or getattr(clause, "is_dml", False)
+            or getattr(clause, "_for_update_arg", None) is not None
+        ):
+            self._on_primary = True
+            return self.router.primary
+
+        if self._replica is None:
+            self._replica = self.router.pick()
+        return self._replica
+
+    def use_primary(self) -> None:
+        """Send the rest of this session's reads to the primary."""
+        self._on_primary = True
+
+    def _execute_internal(self, *args, **kwargs):
+        # execute/exec/scalar(s)/get all end up here, nested loads
+        # (selectinload) carry a parent state and are retried with their parent
+        if kwargs.get("_parent_execute_state") is not None:
+            return super()._execute_internal(*args, **kwargs)
+        fresh = not self.identity_map
+        try:
+            return super()._execute_internal(*args, **kwargs)
+        except Exception as exc:
+            replica = self._replica
+            if (
+                self._on_primary
+                or replica is None
+                or replica is self.router.primary
+                or not is_connection_error(exc)
+            ):
+                raise
+            self.router.mark_failed(replica)
+            self._replica = self.router.primary
+            # rollback would expire what earlier reads loaded from the replica
+            if not fresh:
+                raise
+            logger.warning("Replica read failed, retrying on primary: %s", exc)
+            self.rollback()
+            return super()._execute_internal(*args, **kwargs)
@@ -0,0 +1,113 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import event
+
+from src.config import SQL_N_PLUS_ONE_THRESHOLD, SQL_SLOW_QUERY_MS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestSQLStats:
+    """DB work done while serving one request (request.state.sql)."""
+
+    count: int = 0
+    total_ms: float = 0.0
+    slowest_ms: float = 0.0
+    slowest_statement: Optional[str] = None
+    statements: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.statements[statement] += 1
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_statement = statement
+
+    def repeated(self, threshold: int = SQL_N_PLUS_ONE_THRESHOLD) -> list[tuple]:
+        """Identical statements run >= threshold times — usually lazy loads (N+1)."""
+        return [(s, n) for s, n in self.statements.most_common() if n >= threshold]
+
+    def summary(self) -> dict:
+        return {
+            "queries": self.count,
+            "db_ms": round(self.total_ms, 2),
+            "slowest_ms": round(self.slowest_ms, 2),
+            "slowest_statement": self.slowest_statement,
+            "repeated": [{"statement": s, "count": n} for s, n in self.repeated()],
+        }
+
+
+_current: ContextVar[Optional[RequestSQLStats]] = ContextVar("sql_stats", default=None)
+
+# Process wide counters for /system/sql
+totals = Counter()
+
+
+def start_request() -> tuple[RequestSQLStats, object]:
+    stats = RequestSQLStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token) -> None:
+    _current.reset(token)
+
+
+def current_stats() -> Optional[RequestSQLStats]:
+    return _current.get()
+
+
+def _short(value, limit: int = 500) -> str:
+    text = repr(value)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._sql_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_sql_started", None)
+    if started is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    totals["queries"] += 1
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+
+    if elapsed_ms >= SQL_SLOW_QUERY_MS:
+        totals["slow"] += 1
+        logger.warning(
+            "slow query %.1fms: %s | params=%s",
+            elapsed_ms,
+            " ".join(statement.split()),
+            _short(parameters),
+        )
+
+
+def instrument_engine(engine) -> None:
+    # AsyncEngine events are registered on its sync_engine
+    engine = getattr(engine, "sync_engine", engine)
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def report_request(stats: RequestSQLStats, method: str, path: str) -> None:
+    """Log likely N+1 patterns once the request is done."""
+    for statement, count in stats.repeated():
+        totals["n_plus_one"] += 1
+        logger.warning(
+            "possible N+1 on %s %s: statement ran %d times: %s",
+            method,
+            path,
+            count,
+            " ".join(statement.split())[:300],
+        )
@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -6,8 +7,33 @@ from pydantic import ValidationError
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import SQLModel
 
+from src.api.core.middleware import RateLimitMiddleware, SQLStatsMiddleware
 from src.api.core.response import api_response
-from .lib.db_con import engine
+from src.api.core.operation.expiry import expiry_loop
+from src.api.core.operation.geo_index import (
+    build_ride_geo_index,
+    geo_index_invalidator,
+    geo_index_loop,
+)
+from src.api.core.operation.list_cache import clear_list_cache, invalidate_change
+from src.api.core.operation.revocation import (
+    load_revocations,
+    load_revocations_at_startup,
+    revocation_invalidator,
+)
+from src.config import (
+    CACHE_INVALIDATION_BUS,
+    PARTITION_MAINTENANCE_INTERVAL,
+    RIDE_EXPIRY_INTERVAL,
+    RIDE_GEO_INDEX,
+    RIDE_GEO_INDEX_REFRESH,
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_ENABLED,
+)
+from .lib.db_con import async_engine, engine
+from .lib.invalidation import listen_loop, register_flush, register_invalidator
+from .lib.partitions import RIDE_PARTITIONS, maintenance_loop
+from .lib.rate_limit import MemoryBackend, PostgresBackend
 from src.api.routers import (
     authRoute,
     userRoute,
@@ -16,6 +42,7 @@ from src.api.routers import (
     defaultRideSettingRoute,
     reviewRoute,
     verifymeRoute,
+    systemRoute,
 )
 
 
@@ -31,11 +58,62 @@ async def lifespan(app: FastAPI):
     # # --- Runs once on shutdown ---
     # print("🔴 App shutting down...")
 
+    # Tokens logged out before this worker started stay refused, no request
+    # is served before they are loaded
+    await load_revocations_at_startup(async_engine)
+
+    # Monthly rides partitions: create upcoming months, archive old ones
+    maintenance = None
+    if PARTITION_MAINTENANCE_INTERVAL > 0:
+        maintenance = asyncio.create_task(
+            maintenance_loop(
+                PARTITION_MAINTENANCE_INTERVAL, engine=engine, **RIDE_PARTITIONS
+            )
+        )
+
+    # Past rides -> active = false, in small batches
+    expiry = None
+    if RIDE_EXPIRY_INTERVAL > 0:
+        expiry = asyncio.create_task(expiry_loop(async_engine, RIDE_EXPIRY_INTERVAL))
+
+    # In-memory geo index of live rides, /ride/list?geo_filters uses SQL until built
+    geo_index = None
+    if RIDE_GEO_INDEX:
+        geo_index = asyncio.create_task(
+            geo_index_loop(async_engine, RIDE_GEO_INDEX_REFRESH)
+        )
+
+    # Other workers' writes (LISTEN/NOTIFY) invalidate this worker's caches
+    bus = None
+    if CACHE_INVALIDATION_BUS:
+        register_invalidator("*", invalidate_change)
+        register_flush(clear_list_cache)
+        register_invalidator("revoked_tokens", revocation_invalidator(async_engine))
+        register_flush(lambda: load_revocations(async_engine))
+        if RIDE_GEO_INDEX:
+            register_invalidator("rides", geo_index_invalidator(async_engine))
+            register_flush(lambda: build_ride_geo_index(async_engine))
+        bus = asyncio.create_task(listen_loop())
+
     yield  # 👈 after this, FastAPI starts handling requests
 
+    for task in (maintenance, expiry, geo_index, bus):
+        if task:
+            task.cancel()
+
 
 # Initialize the FastAPI app with the custom lifespan
 app = FastAPI(lifespan=lifespan, root_path="/api")
+# Throttle bcrypt/SMTP/upload routes; inside CORS so 429s get CORS headers
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        backend=(
+            PostgresBackend(async_engine)
+            if RATE_LIMIT_BACKEND == "postgres"
+            else MemoryBackend()
+        ),
+    )
 # Allow all origins
 app.add_middleware(
     CORSMiddleware,
@@ -48,7 +126,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "Server-Timing",
+        "X-DB-Queries",
+        "X-Cache",
+        "Retry-After",
+        "X-RateLimit-Limit",
+        "X-RateLimit-Remaining",
+    ],
 )
+# Per-request SQL count/time, slow query + N+1 logging
+app.add_middleware(SQLStatsMiddleware)
 
 
 @app.exception_handler(ValidationError)
@@ -102,3 +190,4 @@ app.include_router(rideRoute.router)
 app.include_router(defaultRideSettingRoute.router)
 app.include_router(reviewRoute.router)
 app.include_router(verifymeRoute.router)
+app.include_router(systemRoute.router)